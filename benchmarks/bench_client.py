@@ -0,0 +1,297 @@
+"""
+客户端吞吐量、延迟、解析速度与图片下载带宽基准（使用本地模拟服务器）
+
+```bash
+python benchmarks/bench_client.py [--requests N] [--concurrency C] [--latency 秒] [--output results.json]
+```
+
+模拟服务器在独立进程中运行，结果以 JSON 输出，便于在版本之间比较。
+"""
+
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import treehole
+from treehole import (
+    Comment,
+    CompactHole,
+    Hole,
+    MockServer,
+    TreeHoleClient,
+)
+from treehole.utils import json_decoder
+
+from bench_models import measure_parse
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """最近秩法百分位数"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], elapsed: float, results: list) -> Dict[str, Any]:
+    summary = {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "errors": sum(result is None or result == (None, None) for result in results),
+    }
+    if results and isinstance(results[0], tuple):
+        # (content, content type) from the image methods
+        size = sum(len(content) for content, _ in results if content is not None)
+        summary["bytes_per_second"] = round(size / elapsed)
+    return summary
+
+
+def run_sync(call: Callable, args: Sequence, concurrency: int) -> Dict[str, Any]:
+    """以线程池并发调用同步方法，记录每次调用的耗时"""
+    latencies: List[float] = []
+
+    def timed(arg):
+        start = time.perf_counter()
+        result = call(arg)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, args))
+    return summarize(latencies, time.perf_counter() - start, results)
+
+
+async def run_async(call: Callable, args: Sequence, concurrency: int) -> Dict[str, Any]:
+    """以固定数量的协程并发调用异步方法，记录每次调用的耗时"""
+    latencies: List[float] = []
+    results: list = []
+    todo = iter(args)
+
+    async def worker() -> None:
+        for arg in todo:
+            start = time.perf_counter()
+            results.append(await call(arg))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, results)
+
+
+def start_server(options: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """在子进程中启动模拟服务器，返回进程与地址"""
+    package = os.path.dirname(os.path.dirname(os.path.abspath(treehole.__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package, env.get("PYTHONPATH")]))
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "treehole.mock_server",
+            "--port=0",
+            f"--holes={options.holes}",
+            f"--comments={options.comments}",
+            f"--image-bytes={options.image_bytes}",
+            f"--latency={options.latency}",
+            f"--seed={options.seed}",
+        ],
+        stdout=subprocess.PIPE,
+        env=env,
+        text=True,
+    )
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("Mock server failed to start")
+    return process, base_url
+
+
+def bench_requests(
+    base_url: str, data: MockServer, options: argparse.Namespace
+) -> Dict[str, Any]:
+    alive = [pid for pid in range(options.holes, 0, -1) if data.hole_data(pid)]
+    pids = [alive[index % len(alive)] for index in range(options.requests)]
+    pages = [index % 20 + 1 for index in range(options.requests // 4)]
+    images = [
+        Hole(pid=pid, type="image")
+        for pid in alive
+        if data.hole_data(pid)["type"] == "image"
+    ][: options.images]
+    concurrency = options.concurrency
+    client = TreeHoleClient(
+        token="bench",
+        base_url=base_url,
+        pool_connections=concurrency,
+        pool_maxsize=concurrency,
+        connector_limit=concurrency,
+    )
+    results: Dict[str, Any] = {}
+    # Warm up both connection pools
+    run_sync(client.get_hole, pids[:concurrency], concurrency)
+    results["get_hole"] = {
+        "sync_serial": run_sync(client.get_hole, pids[: len(pids) // 4], 1),
+        "sync": run_sync(client.get_hole, pids, concurrency),
+    }
+    results["get_holes"] = {"sync": run_sync(client.get_holes, pages, concurrency)}
+    results["image"] = {
+        "sync": run_sync(client.get_hole_image, images, min(concurrency, 8))
+    }
+
+    async def run_all() -> None:
+        async with client:
+            await run_async(client.get_hole_async, pids[:concurrency], concurrency)
+            results["get_hole"]["async"] = await run_async(
+                client.get_hole_async, pids, concurrency
+            )
+            results["get_holes"]["async"] = await run_async(
+                client.get_holes_async, pages, concurrency
+            )
+            results["image"]["async"] = await run_async(
+                client.get_hole_image_async, images, min(concurrency, 8)
+            )
+
+    asyncio.run(run_all())
+    client.close()
+    return results
+
+
+def bench_parse(data: MockServer, count: int) -> Dict[str, Any]:
+    """解析速度（对象/秒），以及从响应体解码加解析一整页的速度"""
+    holes = [data.hole_data(pid) for pid in range(count, 0, -1)]
+    holes = [hole for hole in holes if hole is not None]
+    comments: List[dict] = []
+    pid = count
+    while len(comments) < len(holes) and pid > 0:
+        comments += data.comments_data(pid) or []
+        pid -= 1
+    decode = json_decoder()
+    results = {}
+    for cls, items in ((Hole, holes), (Comment, comments)):
+        name = cls.__name__
+        us = measure_parse(lambda items: [cls.from_data(item) for item in items], items)
+        results[f"{name}.from_data"] = {"objects_per_second": round(1e6 / us)}
+        us = measure_parse(cls.from_list, items)
+        results[f"{name}.from_list"] = {"objects_per_second": round(1e6 / us)}
+        # A whole response body, as the client sees it
+        body = json.dumps({"success": True, "data": {"data": items[:500]}}).encode()
+        number = max(1, len(items) // 500)
+        best = min(
+            timeit.repeat(
+                lambda: cls.from_list(decode(body)["data"]["data"]),
+                number=number,
+                repeat=5,
+            )
+        )
+        results[f"{name}.decode+from_list"] = {
+            "objects_per_second": round(number * 500 / best)
+        }
+    return results
+
+
+def bench_memory(data: MockServer, count: int = 100_000) -> Dict[str, Any]:
+    """解析 `count` 个树洞后对象占用的内存（字节，不含与原始数据共享的字符串）"""
+    holes = [data.hole_data(pid % data.latest_pid + 1) for pid in range(count * 2)]
+    holes = [hole for hole in holes if hole is not None][:count]
+    results = {}
+    for cls in (Hole, CompactHole):
+        gc.collect()
+        tracemalloc.start()
+        objects = cls.from_list(holes)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        results[cls.__name__] = {
+            f"bytes_per_{count}": size,
+            "bytes_per_object": round(size / count),
+        }
+    return results
+
+
+def report(results: Dict[str, Any], file=sys.stderr) -> None:
+    """在终端打印摘要"""
+    print(
+        f"{'requests':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'MiB/s':>10}",
+        file=file,
+    )
+    for name in ("get_hole", "get_holes", "image"):
+        for mode, summary in results[name].items():
+            bandwidth = summary.get("bytes_per_second")
+            print(
+                f"{name + ' ' + mode:<22}{summary['requests_per_second']:>10.0f}"
+                f"{summary['p50_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+                + (f"{bandwidth / 2 ** 20:>10.1f}" if bandwidth else ""),
+                file=file,
+            )
+    print(f"\n{'parser':<30}{'obj/s':>12}", file=file)
+    for name, summary in results["parse"].items():
+        print(f"{name:<30}{summary['objects_per_second']:>12,}", file=file)
+    print(f"\n{'memory':<30}{'bytes/obj':>12}", file=file)
+    for name, summary in results["memory"].items():
+        print(f"{name:<30}{summary['bytes_per_object']:>12}", file=file)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--image-bytes", type=int, default=256 * 1024)
+    parser.add_argument("--holes", type=int, default=100_000)
+    parser.add_argument("--comments", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="JSON file (default: stdout)")
+    options = parser.parse_args(argv)
+
+    data = MockServer(
+        holes=options.holes,
+        comments=options.comments,
+        image_bytes=options.image_bytes,
+        seed=options.seed,
+    )
+    process, base_url = start_server(options)
+    try:
+        results = bench_requests(base_url, data, options)
+    finally:
+        process.terminate()
+        process.wait()
+    results["parse"] = bench_parse(data, min(options.holes, 20_000))
+    results["memory"] = bench_memory(data)
+    try:
+        version = treehole.__version__
+    except Exception:
+        version = None
+    results["meta"] = {
+        "treehole": version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "options": vars(options),
+    }
+    report(results)
+    document = json.dumps(results, indent=2, ensure_ascii=False)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(document + "\n")
+    else:
+        print(document)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+数据模型内存占用、构造耗时与批量解析耗时基准
+
+```bash
+python benchmarks/bench_models.py [数量]
+```
+"""
+
+import gc
+import sys
+import time
+import timeit
+import tracemalloc
+
+from treehole import Comment, CompactComment, CompactHole, Hole
+
+
+def make_hole(pid: int) -> dict:
+    return {
+        "pid": pid,
+        "text": f"hole {pid}",
+        "type": "text",
+        "timestamp": 1_600_000_000 + pid,
+        "reply": pid % 7,
+        "likenum": pid % 3,
+        "extra": 0,
+        "tag": "tag" if pid % 10 == 0 else None,
+        "label": 0,
+        "label_info": None,
+        "anonymous": 1,
+        "is_top": 0,
+        "status": 0,
+        "is_comment": 1,
+        "is_follow": 0,
+        "is_protect": 0,
+        "image_size": [0, 0],
+    }
+
+
+def make_comment(cid: int) -> dict:
+    return {
+        "cid": cid,
+        "pid": cid // 10,
+        "text": f"comment {cid}",
+        "timestamp": 1_600_000_000 + cid,
+        "anonymous": 1,
+        "tag": None,
+        "hidden": 0,
+        "islz": 0,
+        "name": "Alice",
+    }
+
+
+def measure(cls: type, data: list) -> tuple:
+    """返回 (每个对象的字节数, 每个对象的构造耗时（微秒）)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls.from_data(item) for item in data]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    gc.collect()
+    start = time.perf_counter()
+    objects = [cls.from_data(item) for item in data]
+    elapsed = time.perf_counter() - start
+    return size / len(data), elapsed / len(data) * 1e6
+
+
+def measure_parse(parse, data: list, page_size: int = 500) -> float:
+    """按页（默认每页 500 个）反复解析，返回每个对象的最短耗时（微秒）"""
+    page = data[:page_size]
+    number = max(1, len(data) // page_size)
+    best = min(timeit.repeat(lambda: parse(page), number=number, repeat=5))
+    return best / number / len(page) * 1e6
+
+
+def main(count: int = 200_000) -> None:
+    holes = [make_hole(pid) for pid in range(count)]
+    comments = [make_comment(cid) for cid in range(count)]
+    print(f"{'class':<16}{'bytes/obj':>12}{'us/obj':>10}")
+    for cls, data in (
+        (Hole, holes),
+        (CompactHole, holes),
+        (Comment, comments),
+        (CompactComment, comments),
+    ):
+        size, elapsed = measure(cls, data)
+        print(f"{cls.__name__:<16}{size:>12.0f}{elapsed:>10.2f}")
+    print()
+    print(f"{'parser':<24}{'us/obj':>10}{'speedup':>10}")
+    for cls, data in ((Hole, holes), (Comment, comments)):
+        baseline = measure_parse(lambda data: list(map(cls.from_data, data)), data)
+        fast = measure_parse(cls.from_list, data)
+        print(f"{cls.__name__ + '.from_data':<24}{baseline:>10.2f}")
+        print(f"{cls.__name__ + '.from_list':<24}{fast:>10.2f}{baseline / fast:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -35,10 +35,17 @@ client = TreeHoleClient(token=<Your Token>)
 client = TreeHoleClient(uid=<UID>, password=<Password>)
 # 获取单个树洞
 hole = client.get_hole(<Hole ID>)
+# 批量获取树洞
+holes, errors = client.get_holes_by_ids(<Hole IDs>)
+# 回溯抓取某个时间之后发布的全部树洞
+holes, errors = client.backfill(since=<Datetime>)
 # 获取树洞评论
 comments = client.get_comment(<Hole ID>)
 # 获取首页树洞列表
 holes = client.get_holes(<Page Num>)
+# 自动翻页遍历首页树洞，直到满足终止条件
+for hole in client.iter_holes(until=lambda hole: hole.timestamp < <Timestamp>):
+    ...
 # 获取关注树洞列表
 holes = client.get_followed(<Page Num>)
 # 切换关注状态
@@ -70,19 +77,91 @@ success = client.post_report(<Hole ID>, <Reason>)
 - [ ] 更多功能待补充 ...
 """
 
-try:
-    from importlib.metadata import PackageNotFoundError, version  # novm
-except ImportError:  # Fallback for Python < 3.8
-    from importlib_metadata import PackageNotFoundError, version  # novm
-
-try:
-    # Change here if project is renamed and does not equal the package name
-    dist_name = "TreeHole"
-    __version__ = version(dist_name)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
-finally:
-    del version, PackageNotFoundError
-
-from .client import *
-from .models import *
+import sys
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+# Public names and the submodules defining them. Submodules (and the HTTP stacks
+# they need) are imported on first access, so `import treehole` stays cheap
+_EXPORTS = {
+    "HoleBatch": "batch",
+    "CommentBatch": "batch",
+    "ResponseCache": "cache",
+    "SingleFlight": "cache",
+    "Checkpoint": "checkpoint",
+    "TreeHoleClient": "client",
+    "ImageMirror": "mirror",
+    "MirrorEntry": "mirror",
+    "MirrorReport": "mirror",
+    "Hole": "models",
+    "Comment": "models",
+    "CompactHole": "models",
+    "CompactComment": "models",
+    "UserName": "models",
+    "MockServer": "mock_server",
+    "CommentJob": "poster",
+    "CommentPoster": "poster",
+    "RateLimiter": "ratelimit",
+    "RetryPolicy": "retry",
+    "RequestStats": "stats",
+    "HoleStore": "storage",
+    "ArrayStream": "stream",
+    "MultipartStream": "upload",
+    "shrink_image": "upload",
+    "FeedEvent": "watcher",
+    "FeedWatcher": "watcher",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version  # novm
+    except ImportError:  # Fallback for Python < 3.8
+        from importlib_metadata import PackageNotFoundError, version  # novm
+
+    try:
+        # Change here if project is renamed and does not equal the package name
+        dist_name = "TreeHole"
+        return version(dist_name)
+    except PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        value = _version()
+    elif name in _EXPORTS:
+        value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS) | {"__version__"})
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .batch import *
+    from .cache import *
+    from .checkpoint import *
+    from .client import *
+    from .mirror import *
+    from .mock_server import *
+    from .models import *
+    from .poster import *
+    from .ratelimit import *
+    from .retry import *
+    from .stats import *
+    from .storage import *
+    from .stream import *
+    from .upload import *
+    from .watcher import *
+elif sys.version_info < (3, 7):  # pragma: no cover
+    # Module __getattr__ (PEP 562) needs Python 3.7, import everything eagerly
+    __version__ = _version()
+    for _name in _EXPORTS:
+        __getattr__(_name)
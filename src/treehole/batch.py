@@ -0,0 +1,349 @@
+"""
+列式批量数据容器
+"""
+
+from array import array
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .models import Comment, Hole, Label
+from .utils import lazy_import
+
+numpy = lazy_import("numpy", optional=True)
+
+__all__ = ("HoleBatch", "CommentBatch")
+
+MISSING = -(2**63)
+"""整数列中表示缺失值（`None`）的哨兵值"""
+
+B = TypeVar("B", bound="_Batch")
+
+
+def _pack_texts(values: Iterable[Optional[bytes]]) -> Tuple[array, bytes, array]:
+    """将若干 UTF-8 字节串打包为 (偏移量, 内容, 是否非缺失)"""
+    offsets = array("q", [0])
+    valid = array("b")
+    chunks = []
+    end = 0
+    for value in values:
+        if value is not None:
+            chunks.append(value)
+            end += len(value)
+        offsets.append(end)
+        valid.append(value is not None)
+    return offsets, b"".join(chunks), valid
+
+
+class _Batch:
+    """
+    列式批量数据的基类
+
+    整数字段存放在 `array("q")` 中（缺失值为 `MISSING`），可直接交给
+    `numpy.frombuffer(..., dtype=numpy.int64)` 零拷贝使用；重复较多的字符串字段
+    按字典编码存放；文本字段以 UTF-8 字节串加偏移量（及是否缺失的标记）存放。
+    按下标取出时才构造模型对象。
+    """
+
+    _model: type
+    _ints: Tuple[str, ...] = ()
+    _categories: Tuple[str, ...] = ()
+    _texts: Tuple[str, ...] = ()
+    _objects: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        length: int,
+        ints: Dict[str, array],
+        categories: Dict[str, Tuple[array, List[Any]]],
+        texts: Dict[str, Tuple[array, bytes, array]],
+        objects: Dict[str, List[Any]],
+    ) -> None:
+        self.__length = length
+        self.__ints = ints
+        self.__categories = categories
+        self.__texts = texts
+        self.__objects = objects
+
+    @staticmethod
+    def _values(name: str, data: Sequence[Dict[str, Any]]) -> Iterable[Any]:
+        """从原始数据中读取一列，子类可重写以处理特殊字段"""
+        return (item.get(name) for item in data)
+
+    @classmethod
+    def _to_model(cls, fields: Dict[str, Any]) -> Any:
+        """由一行字段构造模型对象，子类可重写以处理特殊字段"""
+        return cls._model(**fields)
+
+    @classmethod
+    def from_data(cls: "type[B]", data: Sequence[Dict[str, Any]]) -> B:
+        """
+        从接口返回的字典列表（如 `response_dict["data"]["data"]`）创建批量数据
+        """
+        ints = {
+            name: array(
+                "q",
+                (
+                    MISSING if value is None else value
+                    for value in cls._values(name, data)
+                ),
+            )
+            for name in cls._ints
+        }
+        categories = {}
+        for name in cls._categories:
+            lookup: Dict[Any, int] = {}
+            codes = array(
+                "i",
+                (
+                    lookup.setdefault(value, len(lookup))
+                    for value in cls._values(name, data)
+                ),
+            )
+            categories[name] = (codes, list(lookup))
+        texts = {
+            name: _pack_texts(
+                None if value is None else value.encode()
+                for value in cls._values(name, data)
+            )
+            for name in cls._texts
+        }
+        objects = {name: list(cls._values(name, data)) for name in cls._objects}
+        return cls(len(data), ints, categories, texts, objects)
+
+    @classmethod
+    def concat(cls: "type[B]", batches: Iterable[B]) -> B:
+        """
+        将多个批量数据（如多页结果）按顺序拼接
+        """
+        batches = list(batches)
+        ints = {name: array("q") for name in cls._ints}
+        categories = {name: (array("i"), []) for name in cls._categories}
+        texts = {name: (array("q", [0]), [], array("b")) for name in cls._texts}
+        objects: Dict[str, List[Any]] = {name: [] for name in cls._objects}
+        length = 0
+        for batch in batches:
+            length += len(batch)
+            for name, column in ints.items():
+                column.extend(batch.__ints[name])
+            for name, (codes, values) in categories.items():
+                lookup = {value: code for code, value in enumerate(values)}
+                part_codes, part_values = batch.__categories[name]
+                remap = [lookup.setdefault(value, len(lookup)) for value in part_values]
+                values[:] = list(lookup)
+                codes.extend(remap[code] for code in part_codes)
+            for name, (offsets, chunks, valid) in texts.items():
+                base = offsets[-1]
+                part_offsets, part_content, part_valid = batch.__texts[name]
+                offsets.extend(offset + base for offset in part_offsets[1:])
+                chunks.append(part_content)
+                valid.extend(part_valid)
+            for name, column in objects.items():
+                column.extend(batch.__objects[name])
+        return cls(
+            length,
+            ints,
+            categories,
+            {
+                name: (offsets, b"".join(chunks), valid)
+                for name, (offsets, chunks, valid) in texts.items()
+            },
+            objects,
+        )
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.__getitem__, range(self.__length))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(length={self.__length})"
+
+    def __text_bytes(self, name: str, index: int) -> Optional[memoryview]:
+        offsets, content, valid = self.__texts[name]
+        if not valid[index]:
+            return None
+        return memoryview(content)[offsets[index] : offsets[index + 1]]
+
+    def __text(self, name: str, index: int) -> Optional[str]:
+        value = self.__text_bytes(name, index)
+        return None if value is None else str(value, "utf-8")
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("batch index out of range")
+        fields = {}
+        for name, column in self.__ints.items():
+            value = column[index]
+            fields[name] = None if value == MISSING else value
+        for name, (codes, values) in self.__categories.items():
+            fields[name] = values[codes[index]]
+        for name in self.__texts:
+            fields[name] = self.__text(name, index)
+        for name, column in self.__objects.items():
+            fields[name] = column[index]
+        return self._to_model(fields)
+
+    def column(self, name: str) -> Union[array, List[Any]]:
+        """
+        读取一整列
+
+        Returns
+        -------
+        1. 整数字段返回底层 `array("q")`（不拷贝，缺失值为 `MISSING`），其余字段返回列表
+        """
+
+        if name in self.__ints:
+            return self.__ints[name]
+        if name in self.__categories:
+            codes, values = self.__categories[name]
+            return [values[code] for code in codes]
+        if name in self.__texts:
+            return [self.__text(name, index) for index in range(self.__length)]
+        if name in self.__objects:
+            return list(self.__objects[name])
+        raise KeyError(name)
+
+    def take(self: B, indices: Iterable[int]) -> B:
+        """
+        按下标选取若干行，返回新的批量数据
+        """
+        if numpy is not None:
+            if not isinstance(indices, numpy.ndarray):
+                indices = list(indices)
+            indices = numpy.asarray(indices, dtype=numpy.int64).reshape(-1)
+            ints = {}
+            for name, column in self.__ints.items():
+                ints[name] = array("q")
+                ints[name].frombytes(
+                    numpy.frombuffer(column, dtype=numpy.int64)[indices].tobytes()
+                )
+            indices = indices.tolist()
+        else:
+            indices = list(indices)
+            ints = {
+                name: array("q", (column[index] for index in indices))
+                for name, column in self.__ints.items()
+            }
+        categories = {
+            name: (array("i", (codes[index] for index in indices)), list(values))
+            for name, (codes, values) in self.__categories.items()
+        }
+        texts = {
+            name: _pack_texts(self.__text_bytes(name, index) for index in indices)
+            for name in self.__texts
+        }
+        objects = {
+            name: [column[index] for index in indices]
+            for name, column in self.__objects.items()
+        }
+        return type(self)(len(indices), ints, categories, texts, objects)
+
+    def filter(self: B, mask: Iterable[bool]) -> B:
+        """
+        按布尔掩码（长度与批量数据相同）选取若干行，返回新的批量数据
+        """
+        if numpy is not None:
+            return self.take(numpy.flatnonzero(numpy.asarray(mask, dtype=bool)))
+        return self.take(index for index, keep in enumerate(mask) if keep)
+
+    def where(
+        self: B, name: str, low: Optional[int] = None, high: Optional[int] = None
+    ) -> B:
+        """
+        选取整数字段在 `[low, high]` 范围内的行（缺失值不会被选中）
+
+        Parameters
+        ----------
+        - name: 整数字段名，如 `timestamp`、`reply`
+        - low: 下限（包含），可选
+        - high: 上限（包含），可选
+
+        Returns
+        -------
+        1. 新的批量数据
+        """
+
+        column = self.__ints[name]
+        low = MISSING + 1 if low is None else low
+        high = 2**63 - 1 if high is None else high
+        if numpy is not None:
+            values = numpy.frombuffer(column, dtype=numpy.int64)
+            return self.take(numpy.flatnonzero((values >= low) & (values <= high)))
+        return self.take(
+            index for index, value in enumerate(column) if low <= value <= high
+        )
+
+
+class HoleBatch(_Batch):
+    """
+    树洞的列式批量数据
+
+    整数字段（`pid`、`timestamp`、`reply`、`likenum` 等，图片大小拆分为 `image_width`、
+    `image_height`）可通过 `column` 取得底层数组；`batch[i]` 按需构造 `Hole` 对象。
+    """
+
+    _model = Hole
+    _ints = (
+        "pid",
+        "timestamp",
+        "image_width",
+        "image_height",
+        "extra",
+        "label",
+        "reply",
+        "likenum",
+        "anonymous",
+        "status",
+        "is_top",
+        "is_comment",
+        "is_follow",
+        "is_protect",
+    )
+    _categories = ("type", "tag")
+    _texts = ("text",)
+    _objects = ("label_info",)
+
+    @staticmethod
+    def _values(name: str, data: Sequence[Dict[str, Any]]) -> Iterable[Any]:
+        if name == "image_width":
+            return ((item.get("image_size") or (0, 0))[0] for item in data)
+        if name == "image_height":
+            return ((item.get("image_size") or (0, 0))[1] for item in data)
+        if name == "label_info":
+            return (
+                Label.from_data(item["label_info"]) if item.get("label_info") else None
+                for item in data
+            )
+        return _Batch._values(name, data)
+
+    @classmethod
+    def _to_model(cls, fields: Dict[str, Any]) -> Hole:
+        fields["image_size"] = (fields.pop("image_width"), fields.pop("image_height"))
+        return Hole(**fields)
+
+
+class CommentBatch(_Batch):
+    """
+    评论的列式批量数据
+
+    整数字段（`cid`、`pid`、`timestamp`、`islz` 等）可通过 `column` 取得底层数组；
+    `batch[i]` 按需构造 `Comment` 对象。
+    """
+
+    _model = Comment
+    _ints = ("cid", "pid", "timestamp", "islz", "anonymous", "hidden")
+    _categories = ("name", "tag")
+    _texts = ("text",)
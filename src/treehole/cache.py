@@ -0,0 +1,275 @@
+"""
+请求结果缓存
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+__all__ = ("ResponseCache", "SingleFlight")
+
+T = TypeVar("T")
+
+Loaded = Tuple[Any, Optional[int]]
+"""加载结果：值及其字节数，字节数为 `None` 时不写入缓存（如请求失败）"""
+
+
+class SingleFlight:
+    """
+    合并并发的相同异步调用（single-flight）
+
+    同一键上已有调用进行中时，后来者直接等待其结果而不再发起调用；
+    调用结束后立即移除，不做任何缓存。
+    """
+
+    def __init__(self) -> None:
+        self.__flights: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        """实际发起的调用次数"""
+        self.collapsed = 0
+        """被合并（未实际发起）的调用次数"""
+
+    def __len__(self) -> int:
+        return len(self.__flights)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行 `func`，若同一键上已有调用进行中则共享其结果（或异常）
+        """
+        while True:
+            future = self.__flights.get(key)
+            if future is None:
+                break
+            self.collapsed += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: take over the call
+                if not future.cancelled():
+                    raise
+                self.collapsed -= 1
+        self.calls += 1
+        future = asyncio.get_running_loop().create_future()
+        self.__flights[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so that a failure nobody waited for is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.__flights[key]
+
+
+class _Flight:
+    """进行中的同步加载"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    读取类接口的进程内缓存（TTL + LRU）
+
+    以 `(接口名, 请求地址, 请求参数)` 为键，分别限制条目数与总字节数，
+    并对同一键的并发加载进行合并（single-flight），只发送一次请求。
+    接口名为 `hole`、`holes`、`comment`、`followed`、`search`、`image` 之一。
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        - ttl:
+            默认缓存时间（秒），默认为 30
+        - ttls:
+            各接口的缓存时间（秒），如 `{"hole": 60, "holes": 5}`，未指定的接口使用 `ttl`
+        - max_entries:
+            最多缓存条目数，默认为 1024
+        - max_bytes:
+            最多缓存的响应字节数，默认为 64 MiB
+        """
+        self.__ttl = ttl
+        self.__ttls = dict(ttls or {})
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        # key -> (expire time, value, size)
+        self.__entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self.__nbytes = 0
+        self.__lock = threading.Lock()
+        self.__flights: Dict[Hashable, _Flight] = {}
+        self.__async_flights = SingleFlight()
+        self.hits = 0
+        """命中次数"""
+        self.misses = 0
+        """未命中次数"""
+
+    @staticmethod
+    def key(endpoint: str, url: str, params: Optional[Dict[str, str]] = None):
+        """
+        生成缓存键
+        """
+        return (endpoint, url, tuple(sorted((params or {}).items())))
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def nbytes(self) -> int:
+        """当前缓存的总字节数，只读"""
+        return self.__nbytes
+
+    def ttl(self, endpoint: str) -> float:
+        """
+        接口的缓存时间（秒）
+        """
+        return self.__ttls.get(endpoint, self.__ttl)
+
+    def __lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                self.__pop(key)
+            self.misses += 1
+            return False, None
+
+    def __pop(self, key: Hashable) -> None:
+        _, _, size = self.__entries.pop(key)
+        self.__nbytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存，不存在或已过期则返回 `default`
+        """
+        found, value = self.__lookup(key)
+        return value if found else default
+
+    def set(self, key: Hashable, value: Any, nbytes: int = 0) -> None:
+        """
+        写入缓存，键的第一项为接口名，用于确定缓存时间
+        """
+        ttl = self.ttl(key[0])
+        if ttl <= 0 or nbytes > self.__max_bytes:
+            return
+        with self.__lock:
+            if key in self.__entries:
+                self.__pop(key)
+            self.__entries[key] = (time.monotonic() + ttl, value, nbytes)
+            self.__nbytes += nbytes
+            while self.__entries and (
+                len(self.__entries) > self.__max_entries
+                or self.__nbytes > self.__max_bytes
+            ):
+                self.__pop(next(iter(self.__entries)))
+
+    def invalidate(self, endpoint: str, url: Optional[str] = None) -> int:
+        """
+        使缓存失效
+
+        Parameters
+        ----------
+        - endpoint: 接口名
+        - url: 请求地址，默认为 `None`（该接口的全部缓存）
+
+        Returns
+        -------
+        1. 失效的条目数
+        """
+
+        with self.__lock:
+            keys = [
+                key
+                for key in self.__entries
+                if key[0] == endpoint and (url is None or key[1] == url)
+            ]
+            for key in keys:
+                self.__pop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        清空缓存与计数
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def load(self, key: Hashable, loader: Callable[[], Loaded]) -> Any:
+        """
+        读取缓存，未命中时调用 `loader` 加载并写入；多个线程同时加载同一键时只调用一次
+
+        Returns
+        -------
+        1. 缓存值或 `loader` 加载的值
+        """
+
+        found, value = self.__lookup(key)
+        if found:
+            return value
+        with self.__lock:
+            flight = self.__flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.__flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value, nbytes = loader()
+            if nbytes is not None:
+                self.set(key, flight.value, nbytes)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__flights[key]
+            flight.done.set()
+
+    async def load_async(
+        self, key: Hashable, loader: Callable[[], Awaitable[Loaded]]
+    ) -> Any:
+        """
+        异步读取缓存，未命中时调用 `loader` 加载并写入；多个协程同时加载同一键时只调用一次
+
+        Returns
+        -------
+        1. 缓存值或 `loader` 加载的值
+        """
+
+        found, value = self.__lookup(key)
+        if found:
+            return value
+
+        async def load() -> Any:
+            value, nbytes = await loader()
+            if nbytes is not None:
+                self.set(key, value, nbytes)
+            return value
+
+        return await self.__async_flights.run(key, load)
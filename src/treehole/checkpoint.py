@@ -0,0 +1,163 @@
+"""
+抓取断点记录
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple, Union
+
+__all__ = ("Checkpoint",)
+
+
+class Checkpoint:
+    """
+    抓取断点日志
+
+    逐行记录已完成、失败的 ID 与翻页游标（JSON Lines，只追加），进程中断后以同一文件重新创建即可
+    从中断处继续：已完成的 ID 不再请求，失败的 ID 会重新请求。
+    记录按 `scope` 分组（如 `"holes"`、`"comments"`、`"backfill"`），同一文件可供多个任务共用。
+    同一个实例可被多个线程和协程共享。
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """
+        - path:
+            日志文件路径，存在时读入已有记录
+        """
+        self.__path = os.fspath(path)
+        self.__lock = threading.Lock()
+        self.__done: Dict[str, Dict[int, Any]] = {}
+        self.__failed: Dict[str, Dict[int, str]] = {}
+        self.__cursors: Dict[Tuple[str, str], Any] = {}
+        if os.path.exists(self.__path):
+            with open(self.__path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        self.__apply(json.loads(line))
+                    except (KeyError, TypeError, ValueError):
+                        # Blank or truncated line left by an interrupted write
+                        continue
+
+    def __apply(self, record: Dict[str, Any]) -> None:
+        scope = record["scope"]
+        if "cursor" in record:
+            if record["value"] is None:
+                self.__cursors.pop((scope, record["cursor"]), None)
+            else:
+                self.__cursors[scope, record["cursor"]] = record["value"]
+            return
+        pid = int(record["pid"])
+        if record["state"] == "done":
+            self.__done.setdefault(scope, {})[pid] = record.get("info")
+            self.__failed.get(scope, {}).pop(pid, None)
+        elif pid not in self.__done.get(scope, {}):
+            self.__failed.setdefault(scope, {})[pid] = record.get("error", "")
+
+    def __append(self, record: Dict[str, Any]) -> None:
+        with self.__lock:
+            self.__apply(record)
+            record["time"] = time.time()
+            with open(self.__path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @property
+    def path(self) -> str:
+        """日志文件路径，只读"""
+        return self.__path
+
+    def is_done(self, pid: Union[int, str], scope: str = "holes") -> bool:
+        """
+        ID 是否已完成
+        """
+        return int(pid) in self.__done.get(scope, {})
+
+    def completed(self, scope: str = "holes") -> Dict[int, Any]:
+        """
+        已完成的 ID 及其附加信息
+        """
+        return dict(self.__done.get(scope, {}))
+
+    def failed(self, scope: str = "holes") -> Dict[int, str]:
+        """
+        失败且尚未完成的 ID 及其错误信息
+        """
+        return dict(self.__failed.get(scope, {}))
+
+    def done(
+        self, pid: Union[int, str], info: Any = None, scope: str = "holes"
+    ) -> None:
+        """
+        记录 ID 已完成
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - info: 可写入 JSON 的附加信息，可选
+        - scope: 记录分组，默认为 `"holes"`
+        """
+
+        record = {"scope": scope, "pid": int(pid), "state": "done"}
+        if info is not None:
+            record["info"] = info
+        self.__append(record)
+
+    def fail(
+        self, pid: Union[int, str], error: Any = None, scope: str = "holes"
+    ) -> None:
+        """
+        记录 ID 失败（已完成的 ID 不受影响）
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - error: 错误或错误信息，可选
+        - scope: 记录分组，默认为 `"holes"`
+        """
+
+        record = {"scope": scope, "pid": int(pid), "state": "failed"}
+        if error is not None:
+            record["error"] = str(error)
+        self.__append(record)
+
+    def cursor(self, name: str, default: Any = None, scope: str = "holes") -> Any:
+        """
+        读取游标（如翻页进度），不存在则返回 `default`
+        """
+        return self.__cursors.get((scope, name), default)
+
+    def set_cursor(self, name: str, value: Any, scope: str = "holes") -> None:
+        """
+        记录游标（可写入 JSON 的值，`None` 表示清除）
+        """
+        self.__append({"scope": scope, "cursor": name, "value": value})
+
+    def compact(self) -> None:
+        """
+        以当前状态重写日志文件，去除被覆盖的记录
+        """
+        with self.__lock:
+            records = [
+                {"scope": scope, "cursor": name, "value": value}
+                for (scope, name), value in self.__cursors.items()
+            ]
+            for scope, done in self.__done.items():
+                for pid, info in done.items():
+                    record = {"scope": scope, "pid": pid, "state": "done"}
+                    if info is not None:
+                        record["info"] = info
+                    records.append(record)
+            for scope, failed in self.__failed.items():
+                for pid, error in failed.items():
+                    records.append(
+                        {"scope": scope, "pid": pid, "state": "failed", "error": error}
+                    )
+            temporary = self.__path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as file:
+                for record in records:
+                    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(temporary, self.__path)
+
+    def __len__(self) -> int:
+        return sum(len(done) for done in self.__done.values())
@@ -0,0 +1,444 @@
+"""
+命令行工具
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import json
+import logging
+import os
+import sys
+from typing import IO, Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from .checkpoint import Checkpoint
+from .client import TreeHoleClient
+from .mirror import ImageMirror
+from .models import Hole
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .stats import RequestStats
+from .utils import RequestError, logger
+
+__all__ = ("main",)
+
+TIME_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S")
+"""`--since` / `--until` 支持的时间格式（亦可为时间戳）"""
+
+COMMENTS = "comments"
+"""评论抓取在断点日志中的记录分组"""
+
+
+def _parse_time(value: str) -> int:
+    if value.isdigit():
+        return int(value)
+    for time_format in TIME_FORMATS:
+        try:
+            return int(datetime.datetime.strptime(value, time_format).timestamp())
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"invalid time: {value!r}")
+
+
+def _parse_pids(values: Iterable[str]) -> List[int]:
+    """解析 pid 列表，支持 `100-200` 形式的闭区间（按从大到小展开）"""
+    pids = []
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        if value.startswith("{"):
+            pids.append(int(json.loads(value)["pid"]))
+            continue
+        low, _, high = value.partition("-")
+        if high:
+            pids.extend(range(int(high), int(low) - 1, -1))
+        else:
+            pids.append(int(low))
+    return pids
+
+
+def _read_pids(args: argparse.Namespace) -> List[int]:
+    """从命令行参数与 `--input` 文件（每行一个 pid 或 JSON 对象）读取 pid，去重并保持顺序"""
+    values = list(args.pids)
+    if args.input is not None:
+        with open(args.input, encoding="utf-8") as file:
+            values.extend(file)
+    return list(dict.fromkeys(_parse_pids(values)))
+
+
+def _done_pids(path: str) -> Set[int]:
+    """已写入输出文件的 pid，用于断点续传"""
+    done: Set[int] = set()
+    if path == "-" or not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                done.add(int(json.loads(line)["pid"]))
+            except (KeyError, TypeError, ValueError):
+                # Truncated last line of an interrupted run
+                continue
+    return done
+
+
+class _Output:
+    """逐行追加写入 JSON，每行写入后立即落盘"""
+
+    def __init__(self, path: str) -> None:
+        self.__file: IO[str] = (
+            sys.stdout if path == "-" else open(path, "a", encoding="utf-8")
+        )
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.__file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.__file.flush()
+
+    def close(self) -> None:
+        if self.__file is not sys.stdout:
+            self.__file.close()
+
+
+class _Progress:
+    """定期在标准错误输出中报告进度与请求统计"""
+
+    def __init__(self, stats: RequestStats, total: Optional[int] = None) -> None:
+        self.stats = stats
+        self.total = total
+        self.done = 0
+        self.missing = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def __str__(self) -> str:
+        done = f"{self.done}" if self.total is None else f"{self.done}/{self.total}"
+        return (
+            f"{done} done, {self.missing} missing, {self.failed} failed, "
+            f"{self.skipped} skipped | {self.stats}"
+        )
+
+    def count_errors(self, errors: Dict[Any, Exception]) -> None:
+        """统计批量获取的错误：未取得树洞（`RequestError`）计为缺失，其余计为失败"""
+        for error in errors.values():
+            if isinstance(error, RequestError):
+                self.missing += 1
+            else:
+                self.failed += 1
+
+    async def report(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            print(str(self), file=sys.stderr, flush=True)
+
+
+async def _workers(items: Iterable[Any], concurrency: int, handle) -> None:
+    """以有限并发对每一项调用 `handle`"""
+    iterator = iter(items)
+
+    async def worker() -> None:
+        # Each next() runs without yielding, so workers can share the iterator
+        for item in iterator:
+            await handle(item)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def _checkpoint(args: argparse.Namespace) -> Optional[Checkpoint]:
+    """断点日志：`--checkpoint` 指定，否则为输出文件名加 `.checkpoint`（输出到标准输出时不记录）"""
+    if args.checkpoint is not None:
+        return Checkpoint(args.checkpoint)
+    if args.output == "-":
+        return None
+    return Checkpoint(args.output + ".checkpoint")
+
+
+async def _holes(
+    client: TreeHoleClient, args: argparse.Namespace, progress: _Progress
+) -> None:
+    checkpoint = _checkpoint(args)
+    # Holes written just before an interrupt may miss their checkpoint record
+    done = _done_pids(args.output)
+    if checkpoint is not None:
+        done.update(checkpoint.completed())
+    pids = [pid for pid in range(args.end, args.start - 1, -1) if pid not in done]
+    progress.total = len(pids)
+    progress.skipped = args.end - args.start + 1 - len(pids)
+    output = _Output(args.output)
+
+    async def handle(pid: int) -> None:
+        try:
+            hole = await client.get_hole_async(pid)
+        except Exception as e:
+            logger.warning("Failed to get hole %s: %s", pid, e)
+            progress.failed += 1
+            if checkpoint is not None:
+                checkpoint.fail(pid, e)
+            return
+        if hole is None:
+            # Deleted, hidden or still failing after the retries
+            progress.missing += 1
+            if checkpoint is not None:
+                checkpoint.fail(pid, "missing")
+            return
+        output.write(dataclasses.asdict(hole))
+        progress.done += 1
+        if checkpoint is not None:
+            checkpoint.done(pid)
+
+    try:
+        await _workers(pids, args.concurrency, handle)
+    finally:
+        output.close()
+
+
+async def _backfill(
+    client: TreeHoleClient, args: argparse.Namespace, progress: _Progress
+) -> None:
+    done = _done_pids(args.output)
+    output = _Output(args.output)
+
+    def on_hole(hole: Hole) -> None:
+        if hole.pid in done:
+            progress.skipped += 1
+            return
+        output.write(dataclasses.asdict(hole))
+        progress.done += 1
+
+    try:
+        _, errors = await client.backfill_async(
+            args.since,
+            args.until,
+            concurrency=args.concurrency,
+            start_pid=args.start_pid,
+            on_hole=on_hole,
+            checkpoint=_checkpoint(args),
+        )
+    finally:
+        output.close()
+    progress.count_errors(errors)
+
+
+async def _comments(
+    client: TreeHoleClient, args: argparse.Namespace, progress: _Progress
+) -> None:
+    pids = _read_pids(args)
+    checkpoint = _checkpoint(args)
+    if checkpoint is None:
+        done = _done_pids(args.output)
+    else:
+        done = set(checkpoint.completed(COMMENTS))
+    todo = [pid for pid in pids if pid not in done]
+    progress.total = len(todo)
+    progress.skipped = len(pids) - len(todo)
+    output = _Output(args.output)
+
+    async def handle(pid: int) -> None:
+        comments = []
+        page = 1
+        if checkpoint is not None:
+            # Continue a hole with many comments from the page it stopped at
+            page = checkpoint.cursor(str(pid), 1, COMMENTS)
+        while True:
+            try:
+                batch = await client.get_comment_async(pid, page, args.page_size)
+            except Exception as e:
+                logger.warning("Failed to get comments of hole %s: %s", pid, e)
+                progress.failed += 1
+                if checkpoint is not None:
+                    checkpoint.fail(pid, e, COMMENTS)
+                return
+            if batch is None:
+                progress.missing += 1
+                if checkpoint is not None:
+                    checkpoint.fail(pid, "missing", COMMENTS)
+                return
+            if checkpoint is None:
+                comments.extend(batch)
+            else:
+                # Pages are checkpointed, so a resumed run repeats at most one
+                for comment in batch:
+                    output.write(dataclasses.asdict(comment))
+            if len(batch) < args.page_size:
+                break
+            page += 1
+            if checkpoint is not None:
+                checkpoint.set_cursor(str(pid), page, COMMENTS)
+        if checkpoint is None:
+            # Write a hole's comments together so a resumed run never sees half
+            for comment in comments:
+                output.write(dataclasses.asdict(comment))
+        else:
+            checkpoint.done(pid, scope=COMMENTS)
+            if page > 1:
+                checkpoint.set_cursor(str(pid), None, COMMENTS)
+        progress.done += 1
+
+    try:
+        await _workers(todo, args.concurrency, handle)
+    finally:
+        output.close()
+
+
+async def _images(
+    client: TreeHoleClient, args: argparse.Namespace, progress: _Progress
+) -> None:
+    mirror = ImageMirror(args.directory)
+    holes: List[Hole] = []
+    values = list(args.pids)
+    if args.input is not None:
+        with open(args.input, encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line.startswith("{"):
+                    holes.append(Hole.from_data(json.loads(line)))
+                elif line:
+                    values.append(line)
+    pids = _parse_pids(values)
+    todo = [pid for pid in pids if pid not in mirror]
+    if todo:
+        # Plain pids carry no type, fetch the holes first
+        fetched, errors = await client.get_holes_by_ids_async(
+            todo, concurrency=args.concurrency, ordered=False
+        )
+        holes.extend(fetched)
+        progress.count_errors(errors)
+    progress.total = sum(hole.type == "image" for hole in holes)
+    report = await client.mirror_images_async(holes, mirror, args.concurrency)
+    progress.done += report.downloaded + report.duplicates
+    progress.skipped += report.skipped + len(pids) - len(todo)
+    progress.failed += len(report.failed)
+
+
+COMMANDS = {
+    "holes": _holes,
+    "backfill": _backfill,
+    "comments": _comments,
+    "images": _images,
+}
+
+
+CHECKPOINT_HELP = "checkpoint journal (default: OUTPUT.checkpoint)"
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="treehole",
+        description="PKU Hole bulk crawler. JSON Lines output is appended and "
+        "progress is journaled, so rerunning a command resumes it.",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("TREEHOLE_TOKEN"),
+        help="user token (default: $TREEHOLE_TOKEN)",
+    )
+    parser.add_argument("--base-url", help="API address (default: the live service)")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=10, help="concurrent requests"
+    )
+    parser.add_argument(
+        "--rate", type=float, help="max requests per second (adaptive, default: none)"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=2, help="retries per failed request"
+    )
+    parser.add_argument(
+        "--progress",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="progress report interval, 0 to disable",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="also log INFO (-v) or DEBUG (-vv), warnings are always shown",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    holes = commands.add_parser("holes", help="fetch a pid range")
+    holes.add_argument("start", type=int, help="lowest pid")
+    holes.add_argument("end", type=int, help="highest pid")
+    holes.add_argument("-o", "--output", default="holes.jsonl", help="output file")
+    holes.add_argument("--checkpoint", help=CHECKPOINT_HELP)
+
+    backfill = commands.add_parser("backfill", help="fetch holes posted since a time")
+    backfill.add_argument(
+        "--since", type=_parse_time, required=True, help="date or timestamp"
+    )
+    backfill.add_argument("--until", type=_parse_time, help="date or timestamp")
+    backfill.add_argument("--start-pid", type=int, help="newest pid to start from")
+    backfill.add_argument("-o", "--output", default="holes.jsonl", help="output file")
+    backfill.add_argument("--checkpoint", help=CHECKPOINT_HELP)
+
+    comments = commands.add_parser("comments", help="dump comments of holes")
+    comments.add_argument("pids", nargs="*", help="pids or ranges like 100-200")
+    comments.add_argument("-i", "--input", help="file with one pid or hole per line")
+    comments.add_argument("--page-size", type=int, default=500)
+    comments.add_argument(
+        "-o", "--output", default="comments.jsonl", help="output file"
+    )
+    comments.add_argument("--checkpoint", help=CHECKPOINT_HELP)
+
+    images = commands.add_parser("images", help="mirror images of holes")
+    images.add_argument("pids", nargs="*", help="pids or ranges like 100-200")
+    images.add_argument("-i", "--input", help="file with one pid or hole per line")
+    images.add_argument("-d", "--directory", default="images", help="mirror directory")
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> int:
+    stats = RequestStats()
+    rate_limiter = None
+    if args.rate is not None:
+        rate_limiter = RateLimiter(
+            rate=args.rate, min_rate=min(0.5, args.rate), max_rate=args.rate
+        )
+    client = TreeHoleClient(
+        token=args.token,
+        base_url=args.base_url,
+        connector_limit=args.concurrency,
+        rate_limiter=rate_limiter,
+        retry=RetryPolicy(max_attempts=args.retries + 1),
+        stats=stats,
+    )
+    progress = _Progress(stats)
+    reporter = None
+    if args.progress > 0:
+        reporter = asyncio.ensure_future(progress.report(args.progress))
+    try:
+        async with client:
+            await COMMANDS[args.command](client, args, progress)
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        print(str(progress), file=sys.stderr, flush=True)
+    return 1 if progress.failed else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    命令行入口（`treehole` 命令）
+
+    Returns
+    -------
+    1. 退出码：全部成功为 0，有获取失败的项目为 1
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("a token is required (--token or $TREEHOLE_TOKEN)")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be a positive integer")
+    level = (logging.WARNING, logging.INFO, logging.DEBUG)
+    logging.basicConfig(format="%(levelname)s %(name)s: %(message)s")
+    logger.setLevel(level[min(args.verbose, len(level) - 1)])
+    try:
+        return asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        print("Interrupted, run the same command again to resume", file=sys.stderr)
+        return 130
@@ -1,16 +1,61 @@
 """
 树洞客户端，处理收发请求
 """
-from functools import cache
-from typing import Dict, List, Optional, Tuple, Union
-
-import aiofiles
-import aiohttp
-import requests
-from requests.compat import urljoin
-
+import asyncio
+import datetime
+import inspect
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager
+from functools import cache, wraps
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from urllib.parse import urljoin
+
+from .batch import CommentBatch, HoleBatch
+from .cache import ResponseCache, SingleFlight
+from .checkpoint import Checkpoint
+from .mirror import ImageMirror, MirrorReport
 from .models import Comment, Hole, UserName
-from .utils import AuthError, EmptyError, logger
+from .ratelimit import RateLimiter, parse_retry_after
+from .retry import RetryPolicy
+from .stats import RequestStats
+from .storage import HoleStore
+from .stream import ArrayStream
+from .upload import ImageSource, MultipartStream, shrink_image
+from .utils import (
+    IMAGE_HEAD_SIZE,
+    AuthError,
+    EmptyError,
+    RequestError,
+    image_dimensions,
+    json_decoder,
+    lazy_import,
+    logger,
+)
+
+# The HTTP stacks are only imported once a sync or async request is made
+aiofiles = lazy_import("aiofiles")
+aiohttp = lazy_import("aiohttp")
+requests = lazy_import("requests")
 
 __all__ = ["TreeHoleClient"]
 
@@ -18,6 +63,211 @@ BASE_URL = "https://treehole.pku.edu.cn/api/"
 REQUEST_HEADER = {}
 BASE_QUERY = {}
 
+T = TypeVar("T")
+
+
+class _Backfill:
+    """
+    回溯抓取的共享调度状态
+
+    所有工作线程/协程共用一个递减的 pid 游标，空闲者直接领取下一个 pid；
+    遇到早于 `since` 的树洞后不再分发更小的 pid，连续 `max_gap` 个 pid
+    均无树洞（已删除或不存在）时同样停止。
+    使用断点日志时，只有交付过的（时间范围内的）pid 连同其时间戳记为完成，恢复时跳过这些 pid；
+    边界连同对应的 `since` 记为游标，只有新的 `since` 不早于记录时才沿用，放宽时间范围后重新抓取不会遗漏。
+    """
+
+    SCOPE = "backfill"
+    """断点日志中的记录分组"""
+
+    def __init__(
+        self,
+        start: int,
+        since: int,
+        until: Optional[int],
+        max_gap: int,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> None:
+        self.since = since
+        self.until = until
+        self.max_gap = max_gap
+        self.cursor = start
+        self.boundary = 0
+        self.lowest_hit = start + 1
+        self.results: List[Hole] = []
+        self.errors: Dict[int, Exception] = {}
+        self.lock = threading.Lock()
+        self.checkpoint = checkpoint
+        # pid -> timestamp of the holes finished by earlier runs
+        self.finished: Dict[int, Any] = {}
+        if checkpoint is not None:
+            checkpoint.set_cursor("start", start, self.SCOPE)
+            self.finished = checkpoint.completed(self.SCOPE)
+            boundary = checkpoint.cursor("boundary", scope=self.SCOPE)
+            if boundary is not None and boundary["since"] <= since:
+                self.boundary = boundary["pid"]
+            for pid, timestamp in self.finished.items():
+                self.lowest_hit = min(self.lowest_hit, pid)
+                if timestamp < since:
+                    self.boundary = max(self.boundary, pid)
+
+    def take(self) -> Optional[int]:
+        with self.lock:
+            while True:
+                pid = self.cursor
+                if pid <= self.boundary or self.lowest_hit - pid > self.max_gap:
+                    return None
+                self.cursor -= 1
+                if pid not in self.finished:
+                    return pid
+
+    def record(self, pid: int, hole: Optional[Hole]) -> bool:
+        """记录获取结果，返回树洞是否在时间范围内"""
+        with self.lock:
+            if hole is None or hole.timestamp is None:
+                self.errors[pid] = RequestError(f"Failed to get hole {pid}")
+                return False
+            self.lowest_hit = min(self.lowest_hit, pid)
+            if hole.timestamp < self.since:
+                self.boundary = max(self.boundary, pid)
+            elif self.until is None or hole.timestamp <= self.until:
+                self.results.append(hole)
+                return True
+            return False
+
+    def save(self, pid: int, hole: Optional[Hole], accepted: bool) -> None:
+        """将获取结果写入断点日志（在 `on_hole` 之后调用，交付过的树洞才记为完成）"""
+        if self.checkpoint is None:
+            return
+        if hole is None or hole.timestamp is None:
+            self.checkpoint.fail(pid, f"Failed to get hole {pid}", self.SCOPE)
+        elif accepted:
+            self.checkpoint.done(pid, hole.timestamp, self.SCOPE)
+        elif hole.timestamp < self.since and pid == self.boundary:
+            self.checkpoint.set_cursor(
+                "boundary", {"pid": pid, "since": self.since}, self.SCOPE
+            )
+
+    def fail(self, pid: int, error: Exception) -> None:
+        with self.lock:
+            self.errors[pid] = error
+        if self.checkpoint is not None:
+            self.checkpoint.fail(pid, error, self.SCOPE)
+
+    def collect(self) -> Tuple[List[Hole], Dict[int, Exception]]:
+        self.results.sort(key=lambda hole: hole.pid, reverse=True)
+        errors = {pid: e for pid, e in self.errors.items() if pid > self.boundary}
+        return self.results, errors
+
+
+def _freeze(value: Any) -> Any:
+    """将参数转为可哈希的形式，数字与字符串形式的 ID 视为相同"""
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_freeze, value))
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def _coalesced(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """启用合并时，参数相同的并发调用共享同一次请求与解析结果"""
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    async def wrapper(self: "TreeHoleClient", *args, **kwargs) -> T:
+        if self.single_flight is None:
+            return await method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(
+            _freeze(value) for name, value in bound.arguments.items() if name != "self"
+        )
+        return await self.single_flight.run(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def _download_range(
+    status: int, headers: Any, offset: int
+) -> Tuple[Optional[int], Optional[int]]:
+    """
+    解析下载响应
+
+    Returns
+    -------
+    1. 响应体在文件中的起始位置，状态码错误或无法从 `offset` 续传则返回 `None`
+    2. 文件总大小，未知则返回 `None`
+    """
+
+    if status == 200:
+        length = headers.get("Content-Length")
+        return 0, None if length is None else int(length)
+    match = re.fullmatch(
+        r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)", headers.get("Content-Range", "").strip()
+    )
+    if match is None:
+        return None, None
+    total = None if match.group(2) == "*" else int(match.group(2))
+    if status == 206 and match.group(1) is not None:
+        start = int(match.group(1))
+        return (start if start == offset else None), total
+    if status == 416 and total == offset:
+        # The partial file is already complete
+        return offset, total
+    return None, total
+
+
+def _check_image(
+    hole: Hole, size: int, total: Optional[int], head: bytes
+) -> Optional[bool]:
+    """
+    校验下载的图片
+
+    Returns
+    -------
+    1. `True` 为通过，`False` 为不完整（可续传），`None` 为已损坏（需重新下载）
+    """
+
+    if total is not None and size != total:
+        logger.error(
+            "Image of hole %s has %s bytes, expected %s", hole.pid, size, total
+        )
+        return False if size < total else None
+    dimensions = image_dimensions(head)
+    if dimensions is not None and hole.image_size and any(hole.image_size):
+        # Allow swapped sides for images rotated by EXIF orientation
+        if tuple(hole.image_size) not in (dimensions, dimensions[::-1]):
+            logger.warning(
+                "Image of hole %s is %sx%s, expected %sx%s",
+                hole.pid,
+                *dimensions,
+                *hole.image_size,
+            )
+    return True
+
+
+async def _maybe_await(value: Any) -> Any:
+    """同时支持同步与异步的调用（如文件对象的方法、回调函数）"""
+    return await value if inspect.isawaitable(value) else value
+
+
+def _to_timestamp(time_point: Union[datetime.datetime, int, float]) -> int:
+    if isinstance(time_point, datetime.datetime):
+        return int(time_point.timestamp())
+    return int(time_point)
+
+
+def _comment_text(text: str, reply_to: Optional[Union[int, str]]) -> str:
+    """评论实际发送的内容（回复他人时带有 `Re 昵称: ` 前缀）"""
+    if reply_to is None:
+        return text
+    if isinstance(reply_to, str):
+        assert reply_to in UserName, "Invalid reply_to"
+        reply_to = " ".join([x.capitalize() for x in reply_to.split()])
+    else:
+        reply_to = UserName[reply_to]
+    return f"Re {reply_to}: {text}"
+
 
 class TreeHoleClient:
     """
@@ -32,6 +282,20 @@ class TreeHoleClient:
         header: Optional[Dict[str, str]] = None,
         base_param: Optional[Dict[str, str]] = None,
         base_url: Optional[str] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        idle_timeout: Optional[float] = None,
+        connector_limit: int = 100,
+        connector_limit_per_host: int = 0,
+        dns_cache_ttl: Optional[int] = 300,
+        keepalive_timeout: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalesce: bool = False,
+        store: Optional[HoleStore] = None,
+        decoder: Optional[Callable[[bytes], Any]] = None,
+        stats: Optional[RequestStats] = None,
     ) -> None:
         """
         - token:
@@ -46,8 +310,56 @@ class TreeHoleClient:
             额外的请求参数，可选
         - base_url:
             其他树洞 API 地址，可选
+        - pool_connections:
+            同步连接池缓存的主机数，默认为 10
+        - pool_maxsize:
+            同步连接池中每个主机保持的最大连接数，默认为 10
+        - idle_timeout:
+            连接池空闲超时（秒），超时后下次请求前重建连接池，默认为 `None`（不超时）
+        - connector_limit:
+            异步连接池最大并发连接数，默认为 100（`0` 为不限制）
+        - connector_limit_per_host:
+            异步连接池中每个主机的最大并发连接数，默认为 0（不限制）
+        - dns_cache_ttl:
+            异步请求 DNS 缓存时间（秒），默认为 300，`None` 为永久缓存
+        - keepalive_timeout:
+            异步连接池空闲连接保持时间（秒），默认为 30
+        - rate_limiter:
+            请求速率限制器，同步与异步请求共用，默认为 `None`（不限速）
+        - retry:
+            请求重试策略，默认为 `None`（不重试）
+        - response_cache:
+            读取类接口的响应缓存，默认为 `None`（不缓存）
+        - coalesce:
+            是否合并参数相同的并发异步读取请求，合并后的调用者共享同一个结果对象，默认为 `False`
+        - store:
+            本地存储，读取树洞与评论时优先使用本地数据，并写回获取到的结果，默认为 `None`
+        - decoder:
+            解析响应体的 JSON 解码函数（接收 `bytes`），默认为 `None`（依次使用已安装的 `orjson`、`msgspec` 或标准库 `json`）
+        - stats:
+            请求统计，记录每次请求的状态码与响应大小，默认为 `None`（不统计）
         """
         self.__base_url = base_url or BASE_URL
+        self.__pool_connections = pool_connections
+        self.__pool_maxsize = pool_maxsize
+        self.__idle_timeout = idle_timeout
+        self.__session: Optional["requests.Session"] = None
+        self.__session_lock = threading.Lock()
+        self.__last_used = time.monotonic()
+        self.__connector_limit = connector_limit
+        self.__connector_limit_per_host = connector_limit_per_host
+        self.__dns_cache_ttl = dns_cache_ttl
+        self.__keepalive_timeout = keepalive_timeout
+        self.__async_session: Optional["aiohttp.ClientSession"] = None
+        self.__async_session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__async_session_guard: Optional[AsyncIterator[None]] = None
+        self.__rate_limiter = rate_limiter
+        self.__retry = retry or RetryPolicy(max_attempts=1)
+        self.__cache = response_cache
+        self.__single_flight = SingleFlight() if coalesce else None
+        self.__store = store
+        self.__decode = decoder or json_decoder()
+        self.__stats = stats
         if token:
             self.__token = token
         elif uid and password:
@@ -84,18 +396,356 @@ class TreeHoleClient:
         if not self.__is_num(uid):
             raise ValueError("uid must be an integer or string of interger")
         auth_data = {"uid": uid, "password": password}
-        response = requests.post(
+        response = self.__request(
+            "POST",
             self.login_url,
             data=auth_data,
         )
         if not self.__is_valid_response(response):
             return None
-        response_dict = response.json()
+        response_dict = self.__decode(response.content)
         if not response_dict["success"]:
             logger.error("Failed to login, response: %s", response_dict)
             return None
         return response_dict["data"]["jwt"]
 
+    def __new_session(self) -> "requests.Session":
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.__pool_connections,
+            pool_maxsize=self.__pool_maxsize,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def session(self) -> "requests.Session":
+        """同步请求会话，所有同步请求共用其中的连接池，只读"""
+        with self.__session_lock:
+            now = time.monotonic()
+            if self.__session is not None and (
+                self.__idle_timeout is not None
+                and now - self.__last_used > self.__idle_timeout
+            ):
+                logger.debug("Connection pool idle for too long, recreating")
+                self.__session.close()
+                self.__session = None
+            if self.__session is None:
+                self.__session = self.__new_session()
+            self.__last_used = now
+            return self.__session
+
+    def close(self) -> None:
+        """
+        关闭同步连接池，之后的请求会自动新建连接池
+        """
+        with self.__session_lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+
+    def __enter__(self) -> "TreeHoleClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def async_session(self) -> "aiohttp.ClientSession":
+        """
+        异步请求会话，所有异步请求共用其中的连接池，只读
+
+        首次在事件循环中访问时创建，事件循环变化后会自动重建；
+        事件循环结束时（如 `asyncio.run` 返回前）会话随之关闭，同一客户端可在多个事件循环中使用
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self.__async_session is None
+            or self.__async_session.closed
+            or self.__async_session_loop is not loop
+        ):
+            self.__release_async_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.__connector_limit,
+                limit_per_host=self.__connector_limit_per_host,
+                ttl_dns_cache=self.__dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.__keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            guard = self.__session_guard(session)
+            # Start the generator so that the running loop tracks it
+            try:
+                guard.asend(None).send(None)
+            except StopIteration:
+                pass
+            self.__async_session = session
+            self.__async_session_loop = loop
+            self.__async_session_guard = guard
+        return self.__async_session
+
+    @staticmethod
+    async def __session_guard(
+        session: "aiohttp.ClientSession",
+    ) -> AsyncIterator[None]:
+        """在事件循环关闭异步生成器时（`loop.shutdown_asyncgens`）关闭会话"""
+        try:
+            yield
+        finally:
+            if not session.closed:
+                await session.close()
+
+    def __release_async_session(self) -> None:
+        """放弃当前的异步会话，其连接池由所属事件循环关闭"""
+        loop = self.__async_session_loop
+        guard = self.__async_session_guard
+        self.__async_session = None
+        self.__async_session_loop = None
+        self.__async_session_guard = None
+        if guard is not None and loop is not None and loop.is_running():
+            # Still in use by another thread, close it there
+            asyncio.run_coroutine_threadsafe(guard.aclose(), loop)
+
+    async def aclose(self) -> None:
+        """
+        关闭异步连接池，之后的异步请求会自动新建连接池
+        """
+        guard = self.__async_session_guard
+        session = self.__async_session
+        self.__async_session = None
+        self.__async_session_loop = None
+        self.__async_session_guard = None
+        if guard is not None:
+            await guard.aclose()
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self) -> "TreeHoleClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+        self.close()
+
+    def __request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """发送同步请求，所有同步请求均经过此处"""
+        start = time.monotonic()
+        attempt = 0
+        body = kwargs.get("data")
+        while True:
+            attempt += 1
+            if isinstance(body, MultipartStream):
+                body.rewind()
+            if self.__rate_limiter is not None:
+                self.__rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if self.__stats is not None:
+                    self.__stats.record(None)
+                delay = self.__retry.next_delay(
+                    method, attempt, time.monotonic() - start, error=e
+                )
+                if delay is None or not self.__replayable(body):
+                    raise
+                logger.warning(
+                    "Request %s %s failed: %s, retrying in %.2fs", method, url, e, delay
+                )
+                time.sleep(delay)
+                continue
+            retry_after = response.headers.get("Retry-After")
+            if self.__stats is not None:
+                length = response.headers.get("Content-Length", "")
+                self.__stats.record(
+                    response.status_code, int(length) if length.isdigit() else None
+                )
+            if self.__rate_limiter is not None:
+                self.__rate_limiter.feedback(response.status_code, retry_after)
+            delay = self.__retry.next_delay(
+                method,
+                attempt,
+                time.monotonic() - start,
+                status=response.status_code,
+                retry_after=parse_retry_after(retry_after),
+            )
+            if delay is None or not self.__replayable(body):
+                return response
+            logger.warning(
+                "Request %s %s got status %s, retrying in %.2fs",
+                method,
+                url,
+                response.status_code,
+                delay,
+            )
+            response.close()
+            time.sleep(delay)
+
+    @staticmethod
+    def __replayable(body: Any) -> bool:
+        """请求体能否重新发送（流式上传的来源可能只能读取一次）"""
+        return not isinstance(body, MultipartStream) or body.replayable
+
+    @asynccontextmanager
+    async def __request_async(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator["aiohttp.ClientResponse"]:
+        """发送异步请求，所有异步请求均经过此处"""
+        start = time.monotonic()
+        attempt = 0
+        body = kwargs.get("data")
+        while True:
+            attempt += 1
+            if isinstance(body, MultipartStream):
+                # aiohttp sends async iterators as a stream, restarted on every attempt
+                kwargs["data"] = body.aiter()
+            if self.__rate_limiter is not None:
+                await self.__rate_limiter.acquire_async()
+            try:
+                response = await self.async_session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if self.__stats is not None:
+                    self.__stats.record(None)
+                delay = self.__retry.next_delay(
+                    method, attempt, time.monotonic() - start, error=e
+                )
+                if delay is None or not self.__replayable(body):
+                    raise
+                logger.warning(
+                    "Request %s %s failed: %s, retrying in %.2fs", method, url, e, delay
+                )
+                await asyncio.sleep(delay)
+                continue
+            retry_after = response.headers.get("Retry-After")
+            if self.__stats is not None:
+                self.__stats.record(response.status, response.content_length)
+            if self.__rate_limiter is not None:
+                self.__rate_limiter.feedback(response.status, retry_after)
+            delay = self.__retry.next_delay(
+                method,
+                attempt,
+                time.monotonic() - start,
+                status=response.status,
+                retry_after=parse_retry_after(retry_after),
+            )
+            if delay is None or not self.__replayable(body):
+                break
+            logger.warning(
+                "Request %s %s got status %s, retrying in %.2fs",
+                method,
+                url,
+                response.status,
+                delay,
+            )
+            response.release()
+            await asyncio.sleep(delay)
+        async with response:
+            yield response
+
+    def __get_json(
+        self, endpoint: str, url: str, params: Dict[str, str]
+    ) -> Optional[dict]:
+        """发送 GET 请求并解析 JSON，请求成功的结果会被缓存"""
+
+        def load() -> Tuple[Optional[dict], Optional[int]]:
+            response = self.__request("GET", url, params=params, headers=self.header)
+            if not self.__is_valid_response(response):
+                return None, None
+            response_dict = self.__decode(response.content)
+            return response_dict, (
+                len(response.content) if response_dict.get("success") else None
+            )
+
+        if self.__cache is None:
+            return load()[0]
+        return self.__cache.load(self.__cache.key(endpoint, url, params), load)
+
+    async def __get_json_async(
+        self, endpoint: str, url: str, params: Dict[str, str]
+    ) -> Optional[dict]:
+        """异步发送 GET 请求并解析 JSON，请求成功的结果会被缓存"""
+
+        async def load() -> Tuple[Optional[dict], Optional[int]]:
+            async with self.__request_async(
+                "GET", url, params=params, headers=self.header
+            ) as response:
+                if not self.__is_valid_client_response(response):
+                    return None, None
+                body = await response.read()
+                response_dict = self.__decode(body)
+                return response_dict, (
+                    len(body) if response_dict.get("success") else None
+                )
+
+        if self.__cache is None:
+            return (await load())[0]
+        return await self.__cache.load_async(
+            self.__cache.key(endpoint, url, params), load
+        )
+
+    def __get_image(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """获取图片，请求成功的结果会被缓存"""
+
+        def load() -> Tuple[Optional[Tuple[bytes, str]], Optional[int]]:
+            response = self.__request("GET", url, headers=self.header)
+            if not self.__is_valid_response(response):
+                return None, None
+            content = response.content
+            return (content, response.headers["Content-Type"]), len(content)
+
+        if self.__cache is None:
+            return load()[0]
+        return self.__cache.load(self.__cache.key("image", url), load)
+
+    async def __get_image_async(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """异步获取图片，请求成功的结果会被缓存"""
+
+        async def load() -> Tuple[Optional[Tuple[bytes, str]], Optional[int]]:
+            async with self.__request_async(
+                "GET", url, headers=self.header
+            ) as response:
+                if not self.__is_valid_client_response(response):
+                    return None, None
+                content = await response.read()
+                return (content, response.headers["Content-Type"]), len(content)
+
+        if self.__cache is None:
+            return (await load())[0]
+        return await self.__cache.load_async(self.__cache.key("image", url), load)
+
+    def __invalidate(self, endpoint: str, url: Optional[str] = None) -> None:
+        if self.__cache is not None:
+            self.__cache.invalidate(endpoint, url)
+
+    def __invalidate_followed(self, pid: Union[int, str]) -> None:
+        self.__invalidate("hole", urljoin(self.hole_url, str(pid)))
+        self.__invalidate("followed")
+        if self.__store is not None:
+            self.__store.expire_hole(pid)
+
+    def __invalidate_comments(self, pid: Union[int, str]) -> None:
+        self.__invalidate("comment", urljoin(self.comment_url, str(pid)))
+        if self.__store is not None:
+            self.__store.expire_comments(pid)
+
+    def __save_holes(self, holes: Optional[Iterable[Hole]]) -> Optional[Iterable[Hole]]:
+        if self.__store is not None and holes:
+            self.__store.put_holes(holes)
+        return holes
+
+    def __save_comments(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str],
+        page_size: Union[int, str],
+        comments: Optional[Iterable[Comment]],
+    ) -> Optional[Iterable[Comment]]:
+        if self.__store is not None and comments is not None:
+            # A short first page means we have seen every comment of the hole
+            complete = int(page) == 1 and len(comments) < int(page_size)
+            self.__store.put_comments(comments, int(pid) if complete else None)
+        return comments
+
     @property
     def token(self) -> str:
         """用户 token，只读"""
@@ -111,6 +761,41 @@ class TreeHoleClient:
         """请求参数，只读"""
         return self.__base_param
 
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """请求速率限制器，只读"""
+        return self.__rate_limiter
+
+    @property
+    def retry(self) -> RetryPolicy:
+        """请求重试策略，只读"""
+        return self.__retry
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """响应缓存，只读"""
+        return self.__cache
+
+    @property
+    def single_flight(self) -> Optional[SingleFlight]:
+        """异步读取请求合并器（含合并次数统计），未启用合并时为 `None`，只读"""
+        return self.__single_flight
+
+    @property
+    def decoder(self) -> Callable[[bytes], Any]:
+        """JSON 解码函数，只读"""
+        return self.__decode
+
+    @property
+    def store(self) -> Optional[HoleStore]:
+        """本地存储，只读"""
+        return self.__store
+
+    @property
+    def stats(self) -> Optional[RequestStats]:
+        """请求统计，只读"""
+        return self.__stats
+
     @property
     def base_url(self) -> str:
         """请求地址，只读"""
@@ -180,7 +865,7 @@ class TreeHoleClient:
         return True
 
     @staticmethod
-    def __is_valid_response(response: requests.Response) -> bool:
+    def __is_valid_response(response: "requests.Response") -> bool:
         if response.status_code != 200:
             logger.error(
                 "Failed to get reponse, status code: %s, response: %s",
@@ -192,7 +877,7 @@ class TreeHoleClient:
             return True
 
     @staticmethod
-    def __is_valid_client_response(response: aiohttp.ClientResponse) -> bool:
+    def __is_valid_client_response(response: "aiohttp.ClientResponse") -> bool:
         if response.status != 200:
             logger.error(
                 "Failed to get reponse, status code: %s, response: %s",
@@ -219,13 +904,12 @@ class TreeHoleClient:
         """
 
         if hole.type == "image":
-            response = requests.get(
-                urljoin(self.image_url, str(hole.pid)), headers=self.header
-            )
-            if self.__is_valid_response(response):
-                return response.content, response.headers["Content-Type"]
+            image = self.__get_image(urljoin(self.image_url, str(hole.pid)))
+            if image is not None:
+                return image
         return (None, None)
 
+    @_coalesced
     async def get_hole_image_async(
         self, hole: Hole
     ) -> Union[Tuple[bytes, str], Tuple[None, None]]:
@@ -243,18 +927,310 @@ class TreeHoleClient:
         """
 
         if hole.type == "image":
-            async with aiohttp.request(
-                "GET",
-                urljoin(self.image_url, str(hole.pid)),
-                headers=self.header,
-            ) as response:
-                if self.__is_valid_client_response(response):
-                    return (
-                        await response.content.read(),
-                        response.headers["Content-Type"],
-                    )
+            image = await self.__get_image_async(urljoin(self.image_url, str(hole.pid)))
+            if image is not None:
+                return image
         return (None, None)
 
+    def download_hole_image(
+        self,
+        hole: Hole,
+        dest: Union[str, "os.PathLike[str]", BinaryIO],
+        chunk_size: int = 64 * 1024,
+    ) -> Optional[int]:
+        """
+        流式下载树洞图片到文件或可写对象，不在内存中保存整张图片
+
+        下载到路径时先写入 `<dest>.part`，中断后再次调用会通过 HTTP Range 从断点续传，
+        完成并校验后重命名为 `dest`。校验内容包括文件大小（`Content-Length`），以及在能识别
+        图片格式时与 `Hole.image_size` 比较宽高（不一致时仅记录警告）。不经过响应缓存。
+
+        Parameters
+        ----------
+        - hole: 任一树洞类
+        - dest: 文件路径，或可写入二进制数据的对象（此时不支持续传）
+        - chunk_size: 每次从连接读取的字节数，默认为 64 KiB
+
+        Returns
+        -------
+        1. 图片大小（字节），不包含图片、请求错误或校验失败则返回 `None`
+        """
+
+        if hole.type != "image":
+            return None
+        url = urljoin(self.image_url, str(hole.pid))
+        if not isinstance(dest, (str, os.PathLike)):
+            size, checked = self.__download(url, hole, dest, 0, chunk_size)
+            return size if checked else None
+        part = os.fspath(dest) + ".part"
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        with open(part, "r+b" if offset else "wb") as file:
+            size, checked = self.__download(url, hole, file, offset, chunk_size)
+        if checked:
+            os.replace(part, dest)
+            return size
+        if checked is None:
+            # Corrupted, start over next time
+            os.remove(part)
+        return None
+
+    async def download_hole_image_async(
+        self,
+        hole: Hole,
+        dest: Union[str, "os.PathLike[str]", Any],
+        chunk_size: int = 64 * 1024,
+    ) -> Optional[int]:
+        """
+        异步流式下载树洞图片到文件或可写对象，不在内存中保存整张图片
+
+        下载到路径时先写入 `<dest>.part`（通过 `aiofiles`），中断后再次调用会通过 HTTP Range
+        从断点续传，完成并校验后重命名为 `dest`。校验内容包括文件大小（`Content-Length`），
+        以及在能识别图片格式时与 `Hole.image_size` 比较宽高（不一致时仅记录警告）。不经过响应缓存。
+
+        Parameters
+        ----------
+        - hole: 任一树洞类
+        - dest: 文件路径，或可写入二进制数据的对象（`write` 可以是同步或异步方法，此时不支持续传）
+        - chunk_size: 每次从连接读取的字节数，默认为 64 KiB
+
+        Returns
+        -------
+        1. 图片大小（字节），不包含图片、请求错误或校验失败则返回 `None`
+        """
+
+        if hole.type != "image":
+            return None
+        url = urljoin(self.image_url, str(hole.pid))
+        if not isinstance(dest, (str, os.PathLike)):
+            size, checked = await self.__download_async(url, hole, dest, 0, chunk_size)
+            return size if checked else None
+        part = os.fspath(dest) + ".part"
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        async with aiofiles.open(part, "r+b" if offset else "wb") as file:
+            size, checked = await self.__download_async(
+                url, hole, file, offset, chunk_size
+            )
+        if checked:
+            os.replace(part, dest)
+            return size
+        if checked is None:
+            # Corrupted, start over next time
+            os.remove(part)
+        return None
+
+    def __download(
+        self, url: str, hole: Hole, file: BinaryIO, offset: int, chunk_size: int
+    ) -> Tuple[Optional[int], Optional[bool]]:
+        """
+        下载到文件对象，`offset` 为已下载的字节数（此时文件需可读写）
+
+        返回下载后的大小与 `_check_image` 的校验结果
+        """
+        head = b""
+        headers = self.header
+        if offset:
+            file.seek(0)
+            head = file.read(IMAGE_HEAD_SIZE)
+            headers = {**headers, "Range": f"bytes={offset}-"}
+        response = self.__request("GET", url, headers=headers, stream=True)
+        with response:
+            start, total = _download_range(
+                response.status_code, response.headers, offset
+            )
+            if start is None:
+                logger.error(
+                    "Failed to download image, status code: %s, response: %s",
+                    response.status_code,
+                    response.reason,
+                )
+                # 416 here means the partial file is larger than the image
+                return None, (None if response.status_code == 416 else False)
+            size = start
+            if response.status_code != 416:
+                if offset:
+                    file.seek(start)
+                    file.truncate()
+                    head = head[:start]
+                for chunk in response.iter_content(chunk_size):
+                    file.write(chunk)
+                    size += len(chunk)
+                    if len(head) < IMAGE_HEAD_SIZE:
+                        head += chunk[: IMAGE_HEAD_SIZE - len(head)]
+        return size, _check_image(hole, size, total, head)
+
+    async def __download_async(
+        self, url: str, hole: Hole, file: Any, offset: int, chunk_size: int
+    ) -> Tuple[Optional[int], Optional[bool]]:
+        """
+        异步下载到文件对象，`offset` 为已下载的字节数（此时文件需可读写）
+
+        返回下载后的大小与 `_check_image` 的校验结果
+        """
+        head = b""
+        headers = self.header
+        if offset:
+            await _maybe_await(file.seek(0))
+            head = await _maybe_await(file.read(IMAGE_HEAD_SIZE))
+            headers = {**headers, "Range": f"bytes={offset}-"}
+        async with self.__request_async("GET", url, headers=headers) as response:
+            start, total = _download_range(response.status, response.headers, offset)
+            if start is None:
+                logger.error(
+                    "Failed to download image, status code: %s, response: %s",
+                    response.status,
+                    response.reason,
+                )
+                # 416 here means the partial file is larger than the image
+                return None, (None if response.status == 416 else False)
+            size = start
+            if response.status != 416:
+                if offset:
+                    await _maybe_await(file.seek(start))
+                    await _maybe_await(file.truncate())
+                    head = head[:start]
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    await _maybe_await(file.write(chunk))
+                    size += len(chunk)
+                    if len(head) < IMAGE_HEAD_SIZE:
+                        head += chunk[: IMAGE_HEAD_SIZE - len(head)]
+        return size, _check_image(hole, size, total, head)
+
+    def mirror_images(
+        self,
+        holes: Iterable[Hole],
+        directory: Union[str, "os.PathLike[str]", ImageMirror],
+        concurrency: int = 8,
+    ) -> MirrorReport:
+        """
+        批量镜像树洞图片（多线程并发），按内容哈希存储
+
+        非图片树洞被忽略，清单中已有的树洞不发送任何请求，内容相同的图片只保存一份
+
+        Parameters
+        ----------
+        - holes: 树洞序列，可以为任意可迭代对象（按需读取）
+        - directory: 镜像目录或 `ImageMirror`
+        - concurrency: 最大并发请求数，默认为 8
+
+        Returns
+        -------
+        1. 本次镜像的统计（下载数、跳过数、失败的树洞及吞吐量等）
+        """
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        mirror = (
+            directory if isinstance(directory, ImageMirror) else ImageMirror(directory)
+        )
+        report = MirrorReport()
+        start = time.monotonic()
+        todo = self.__mirror_todo(holes, mirror, report)
+        lock = threading.Lock()
+
+        def worker() -> None:
+            while True:
+                with lock:
+                    hole = next(todo, None)
+                if hole is None:
+                    return
+                try:
+                    content, content_type = self.get_hole_image(hole)
+                    if content is None:
+                        raise RequestError(f"Failed to get image of hole {hole.pid}")
+                    new = mirror.add(hole.pid, content, content_type)
+                except Exception as e:
+                    with lock:
+                        report.failed[hole.pid] = e
+                    continue
+                with lock:
+                    self.__count_mirrored(report, content, new)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        return self.__finish_mirror(report, start)
+
+    async def mirror_images_async(
+        self,
+        holes: Iterable[Hole],
+        directory: Union[str, "os.PathLike[str]", ImageMirror],
+        concurrency: int = 10,
+    ) -> MirrorReport:
+        """
+        异步批量镜像树洞图片，按内容哈希存储
+
+        非图片树洞被忽略，清单中已有的树洞不发送任何请求，内容相同的图片只保存一份
+
+        Parameters
+        ----------
+        - holes: 树洞序列，可以为任意可迭代对象（按需读取）
+        - directory: 镜像目录或 `ImageMirror`
+        - concurrency: 最大并发请求数，默认为 10
+
+        Returns
+        -------
+        1. 本次镜像的统计（下载数、跳过数、失败的树洞及吞吐量等）
+        """
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        mirror = (
+            directory if isinstance(directory, ImageMirror) else ImageMirror(directory)
+        )
+        report = MirrorReport()
+        start = time.monotonic()
+        todo = self.__mirror_todo(holes, mirror, report)
+
+        async def worker() -> None:
+            for hole in todo:
+                try:
+                    content, content_type = await self.get_hole_image_async(hole)
+                    if content is None:
+                        raise RequestError(f"Failed to get image of hole {hole.pid}")
+                    new = await mirror.add_async(hole.pid, content, content_type)
+                except Exception as e:
+                    report.failed[hole.pid] = e
+                    continue
+                self.__count_mirrored(report, content, new)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return self.__finish_mirror(report, start)
+
+    @staticmethod
+    def __mirror_todo(
+        holes: Iterable[Hole], mirror: ImageMirror, report: MirrorReport
+    ) -> Iterator[Hole]:
+        """需要下载的图片树洞，跳过已镜像的树洞"""
+        for hole in holes:
+            if hole.type != "image" or hole.pid is None:
+                continue
+            if hole.pid in mirror:
+                report.skipped += 1
+                continue
+            yield hole
+
+    @staticmethod
+    def __count_mirrored(report: MirrorReport, content: bytes, new: bool) -> None:
+        report.downloaded += 1
+        report.bytes += len(content)
+        if not new:
+            report.duplicates += 1
+
+    @staticmethod
+    def __finish_mirror(report: MirrorReport, start: float) -> MirrorReport:
+        report.elapsed = time.monotonic() - start
+        logger.info(
+            "Mirrored %s images (%s duplicates, %s skipped, %s failed), "
+            "%.1f images/s, %.1f KiB/s",
+            report.downloaded,
+            report.duplicates,
+            report.skipped,
+            len(report.failed),
+            report.images_per_second,
+            report.bytes_per_second / 1024,
+        )
+        return report
+
     def get_comment(
         self,
         pid: Union[int, str],
@@ -285,17 +1261,26 @@ class TreeHoleClient:
             **self.base_param,
             **{"page": str(page), "limit": str(page_size)},
         }
-        response = requests.get(
-            urljoin(self.comment_url, str(pid)), params=param, headers=self.header
+        if self.__store is not None:
+            comments = self.__store.get_comments(pid, page, page_size)
+            if comments is not None:
+                return comments
+        response_dict = self.__get_json(
+            "comment", urljoin(self.comment_url, str(pid)), param
         )
-        if not self.__is_valid_response(response):
+        if response_dict is None:
             return None
-        response_dict = response.json()
         if not response_dict["success"]:
             logger.error("Failed to get comment, response: %s", response_dict)
             return None
-        return list(map(Comment.from_data, response_dict["data"]["data"]))
+        return self.__save_comments(
+            pid,
+            page,
+            page_size,
+            Comment.from_list(response_dict["data"]["data"]),
+        )
 
+    @_coalesced
     async def get_comment_async(
         self,
         pid: Union[int, str],
@@ -326,19 +1311,246 @@ class TreeHoleClient:
             **self.base_param,
             **{"page": str(page), "limit": str(page_size)},
         }
-        async with aiohttp.request(
+        if self.__store is not None:
+            comments = self.__store.get_comments(pid, page, page_size)
+            if comments is not None:
+                return comments
+        response_dict = await self.__get_json_async(
+            "comment", urljoin(self.comment_url, str(pid)), param
+        )
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get comment, response: %s", response_dict)
+            return None
+        return self.__save_comments(
+            pid,
+            page,
+            page_size,
+            Comment.from_list(response_dict["data"]["data"]),
+        )
+
+    def get_comment_batch(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 500,
+    ) -> Optional[CommentBatch]:
+        """
+        获取树洞评论，结果为列式批量数据
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - page: 页码，默认为 1
+        - page_size: 每页评论数，默认为 500
+
+        Returns
+        -------
+        1. 评论的批量数据，请求错误则返回 `None`
+        """
+
+        if not self.__is_num(pid):
+            raise ValueError("pid must be an integer or string of interger")
+        if not self.__is_num(page):
+            raise ValueError("page must be an integer or string of interger")
+        if not self.__is_num(page_size):
+            raise ValueError("page_size must be an integer or string of interger")
+        param = {
+            **self.base_param,
+            **{"page": str(page), "limit": str(page_size)},
+        }
+        if self.__store is not None:
+            comments = self.__store.get_comments(pid, page, page_size)
+            if comments is not None:
+                return CommentBatch.from_data([comment.data for comment in comments])
+        response_dict = self.__get_json(
+            "comment", urljoin(self.comment_url, str(pid)), param
+        )
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get comment, response: %s", response_dict)
+            return None
+        return self.__save_comments(
+            pid, page, page_size, CommentBatch.from_data(response_dict["data"]["data"])
+        )
+
+    @_coalesced
+    async def get_comment_batch_async(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 500,
+    ) -> Optional[CommentBatch]:
+        """
+        异步获取树洞评论，结果为列式批量数据
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - page: 页码，默认为 1
+        - page_size: 每页评论数，默认为 500
+
+        Returns
+        -------
+        1. 评论的批量数据，请求错误则返回 `None`
+        """
+
+        if not self.__is_num(pid):
+            raise ValueError("pid must be an integer or string of interger")
+        if not self.__is_num(page):
+            raise ValueError("page must be an integer or string of interger")
+        if not self.__is_num(page_size):
+            raise ValueError("page_size must be an integer or string of interger")
+        param = {
+            **self.base_param,
+            **{"page": str(page), "limit": str(page_size)},
+        }
+        if self.__store is not None:
+            comments = self.__store.get_comments(pid, page, page_size)
+            if comments is not None:
+                return CommentBatch.from_data([comment.data for comment in comments])
+        response_dict = await self.__get_json_async(
+            "comment", urljoin(self.comment_url, str(pid)), param
+        )
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get comment, response: %s", response_dict)
+            return None
+        return self.__save_comments(
+            pid, page, page_size, CommentBatch.from_data(response_dict["data"]["data"])
+        )
+
+    def iter_comment_stream(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 500,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[Comment]:
+        """
+        流式获取一页树洞评论，边下载边解析，逐个产出评论
+
+        首条评论无需等待整个响应体下载完成，内存占用与单条评论相当而非整页；不经过响应缓存
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - page: 页码，默认为 1
+        - page_size: 每页评论数，默认为 500
+        - chunk_size: 每次从连接读取的字节数，默认为 64 KiB
+
+        Returns
+        -------
+        1. 评论迭代器，请求错误时结束
+        """
+
+        if not self.__is_num(pid):
+            raise ValueError("pid must be an integer or string of interger")
+        if not self.__is_num(page):
+            raise ValueError("page must be an integer or string of interger")
+        if not self.__is_num(page_size):
+            raise ValueError("page_size must be an integer or string of interger")
+        param = {
+            **self.base_param,
+            **{"page": str(page), "limit": str(page_size)},
+        }
+        stream = ArrayStream()
+        count = 0
+        response = self.__request(
+            "GET",
+            urljoin(self.comment_url, str(pid)),
+            params=param,
+            headers=self.header,
+            stream=True,
+        )
+        with response:
+            if not self.__is_valid_response(response):
+                return
+            for chunk in response.iter_content(chunk_size):
+                comments = Comment.from_list(map(self.__decode, stream.feed(chunk)))
+                count += len(comments)
+                if self.__store is not None:
+                    self.__store.put_comments(comments)
+                yield from comments
+        if not stream.found:
+            logger.error(
+                "Failed to get comment, response: %s", self.__decode(stream.buffer)
+            )
+        elif (
+            self.__store is not None
+            and stream.done
+            and int(page) == 1
+            and count < int(page_size)
+        ):
+            # A short first page means we have seen every comment of the hole
+            self.__store.put_comments((), int(pid))
+
+    async def iter_comment_stream_async(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 500,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[Comment]:
+        """
+        异步流式获取一页树洞评论，边下载边解析，逐个产出评论
+
+        首条评论无需等待整个响应体下载完成，内存占用与单条评论相当而非整页；不经过响应缓存
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - page: 页码，默认为 1
+        - page_size: 每页评论数，默认为 500
+        - chunk_size: 每次从连接读取的字节数，默认为 64 KiB
+
+        Returns
+        -------
+        1. 评论迭代器，请求错误时结束
+        """
+
+        if not self.__is_num(pid):
+            raise ValueError("pid must be an integer or string of interger")
+        if not self.__is_num(page):
+            raise ValueError("page must be an integer or string of interger")
+        if not self.__is_num(page_size):
+            raise ValueError("page_size must be an integer or string of interger")
+        param = {
+            **self.base_param,
+            **{"page": str(page), "limit": str(page_size)},
+        }
+        stream = ArrayStream()
+        count = 0
+        async with self.__request_async(
             "GET",
             urljoin(self.comment_url, str(pid)),
             params=param,
             headers=self.header,
         ) as response:
             if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.error("Failed to get comment, response: %s", response_dict)
-                return None
-            return list(map(Comment.from_data, response_dict["data"]["data"]))
+                return
+            async for chunk in response.content.iter_chunked(chunk_size):
+                comments = Comment.from_list(map(self.__decode, stream.feed(chunk)))
+                count += len(comments)
+                if self.__store is not None:
+                    self.__store.put_comments(comments)
+                for comment in comments:
+                    yield comment
+        if not stream.found:
+            logger.error(
+                "Failed to get comment, response: %s", self.__decode(stream.buffer)
+            )
+        elif (
+            self.__store is not None
+            and stream.done
+            and int(page) == 1
+            and count < int(page_size)
+        ):
+            # A short first page means we have seen every comment of the hole
+            self.__store.put_comments((), int(pid))
 
     def get_hole(self, pid: Union[int, str]) -> Optional[Hole]:
         """
@@ -355,19 +1567,23 @@ class TreeHoleClient:
 
         if not self.__is_num(pid):
             raise ValueError("pid must be an integer or string of interger")
-        response = requests.get(
-            urljoin(self.hole_url, str(pid)),
-            params=self.base_param,
-            headers=self.header,
+        if self.__store is not None:
+            hole = self.__store.get_hole(pid)
+            if hole is not None:
+                return hole
+        response_dict = self.__get_json(
+            "hole", urljoin(self.hole_url, str(pid)), self.base_param
         )
-        if not self.__is_valid_response(response):
+        if response_dict is None:
             return None
-        response_dict = response.json()
         if not response_dict["success"]:
             logger.error("Failed to get hole, response: %s", response_dict)
             return None
-        return Hole.from_data(response_dict["data"])
+        hole = Hole.from_data(response_dict["data"])
+        self.__save_holes([hole])
+        return hole
 
+    @_coalesced
     async def get_hole_async(self, pid: Union[int, str]) -> Optional[Hole]:
         """
         异步获取单个树洞
@@ -383,25 +1599,215 @@ class TreeHoleClient:
 
         if not self.__is_num(pid):
             raise ValueError("pid must be an integer or string of interger")
-        async with aiohttp.request(
-            "GET",
-            urljoin(self.hole_url, str(pid)),
-            params=self.base_param,
-            headers=self.header,
-        ) as response:
-            if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.error("Failed to get hole, response: %s", response_dict)
-                return None
-            return Hole.from_data(response_dict["data"])
+        if self.__store is not None:
+            hole = self.__store.get_hole(pid)
+            if hole is not None:
+                return hole
+        response_dict = await self.__get_json_async(
+            "hole", urljoin(self.hole_url, str(pid)), self.base_param
+        )
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get hole, response: %s", response_dict)
+            return None
+        hole = Hole.from_data(response_dict["data"])
+        self.__save_holes([hole])
+        return hole
+
+    @staticmethod
+    def __save_progress(
+        checkpoint: Optional[Checkpoint],
+        pid: Union[int, str],
+        error: Optional[Exception],
+    ) -> None:
+        if checkpoint is None:
+            return
+        if error is None:
+            checkpoint.done(pid)
+        else:
+            checkpoint.fail(pid, error)
+
+    @staticmethod
+    def __collect_holes(results: List[Tuple[int, Hole]], ordered: bool) -> List[Hole]:
+        if ordered:
+            results.sort(key=lambda item: item[0])
+        return [hole for _, hole in results]
+
+    def get_holes_by_ids(
+        self,
+        pids: Iterable[Union[int, str]],
+        concurrency: int = 8,
+        ordered: bool = True,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Tuple[List[Hole], Dict[Union[int, str], Exception]]:
+        """
+        批量获取树洞（多线程并发）
+
+        并发数超过 `pool_maxsize` 时多余的连接不会被复用，建议两者保持一致
+
+        Parameters
+        ----------
+        - pids: 树洞 ID 序列，可以为任意可迭代对象（按需读取）
+        - concurrency: 最大并发请求数，默认为 8
+        - ordered: 是否按输入顺序返回，否则按完成顺序返回，默认为 `True`
+        - checkpoint: 断点日志，可选；已完成的 ID 直接跳过（不在返回结果中），获取结果随时记入日志
+
+        Returns
+        -------
+        1. 成功获取的树洞列表
+        2. 获取失败的树洞 ID 及其错误
+        """
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        results: List[Tuple[int, Hole]] = []
+        errors: Dict[Union[int, str], Exception] = {}
+        if checkpoint is not None:
+            pids = (pid for pid in pids if not checkpoint.is_done(pid))
+        todo = enumerate(pids)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = {
+                executor.submit(self.get_hole, pid): (index, pid)
+                for index, pid in islice(todo, concurrency)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, pid = pending.pop(future)
+                    try:
+                        hole = future.result()
+                    except Exception as e:
+                        errors[pid] = e
+                    else:
+                        if hole is None:
+                            errors[pid] = RequestError(f"Failed to get hole {pid}")
+                        else:
+                            results.append((index, hole))
+                    self.__save_progress(checkpoint, pid, errors.get(pid))
+                    for index, pid in islice(todo, 1):
+                        pending[executor.submit(self.get_hole, pid)] = (index, pid)
+        return self.__collect_holes(results, ordered), errors
+
+    async def get_holes_by_ids_async(
+        self,
+        pids: Iterable[Union[int, str]],
+        concurrency: int = 10,
+        ordered: bool = True,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Tuple[List[Hole], Dict[Union[int, str], Exception]]:
+        """
+        异步批量获取树洞
+
+        Parameters
+        ----------
+        - pids: 树洞 ID 序列，可以为任意可迭代对象（按需读取）
+        - concurrency: 最大并发请求数，默认为 10
+        - ordered: 是否按输入顺序返回，否则按完成顺序返回，默认为 `True`
+        - checkpoint: 断点日志，可选；已完成的 ID 直接跳过（不在返回结果中），获取结果随时记入日志
+
+        Returns
+        -------
+        1. 成功获取的树洞列表
+        2. 获取失败的树洞 ID 及其错误
+        """
+
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        results: List[Tuple[int, Hole]] = []
+        errors: Dict[Union[int, str], Exception] = {}
+        if checkpoint is not None:
+            pids = (pid for pid in pids if not checkpoint.is_done(pid))
+        todo = enumerate(pids)
+
+        async def worker() -> None:
+            # All workers pull from the same iterator, so an idle worker
+            # immediately takes the next pid without any polling
+            for index, pid in todo:
+                try:
+                    hole = await self.get_hole_async(pid)
+                except Exception as e:
+                    errors[pid] = e
+                else:
+                    if hole is None:
+                        errors[pid] = RequestError(f"Failed to get hole {pid}")
+                    else:
+                        results.append((index, hole))
+                self.__save_progress(checkpoint, pid, errors.get(pid))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return self.__collect_holes(results, ordered), errors
 
     def get_holes(
         self, page: Union[int, str] = 1, page_size: Union[int, str] = 25
     ) -> Optional[List[Hole]]:
         """
-        获取首页树洞
+        获取首页树洞
+
+        Parameters
+        ----------
+        - page: 列表页码，默认为 1
+        - page_size: 每页数量，默认为 25
+
+        Returns
+        -------
+        1. 首页树洞列表，请求错误则返回 `None`
+        """
+
+        if not self.__is_num(page):
+            raise ValueError("page must be an integer or string of interger")
+        if not self.__is_num(page_size):
+            raise ValueError("page_size must be an integer or string of interger")
+        param = {
+            **self.base_param,
+            **{"page": str(page), "limit": str(page_size)},
+        }
+        response_dict = self.__get_json("holes", self.holes_url, param)
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get hole list, response: %s", response_dict)
+            return None
+        return self.__save_holes(Hole.from_list(response_dict["data"]["data"]))
+
+    @_coalesced
+    async def get_holes_async(
+        self, page: Union[int, str] = 1, page_size: Union[int, str] = 25
+    ) -> Optional[List[Hole]]:
+        """
+        异步获取首页树洞
+
+        Parameters
+        ----------
+        - page: 列表页码，默认为 1
+        - page_size: 每页数量，默认为 25
+
+        Returns
+        -------
+        1. 首页树洞列表，请求错误则返回 `None`
+        """
+
+        if not self.__is_num(page):
+            raise ValueError("page must be an integer or string of interger")
+        if not self.__is_num(page_size):
+            raise ValueError("page_size must be an integer or string of interger")
+        param = {
+            **self.base_param,
+            **{"page": str(page), "limit": str(page_size)},
+        }
+        response_dict = await self.__get_json_async("holes", self.holes_url, param)
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get hole list, response: %s", response_dict)
+            return None
+        return self.__save_holes(Hole.from_list(response_dict["data"]["data"]))
+
+    def get_holes_batch(
+        self, page: Union[int, str] = 1, page_size: Union[int, str] = 25
+    ) -> Optional[HoleBatch]:
+        """
+        获取首页树洞，结果为列式批量数据
 
         Parameters
         ----------
@@ -410,7 +1816,7 @@ class TreeHoleClient:
 
         Returns
         -------
-        1. 首页树洞列表，请求错误则返回 `None`
+        1. 首页树洞的批量数据，请求错误则返回 `None`
         """
 
         if not self.__is_num(page):
@@ -421,20 +1827,20 @@ class TreeHoleClient:
             **self.base_param,
             **{"page": str(page), "limit": str(page_size)},
         }
-        response = requests.get(self.holes_url, params=param, headers=self.header)
-        if not self.__is_valid_response(response):
+        response_dict = self.__get_json("holes", self.holes_url, param)
+        if response_dict is None:
             return None
-        response_dict = response.json()
         if not response_dict["success"]:
             logger.error("Failed to get hole list, response: %s", response_dict)
             return None
-        return list(map(Hole.from_data, response_dict["data"]["data"]))
+        return self.__save_holes(HoleBatch.from_data(response_dict["data"]["data"]))
 
-    async def get_holes_async(
+    @_coalesced
+    async def get_holes_batch_async(
         self, page: Union[int, str] = 1, page_size: Union[int, str] = 25
-    ) -> Optional[List[Hole]]:
+    ) -> Optional[HoleBatch]:
         """
-        异步获取首页树洞
+        异步获取首页树洞，结果为列式批量数据
 
         Parameters
         ----------
@@ -443,7 +1849,7 @@ class TreeHoleClient:
 
         Returns
         -------
-        1. 首页树洞列表，请求错误则返回 `None`
+        1. 首页树洞的批量数据，请求错误则返回 `None`
         """
 
         if not self.__is_num(page):
@@ -454,16 +1860,13 @@ class TreeHoleClient:
             **self.base_param,
             **{"page": str(page), "limit": str(page_size)},
         }
-        async with aiohttp.request(
-            "GET", self.holes_url, params=param, headers=self.header
-        ) as response:
-            if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.error("Failed to get hole list, response: %s", response_dict)
-                return None
-            return list(map(Hole.from_data, response_dict["data"]["data"]))
+        response_dict = await self.__get_json_async("holes", self.holes_url, param)
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get hole list, response: %s", response_dict)
+            return None
+        return self.__save_holes(HoleBatch.from_data(response_dict["data"]["data"]))
 
     def get_followed(
         self, page: Union[int, str] = 1, page_size: Union[int, str] = 25
@@ -489,17 +1892,17 @@ class TreeHoleClient:
             **self.base_param,
             **{"page": str(page), "limit": str(page_size)},
         }
-        response = requests.get(self.follow_url, params=param, headers=self.header)
-        if not self.__is_valid_response(response):
+        response_dict = self.__get_json("followed", self.follow_url, param)
+        if response_dict is None:
             return None
-        response_dict = response.json()
         if not response_dict["success"]:
             logger.error(
                 "Failed to get followed hole list, response: %s", response_dict
             )
             return None
-        return list(map(Hole.from_data, response_dict["data"]["data"]))
+        return self.__save_holes(Hole.from_list(response_dict["data"]["data"]))
 
+    @_coalesced
     async def get_followed_async(
         self, page: Union[int, str] = 1, page_size: Union[int, str] = 25
     ) -> Optional[List[Hole]]:
@@ -524,18 +1927,15 @@ class TreeHoleClient:
             **self.base_param,
             **{"page": str(page), "limit": str(page_size)},
         }
-        async with aiohttp.request(
-            "GET", self.follow_url, params=param, headers=self.header
-        ) as response:
-            if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.error(
-                    "Failed to get followed hole list, response: %s", response_dict
-                )
-                return None
-            return list(map(Hole.from_data, response_dict["data"]["data"]))
+        response_dict = await self.__get_json_async("followed", self.follow_url, param)
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error(
+                "Failed to get followed hole list, response: %s", response_dict
+            )
+            return None
+        return self.__save_holes(Hole.from_list(response_dict["data"]["data"]))
 
     def get_search(
         self,
@@ -570,15 +1970,15 @@ class TreeHoleClient:
                 "keyword": " ".join(keywords),
             },
         }
-        response = requests.get(self.holes_url, params=param, headers=self.header)
-        if not self.__is_valid_response(response):
+        response_dict = self.__get_json("search", self.holes_url, param)
+        if response_dict is None:
             return None
-        response_dict = response.json()
         if not response_dict["success"]:
             logger.error("Failed to get search result, response: %s", response_dict)
             return None
-        return list(map(Hole.from_data, response_dict["data"]["data"]))
+        return self.__save_holes(Hole.from_list(response_dict["data"]["data"]))
 
+    @_coalesced
     async def get_search_async(
         self,
         keywords: Union[str, List[str]],
@@ -612,19 +2012,427 @@ class TreeHoleClient:
                 "keyword": " ".join(keywords),
             },
         }
-        async with aiohttp.request(
-            "GET", self.holes_url, params=param, headers=self.header
-        ) as response:
-            if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.error("Failed to get search result, response: %s", response_dict)
-                return None
-            return list(map(Hole.from_data, response_dict["data"]["data"]))
+        response_dict = await self.__get_json_async("search", self.holes_url, param)
+        if response_dict is None:
+            return None
+        if not response_dict["success"]:
+            logger.error("Failed to get search result, response: %s", response_dict)
+            return None
+        return self.__save_holes(Hole.from_list(response_dict["data"]["data"]))
+
+    def backfill(
+        self,
+        since: Union[datetime.datetime, int, float],
+        until: Optional[Union[datetime.datetime, int, float]] = None,
+        concurrency: int = 8,
+        start_pid: Optional[int] = None,
+        max_gap: int = 100,
+        on_hole: Optional[Callable[[Hole], Any]] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Tuple[List[Hole], Dict[int, Exception]]:
+        """
+        回溯抓取一段时间内发布的全部树洞（多线程并发）
+
+        从最新的树洞开始按 pid 递减逐个获取，越过 `since` 后立即停止分发新的 pid
+
+        Parameters
+        ----------
+        - since: 起始时间（`datetime` 或时间戳），早于此时间的树洞不再抓取
+        - until: 截止时间（`datetime` 或时间戳），晚于此时间的树洞不会返回，默认为 `None`（不限）
+        - concurrency: 最大并发请求数，默认为 8
+        - start_pid: 起始 pid，默认为 `None`（首页最新的树洞）
+        - max_gap: 连续多少个 pid 均无树洞时停止，默认为 100
+        - on_hole: 每获取到一个时间范围内的树洞即调用一次（如边抓取边写入文件），可选
+        - checkpoint: 断点日志，可选；中断后以同一日志重新调用即从断点继续（沿用上次的起始 pid，
+          跳过已交付过的 pid，只返回本次获取的树洞）
+
+        Returns
+        -------
+        1. 时间范围内的树洞列表，按 pid 从新到旧排列
+        2. 获取失败（含已删除）的树洞 ID 及其错误
+        """
+
+        if start_pid is None and checkpoint is not None:
+            start_pid = checkpoint.cursor("start", scope=_Backfill.SCOPE)
+        if start_pid is None:
+            start_pid = self.__latest_pid(self.get_holes())
+            if start_pid is None:
+                return [], {}
+        state = self.__new_backfill(
+            since, until, concurrency, start_pid, max_gap, checkpoint
+        )
+
+        def worker() -> None:
+            while True:
+                pid = state.take()
+                if pid is None:
+                    return
+                try:
+                    hole = self.get_hole(pid)
+                except Exception as e:
+                    state.fail(pid, e)
+                    continue
+                accepted = state.record(pid, hole)
+                if accepted and on_hole is not None:
+                    on_hole(hole)
+                state.save(pid, hole, accepted)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        return state.collect()
+
+    async def backfill_async(
+        self,
+        since: Union[datetime.datetime, int, float],
+        until: Optional[Union[datetime.datetime, int, float]] = None,
+        concurrency: int = 10,
+        start_pid: Optional[int] = None,
+        max_gap: int = 100,
+        on_hole: Optional[Callable[[Hole], Any]] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Tuple[List[Hole], Dict[int, Exception]]:
+        """
+        异步回溯抓取一段时间内发布的全部树洞
+
+        从最新的树洞开始按 pid 递减逐个获取，越过 `since` 后立即停止分发新的 pid
+
+        Parameters
+        ----------
+        - since: 起始时间（`datetime` 或时间戳），早于此时间的树洞不再抓取
+        - until: 截止时间（`datetime` 或时间戳），晚于此时间的树洞不会返回，默认为 `None`（不限）
+        - concurrency: 最大并发请求数，默认为 10
+        - start_pid: 起始 pid，默认为 `None`（首页最新的树洞）
+        - max_gap: 连续多少个 pid 均无树洞时停止，默认为 100
+        - on_hole: 每获取到一个时间范围内的树洞即调用一次（如边抓取边写入文件），可以为协程函数，可选
+        - checkpoint: 断点日志，可选；中断后以同一日志重新调用即从断点继续（沿用上次的起始 pid，
+          跳过已交付过的 pid，只返回本次获取的树洞）
+
+        Returns
+        -------
+        1. 时间范围内的树洞列表，按 pid 从新到旧排列
+        2. 获取失败（含已删除）的树洞 ID 及其错误
+        """
+
+        if start_pid is None and checkpoint is not None:
+            start_pid = checkpoint.cursor("start", scope=_Backfill.SCOPE)
+        if start_pid is None:
+            start_pid = self.__latest_pid(await self.get_holes_async())
+            if start_pid is None:
+                return [], {}
+        state = self.__new_backfill(
+            since, until, concurrency, start_pid, max_gap, checkpoint
+        )
+
+        async def worker() -> None:
+            while True:
+                pid = state.take()
+                if pid is None:
+                    return
+                try:
+                    hole = await self.get_hole_async(pid)
+                except Exception as e:
+                    state.fail(pid, e)
+                    continue
+                accepted = state.record(pid, hole)
+                if accepted and on_hole is not None:
+                    await _maybe_await(on_hole(hole))
+                state.save(pid, hole, accepted)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return state.collect()
+
+    @staticmethod
+    def __latest_pid(holes: Optional[List[Hole]]) -> Optional[int]:
+        pids = [hole.pid for hole in holes or [] if hole.pid is not None]
+        if not pids:
+            logger.error("Failed to find the latest hole to start from")
+            return None
+        # Pinned holes may be older, so take the largest pid on the page
+        return max(pids)
+
+    @staticmethod
+    def __new_backfill(
+        since: Union[datetime.datetime, int, float],
+        until: Optional[Union[datetime.datetime, int, float]],
+        concurrency: int,
+        start_pid: Union[int, str],
+        max_gap: int,
+        checkpoint: Optional[Checkpoint],
+    ) -> _Backfill:
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        if max_gap < 1:
+            raise ValueError("max_gap must be a positive integer")
+        return _Backfill(
+            int(start_pid),
+            _to_timestamp(since),
+            None if until is None else _to_timestamp(until),
+            max_gap,
+            checkpoint,
+        )
+
+    @staticmethod
+    def __iter_pages(
+        fetch: Callable[[int], Optional[List[T]]],
+        page: Union[int, str],
+        until: Optional[Callable[[T], bool]],
+    ) -> Iterator[T]:
+        """逐页获取并展开，在消费当前页时于后台线程预取下一页"""
+        page = int(page)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(fetch, page)
+            while True:
+                items = future.result()
+                if not items:
+                    return
+                page += 1
+                future = executor.submit(fetch, page)
+                for item in items:
+                    if until is not None and until(item):
+                        future.cancel()
+                        return
+                    yield item
+        finally:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    async def __iter_pages_async(
+        fetch: Callable[[int], Awaitable[Optional[List[T]]]],
+        page: Union[int, str],
+        until: Optional[Callable[[T], bool]],
+    ) -> AsyncIterator[T]:
+        """异步逐页获取并展开，在消费当前页时并发预取下一页"""
+        page = int(page)
+        task = asyncio.ensure_future(fetch(page))
+        try:
+            while True:
+                items = await task
+                if not items:
+                    return
+                page += 1
+                task = asyncio.ensure_future(fetch(page))
+                for item in items:
+                    if until is not None and until(item):
+                        return
+                    yield item
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def iter_holes(
+        self,
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 25,
+        until: Optional[Callable[[Hole], bool]] = None,
+    ) -> Iterator[Hole]:
+        """
+        逐个遍历首页树洞，自动翻页
+
+        Parameters
+        ----------
+        - page: 起始页码，默认为 1
+        - page_size: 每页数量，默认为 25
+        - until: 终止条件，对某个树洞返回 `True` 时停止（不包含该树洞），可选
+
+        Returns
+        -------
+        1. 树洞迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages(lambda p: self.get_holes(p, page_size), page, until)
+
+    def iter_holes_async(
+        self,
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 25,
+        until: Optional[Callable[[Hole], bool]] = None,
+    ) -> AsyncIterator[Hole]:
+        """
+        异步逐个遍历首页树洞，自动翻页
+
+        Parameters
+        ----------
+        - page: 起始页码，默认为 1
+        - page_size: 每页数量，默认为 25
+        - until: 终止条件，对某个树洞返回 `True` 时停止（不包含该树洞），可选
+
+        Returns
+        -------
+        1. 树洞异步迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages_async(
+            lambda p: self.get_holes_async(p, page_size), page, until
+        )
+
+    def iter_followed(
+        self,
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 25,
+        until: Optional[Callable[[Hole], bool]] = None,
+    ) -> Iterator[Hole]:
+        """
+        逐个遍历关注树洞，自动翻页
+
+        Parameters
+        ----------
+        - page: 起始页码，默认为 1
+        - page_size: 每页数量，默认为 25
+        - until: 终止条件，对某个树洞返回 `True` 时停止（不包含该树洞），可选
+
+        Returns
+        -------
+        1. 树洞迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages(lambda p: self.get_followed(p, page_size), page, until)
+
+    def iter_followed_async(
+        self,
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 25,
+        until: Optional[Callable[[Hole], bool]] = None,
+    ) -> AsyncIterator[Hole]:
+        """
+        异步逐个遍历关注树洞，自动翻页
+
+        Parameters
+        ----------
+        - page: 起始页码，默认为 1
+        - page_size: 每页数量，默认为 25
+        - until: 终止条件，对某个树洞返回 `True` 时停止（不包含该树洞），可选
+
+        Returns
+        -------
+        1. 树洞异步迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages_async(
+            lambda p: self.get_followed_async(p, page_size), page, until
+        )
+
+    def iter_search(
+        self,
+        keywords: Union[str, List[str]],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 50,
+        until: Optional[Callable[[Hole], bool]] = None,
+    ) -> Iterator[Hole]:
+        """
+        逐个遍历搜索结果，自动翻页
+
+        Parameters
+        ----------
+        - keywords: 搜索关键词
+        - page: 起始页码，默认为 1
+        - page_size: 每页数量，默认为 50
+        - until: 终止条件，对某个树洞返回 `True` 时停止（不包含该树洞），可选
+
+        Returns
+        -------
+        1. 树洞迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages(
+            lambda p: self.get_search(keywords, p, page_size), page, until
+        )
+
+    def iter_search_async(
+        self,
+        keywords: Union[str, List[str]],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 50,
+        until: Optional[Callable[[Hole], bool]] = None,
+    ) -> AsyncIterator[Hole]:
+        """
+        异步逐个遍历搜索结果，自动翻页
+
+        Parameters
+        ----------
+        - keywords: 搜索关键词
+        - page: 起始页码，默认为 1
+        - page_size: 每页数量，默认为 50
+        - until: 终止条件，对某个树洞返回 `True` 时停止（不包含该树洞），可选
+
+        Returns
+        -------
+        1. 树洞异步迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages_async(
+            lambda p: self.get_search_async(keywords, p, page_size), page, until
+        )
+
+    def iter_comments(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 500,
+        until: Optional[Callable[[Comment], bool]] = None,
+    ) -> Iterator[Comment]:
+        """
+        逐个遍历树洞评论，自动翻页
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - page: 起始页码，默认为 1
+        - page_size: 每页评论数，默认为 500
+        - until: 终止条件，对某条评论返回 `True` 时停止（不包含该评论），可选
+
+        Returns
+        -------
+        1. 评论迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages(
+            lambda p: self.get_comment(pid, p, page_size), page, until
+        )
+
+    def iter_comments_async(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Union[int, str] = 500,
+        until: Optional[Callable[[Comment], bool]] = None,
+    ) -> AsyncIterator[Comment]:
+        """
+        异步逐个遍历树洞评论，自动翻页
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - page: 起始页码，默认为 1
+        - page_size: 每页评论数，默认为 500
+        - until: 终止条件，对某条评论返回 `True` 时停止（不包含该评论），可选
+
+        Returns
+        -------
+        1. 评论异步迭代器，遇到空页或请求错误时结束
+        """
+        return self.__iter_pages_async(
+            lambda p: self.get_comment_async(pid, p, page_size), page, until
+        )
+
+    @staticmethod
+    def __image_body(
+        text: str,
+        image: ImageSource,
+        max_image_side: Optional[int],
+        image_quality: Optional[int],
+    ) -> MultipartStream:
+        """构造带图树洞的流式请求体，必要时先压缩图片"""
+        if max_image_side is not None or image_quality is not None:
+            if hasattr(image, "__aiter__"):
+                raise TypeError("Async iterable images cannot be shrunk")
+            image = shrink_image(image, max_image_side, image_quality or 85) or image
+        try:
+            return MultipartStream({"text": text, "type": "image"}, "data", image)
+        except FileNotFoundError:
+            logger.error(f"File {image} not found")
+            raise FileNotFoundError("File not found")
 
     def post_hole(
-        self, text: str = "", image: Optional[Union[bytes, str]] = None
+        self,
+        text: str = "",
+        image: Optional[ImageSource] = None,
+        max_image_side: Optional[int] = None,
+        image_quality: Optional[int] = None,
     ) -> Optional[bool]:
         """
         发布树洞
@@ -632,7 +2440,9 @@ class TreeHoleClient:
         Parameters
         ----------
         - text: 树洞内容
-        - image: 树洞图片 (二进制数据或文件名)
+        - image: 树洞图片（二进制数据、文件名或二进制文件对象），按块流式上传
+        - max_image_side: 上传前将图片长边缩小到该像素数以内（需要安装 Pillow），可选
+        - image_quality: 上传前以该质量重新压缩图片（需要安装 Pillow），可选
 
         Returns
         -------
@@ -641,43 +2451,41 @@ class TreeHoleClient:
         if not text and not image:
             raise EmptyError("Empty post is not allowed")
         if image is not None:
-            if isinstance(image, str):
-                try:
-                    image = open(image, "rb").read()
-                except FileNotFoundError:
-                    logger.error(f"File {image} not found")
-                    raise FileNotFoundError("File not found")
-                except Exception as e:
-                    logger.error(f"Unknown error: {e}")
-                    raise e
-            # load for posting hole with image
-            load = {
-                "text": text,
-                "type": "image",
-            }
-            file = {"data": image}
+            body = self.__image_body(text, image, max_image_side, image_quality)
+            with body:
+                response = self.__request(
+                    "POST",
+                    self.store_url,
+                    params=self.base_param,
+                    headers={**self.header, **body.headers()},
+                    data=body,
+                )
         else:
             load = {
                 "text": text,
                 "type": "text",
             }
-            file = {}
-        response = requests.post(
-            self.store_url,
-            params=self.base_param,
-            headers=self.header,
-            data=load,
-            files=file,
-        )
+            response = self.__request(
+                "POST",
+                self.store_url,
+                params=self.base_param,
+                headers=self.header,
+                data=load,
+            )
+        self.__invalidate("holes")
         if not self.__is_valid_response(response):
             return None
-        response_dict = response.json()
+        response_dict = self.__decode(response.content)
         if not response_dict["success"]:
-            logger.exception("Post failed: %s", response_dict["messsage"])
+            logger.exception("Post failed: %s", response_dict.get("message"))
         return response_dict["success"]
 
     async def post_hole_async(
-        self, text: str = "", image: Optional[Union[bytes, str]] = None
+        self,
+        text: str = "",
+        image: Optional[ImageSource] = None,
+        max_image_side: Optional[int] = None,
+        image_quality: Optional[int] = None,
     ) -> Optional[bool]:
         """
         异步发布树洞
@@ -685,7 +2493,9 @@ class TreeHoleClient:
         Parameters
         ----------
         - text: 树洞内容
-        - image: 树洞图片 (二进制数据或文件名)
+        - image: 树洞图片（二进制数据、文件名、二进制文件对象或产生字节块的异步迭代器），按块流式上传
+        - max_image_side: 上传前将图片长边缩小到该像素数以内（需要安装 Pillow），可选
+        - image_quality: 上传前以该质量重新压缩图片（需要安装 Pillow），可选
 
         Returns
         -------
@@ -694,40 +2504,39 @@ class TreeHoleClient:
         if not text and not image:
             raise EmptyError("Empty post is not allowed")
         if image is not None:
-            if isinstance(image, str):
-                try:
-                    async with aiofiles.open(image, "rb") as f:
-                        image = await f.read()
-                except FileNotFoundError:
-                    logger.error(f"File {image} not found")
-                    raise FileNotFoundError("File not found")
-                except Exception as e:
-                    logger.error(f"Unknown error: {e}")
-                    raise e
-            # load for posting hole with image
-            load = {
-                "text": text,
-                "type": "image",
-                "data": image,
-            }
+            if max_image_side is None and image_quality is None:
+                body = self.__image_body(text, image, None, None)
+            else:
+                # Decoding and re-encoding the image is CPU bound, keep it off the loop
+                body = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self.__image_body,
+                    text,
+                    image,
+                    max_image_side,
+                    image_quality,
+                )
+            kwargs = {"headers": {**self.header, **body.headers()}, "data": body}
         else:
             load = {
                 "text": text,
                 "type": "text",
             }
-        async with aiohttp.request(
-            "POST",
-            self.store_url,
-            params=self.base_param,
-            headers=self.header,
-            data=load,
-        ) as response:
-            if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.exception("Post failed: %s", response_dict["messsage"])
-            return response_dict["success"]
+            kwargs = {"headers": self.header, "data": load}
+        try:
+            async with self.__request_async(
+                "POST", self.store_url, params=self.base_param, **kwargs
+            ) as response:
+                self.__invalidate("holes")
+                if not self.__is_valid_client_response(response):
+                    return None
+                response_dict = self.__decode(await response.read())
+                if not response_dict["success"]:
+                    logger.exception("Post failed: %s", response_dict.get("message"))
+                return response_dict["success"]
+        finally:
+            if isinstance(kwargs["data"], MultipartStream):
+                kwargs["data"].close()
 
     def post_comment(
         self,
@@ -752,25 +2561,26 @@ class TreeHoleClient:
             raise EmptyError("Empty post is not allowed")
         if not self.__is_num(pid):
             raise ValueError("pid must be an integer or string of interger")
-        if reply_to is not None:
-            if isinstance(reply_to, str):
-                assert reply_to in UserName, "Invalid reply_to"
-                reply_to = " ".join([x.capitalize() for x in reply_to.split()])
-            else:
-                reply_to = UserName[reply_to]
-            text = f"Re {reply_to}: {text}"
         load = {
             "pid": str(pid),
-            "text": text,
+            "text": _comment_text(text, reply_to),
         }
-        response = requests.post(
-            self.comment_url, params=self.base_param, headers=self.header, data=load
-        )
+        try:
+            response = self.__request(
+                "POST",
+                self.comment_url,
+                params=self.base_param,
+                headers=self.header,
+                data=load,
+            )
+        finally:
+            # The server may have taken the comment even if the request failed
+            self.__invalidate_comments(pid)
         if not self.__is_valid_response(response):
             return None
-        response_dict = response.json()
+        response_dict = self.__decode(response.content)
         if not response_dict["success"]:
-            logger.exception("Comment failed: %s", response_dict["messsage"])
+            logger.exception("Comment failed: %s", response_dict.get("message"))
         return response_dict["success"]
 
     async def post_comment_async(
@@ -796,30 +2606,27 @@ class TreeHoleClient:
             raise EmptyError("Empty post is not allowed")
         if not self.__is_num(pid):
             raise ValueError("pid must be an integer or string of interger")
-        if reply_to is not None:
-            if isinstance(reply_to, str):
-                assert reply_to in UserName, "Invalid reply_to"
-                reply_to = " ".join([x.capitalize() for x in reply_to.split()])
-            else:
-                reply_to = UserName[reply_to]
-            text = f"Re {reply_to}: {text}"
         load = {
             "pid": str(pid),
-            "text": text,
+            "text": _comment_text(text, reply_to),
         }
-        async with aiohttp.request(
-            "POST",
-            self.comment_url,
-            params=self.base_param,
-            headers=self.header,
-            data=load,
-        ) as response:
-            if not self.__is_valid_client_response(response):
-                return None
-            response_dict = await response.json()
-            if not response_dict["success"]:
-                logger.exception("Comment failed: %s", response_dict["messsage"])
-            return response_dict["success"]
+        try:
+            async with self.__request_async(
+                "POST",
+                self.comment_url,
+                params=self.base_param,
+                headers=self.header,
+                data=load,
+            ) as response:
+                if not self.__is_valid_client_response(response):
+                    return None
+                response_dict = self.__decode(await response.read())
+        finally:
+            # The server may have taken the comment even if the request failed
+            self.__invalidate_comments(pid)
+        if not response_dict["success"]:
+            logger.exception("Comment failed: %s", response_dict.get("message"))
+        return response_dict["success"]
 
     def post_toggle_followed(
         self, pid: Union[int, str], two_factor: bool = False
@@ -837,20 +2644,26 @@ class TreeHoleClient:
         1. 是否成功切换关注状态，请求错误则返回 `None`
         2. 当前关注状态，`1` 为关注，`0` 为未关注，请求错误则返回 `None`
         """
+        # The current follow status must not come from the cache
+        self.__invalidate_followed(pid)
         hole = self.get_hole(pid)
         if hole is None or hole.is_follow is None:
             logger.exception("Failed to get attention status of pid %s", pid)
             return (None, None)
-        response = requests.post(
+        response = self.__request(
+            "POST",
             urljoin(self.attention_url, str(pid)),
             params=self.base_param,
             headers=self.header,
         )
+        self.__invalidate_followed(pid)
         if not self.__is_valid_response(response):
             return (None, None)
-        response_dict = response.json()
+        response_dict = self.__decode(response.content)
         if not response_dict["success"]:
-            logger.exception("Toggle attention failed: %s", response_dict["messsage"])
+            logger.exception(
+                "Toggle attention failed: %s", response_dict.get("message")
+            )
         if not two_factor:
             return (
                 response_dict["success"],
@@ -881,22 +2694,25 @@ class TreeHoleClient:
         1. 是否成功切换关注状态，请求错误则返回 `None`
         2. 当前关注状态，`1` 为关注，`0` 为未关注，请求错误则返回 `None`
         """
+        # The current follow status must not come from the cache
+        self.__invalidate_followed(pid)
         hole = await self.get_hole_async(pid)
         if hole is None or hole.is_follow is None:
             logger.exception("Failed to get attention status of pid %s", pid)
             return (None, None)
-        async with aiohttp.request(
+        async with self.__request_async(
             "POST",
             urljoin(self.attention_url, str(pid)),
             params=self.base_param,
             headers=self.header,
         ) as response:
+            self.__invalidate_followed(pid)
             if not self.__is_valid_client_response(response):
                 return (None, None)
-            response_dict = await response.json()
+            response_dict = self.__decode(await response.read())
             if not response_dict["success"]:
                 logger.exception(
-                    "Toggle attention failed: %s", response_dict["messsage"]
+                    "Toggle attention failed: %s", response_dict.get("message")
                 )
             if not two_factor:
                 return (
@@ -932,7 +2748,8 @@ class TreeHoleClient:
         if not self.__is_num(pid):
             raise ValueError("pid must be an integer or string of interger")
         load = {"reason": reason}
-        response = requests.post(
+        response = self.__request(
+            "POST",
             urljoin(self.report_url, str(pid)),
             params=self.base_param,
             headers=self.header,
@@ -940,9 +2757,9 @@ class TreeHoleClient:
         )
         if not self.__is_valid_response(response):
             return None
-        response_dict = response.json()
+        response_dict = self.__decode(response.content)
         if not response_dict["success"]:
-            logger.exception("Report failed: %s", response_dict["messsage"])
+            logger.exception("Report failed: %s", response_dict.get("message"))
         return response_dict["success"]
 
     async def post_report_async(
@@ -963,7 +2780,7 @@ class TreeHoleClient:
         if not self.__is_num(pid):
             raise ValueError("pid must be an integer or string of interger")
         load = {"reason": reason}
-        async with aiohttp.request(
+        async with self.__request_async(
             "POST",
             urljoin(self.report_url, str(pid)),
             params=self.base_param,
@@ -972,7 +2789,7 @@ class TreeHoleClient:
         ) as response:
             if not self.__is_valid_client_response(response):
                 return None
-            response_dict = await response.json()
+            response_dict = self.__decode(await response.read())
             if not response_dict["success"]:
-                logger.exception("Report failed: %s", response_dict["messsage"])
+                logger.exception("Report failed: %s", response_dict.get("message"))
             return response_dict["success"]
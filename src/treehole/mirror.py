@@ -0,0 +1,181 @@
+"""
+树洞图片镜像（按内容寻址存储）
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
+
+from .utils import lazy_import
+
+aiofiles = lazy_import("aiofiles")
+
+__all__ = ("ImageMirror", "MirrorEntry", "MirrorReport")
+
+
+@dataclass(init=True, repr=True, order=False, frozen=True)
+class MirrorEntry:
+    """
+    镜像清单中的一条记录
+    """
+
+    pid: int
+    """树洞 ID"""
+    sha256: str
+    """图片内容的 SHA-256（十六进制）"""
+    content_type: str
+    """图片类型（`Content-Type`）"""
+    size: int
+    """图片大小（字节）"""
+
+
+@dataclass(init=True, repr=True, order=False)
+class MirrorReport:
+    """
+    一次镜像任务的统计
+    """
+
+    downloaded: int = 0
+    """下载的图片数"""
+    duplicates: int = 0
+    """下载后发现内容已存在（未重复写入）的图片数"""
+    skipped: int = 0
+    """已在清单中、未发送请求的图片数"""
+    failed: Dict[int, Exception] = field(default_factory=dict)
+    """下载失败的树洞 ID 及其错误"""
+    bytes: int = 0
+    """下载的总字节数"""
+    elapsed: float = 0.0
+    """耗时（秒）"""
+
+    @property
+    def images_per_second(self) -> float:
+        """每秒下载的图片数，只读"""
+        return self.downloaded / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """每秒下载的字节数，只读"""
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ImageMirror:
+    """
+    按内容寻址的图片镜像目录
+
+    图片以其 SHA-256 命名存放于 `objects/` 下，内容相同的图片只保存一份；
+    `manifest.jsonl` 逐行记录 pid、哈希与图片类型（只追加），已记录的 pid 无需再次下载。
+    同一个实例可被多个线程和协程共享。
+    """
+
+    MANIFEST = "manifest.jsonl"
+    """清单文件名"""
+
+    def __init__(self, directory: Union[str, "os.PathLike[str]"]) -> None:
+        """
+        - directory:
+            镜像目录，不存在时自动创建
+        """
+        self.__directory = os.fspath(directory)
+        self.__lock = threading.Lock()
+        self.__entries: Dict[int, MirrorEntry] = {}
+        os.makedirs(os.path.join(self.__directory, "objects"), exist_ok=True)
+        self.__manifest = os.path.join(self.__directory, self.MANIFEST)
+        if os.path.exists(self.__manifest):
+            with open(self.__manifest, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = MirrorEntry(**json.loads(line))
+                    except (TypeError, ValueError):
+                        # Blank or truncated line left by an interrupted write
+                        continue
+                    self.__entries[entry.pid] = entry
+
+    @property
+    def directory(self) -> str:
+        """镜像目录，只读"""
+        return self.__directory
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, pid: Union[int, str]) -> bool:
+        return int(pid) in self.__entries
+
+    def get(self, pid: Union[int, str]) -> Optional[MirrorEntry]:
+        """
+        读取树洞图片的清单记录，未镜像则返回 `None`
+        """
+        return self.__entries.get(int(pid))
+
+    def path(self, entry: MirrorEntry) -> str:
+        """
+        图片文件的路径
+        """
+        extension = mimetypes.guess_extension(entry.content_type.split(";")[0]) or ""
+        return os.path.join(
+            self.__directory, "objects", entry.sha256[:2], entry.sha256 + extension
+        )
+
+    def __entry(
+        self, pid: Union[int, str], content: bytes, content_type: str
+    ) -> MirrorEntry:
+        entry = MirrorEntry(
+            int(pid), hashlib.sha256(content).hexdigest(), content_type, len(content)
+        )
+        os.makedirs(os.path.dirname(self.path(entry)), exist_ok=True)
+        return entry
+
+    def __record(self, entry: MirrorEntry) -> None:
+        with self.__lock:
+            with open(self.__manifest, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry.__dict__) + "\n")
+            self.__entries[entry.pid] = entry
+
+    def add(self, pid: Union[int, str], content: bytes, content_type: str) -> bool:
+        """
+        保存图片并写入清单
+
+        Returns
+        -------
+        1. 是否写入了新文件（内容已存在则为 `False`）
+        """
+
+        entry = self.__entry(pid, content, content_type)
+        path = self.path(entry)
+        new = not os.path.exists(path)
+        if new:
+            # Write then rename so that a crash never leaves a truncated object
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(content)
+            os.replace(temporary, path)
+        self.__record(entry)
+        return new
+
+    async def add_async(
+        self, pid: Union[int, str], content: bytes, content_type: str
+    ) -> bool:
+        """
+        异步保存图片并写入清单
+
+        Returns
+        -------
+        1. 是否写入了新文件（内容已存在则为 `False`）
+        """
+
+        entry = self.__entry(pid, content, content_type)
+        path = self.path(entry)
+        new = not os.path.exists(path)
+        if new:
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            async with aiofiles.open(temporary, "wb") as file:
+                await file.write(content)
+            os.replace(temporary, path)
+        self.__record(entry)
+        return new
@@ -0,0 +1,616 @@
+"""
+本地模拟树洞服务器
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .utils import IMAGE_HEAD_SIZE, image_dimensions, lazy_import
+
+web = lazy_import("aiohttp.web")
+
+__all__ = ("MockServer",)
+
+WORDS = (
+    "树洞",
+    "考试",
+    "食堂",
+    "图书馆",
+    "未名湖",
+    "选课",
+    "实习",
+    "宿舍",
+    "社团",
+    "期中",
+    "论文",
+    "求助",
+    "吐槽",
+    "deadline",
+    "PKU",
+    "hello",
+)
+"""生成树洞与评论文本所用的词"""
+
+NAMES = ("Alice", "Bob", "Carol", "Dave", "Eve", "Francis", "Grace", "Hans")
+"""评论者昵称"""
+
+_MASK = (1 << 64) - 1
+
+
+def _unit(seed: int, pid: int, salt: int) -> float:
+    """由种子与 pid 确定的 `[0, 1)` 内的伪随机数（splitmix64，比创建 `Random` 快得多）"""
+    x = (seed * 0x9E3779B97F4A7C15 + pid * 0xBF58476D1CE4E5B9 + salt) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return ((x ^ (x >> 31)) >> 11) / (1 << 53)
+
+
+def _page(request: "web.Request", default_limit: int) -> Tuple[int, int]:
+    page = max(int(request.query.get("page", 1)), 1)
+    limit = max(int(request.query.get("limit", default_limit)), 1)
+    return page, limit
+
+
+def _paginate(items: Sequence[Any], page: int, limit: int) -> Dict[str, Any]:
+    return {
+        "current_page": page,
+        "data": list(items[(page - 1) * limit : page * limit]),
+        "last_page": max((len(items) + limit - 1) // limit, 1),
+        "per_page": limit,
+        "total": len(items),
+    }
+
+
+def _success(data: Any = None) -> "web.Response":
+    return web.json_response(
+        {"code": 20000, "data": data, "message": "success", "success": True}
+    )
+
+
+def _failure(message: str, status: int = 200) -> "web.Response":
+    return web.json_response(
+        {"code": 40000, "data": None, "message": message, "success": False},
+        status=status,
+    )
+
+
+class MockServer:
+    """
+    本地模拟树洞服务器（需要安装 aiohttp）
+
+    实现客户端用到的全部接口（`login/`、`pku/`、`pku_hole/`、`pku_comment/`、`follow/`、
+    `pku_image/`、`pku_attention/`、`pku_report/`、`pku_store`），以 `base_url` 传给
+    `TreeHoleClient` 即可离线测试或测量性能。树洞、评论与图片由种子和 pid 确定性生成，
+    不占用与规模成正比的内存；可注入延迟、随机错误和连续若干次的错误（如 503 突发）。
+    服务器运行在后台线程自己的事件循环中，同步与异步客户端均可访问；
+    测量性能时也可用 `python -m treehole.mock_server` 在独立进程中运行。
+    """
+
+    def __init__(
+        self,
+        holes: int = 1000,
+        comments: int = 20,
+        image_bytes: int = 64 * 1024,
+        image_ratio: float = 0.2,
+        deleted: float = 0.05,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        token: Optional[str] = None,
+        interval: int = 60,
+        seed: int = 0,
+    ) -> None:
+        """
+        - holes:
+            生成的树洞数（pid 为 1 到 `holes`），默认为 1000
+        - comments:
+            每个树洞的最多评论数（实际数量在 0 与该值之间），默认为 20
+        - image_bytes:
+            每张图片的字节数，默认为 64 KiB
+        - image_ratio:
+            图片树洞的比例，默认为 0.2
+        - deleted:
+            已删除树洞的比例，默认为 0.05
+        - latency:
+            每个请求的固定延迟（秒），默认为 0
+        - jitter:
+            每个请求在固定延迟之外的随机延迟上限（秒），默认为 0
+        - error_rate:
+            请求随机出错的概率，默认为 0
+        - error_status:
+            随机出错时的状态码，默认为 503
+        - token:
+            要求请求携带的 token，默认为 `None`（接受任意 token，但仍须携带）
+        - interval:
+            相邻树洞的发布时间间隔（秒），最新的树洞发布于创建服务器时，默认为 60
+        - seed:
+            数据生成的随机种子，默认为 0
+        """
+        self.__holes = holes
+        self.__comments = comments
+        self.__image_bytes = image_bytes
+        self.__image_ratio = image_ratio
+        self.__deleted = deleted
+        self.latency = latency
+        """每个请求的固定延迟（秒），运行中可修改"""
+        self.jitter = jitter
+        """每个请求的随机延迟上限（秒），运行中可修改"""
+        self.error_rate = error_rate
+        """请求随机出错的概率，运行中可修改"""
+        self.error_status = error_status
+        """随机出错时的状态码，运行中可修改"""
+        self.__token = token
+        self.__interval = interval
+        self.__seed = seed
+        self.__now = int(time.time())
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__failures: List[Tuple[int, Optional[float]]] = []
+        self.__hits: Counter = Counter()
+        self.__alive: Optional[List[int]] = None
+        self.__posted: Dict[int, Dict[str, Any]] = {}
+        self.__posted_images: Dict[int, bytes] = {}
+        self.__posted_comments: Dict[int, List[Dict[str, Any]]] = {}
+        self.__followed: Set[int] = set()
+        self.__reports: List[Tuple[int, str]] = []
+        self.__latest = holes
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__base_url: Optional[str] = None
+
+    def __enter__(self) -> "MockServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        """服务器地址（传给 `TreeHoleClient` 的 `base_url`），只读"""
+        if self.__base_url is None:
+            raise RuntimeError("Server is not running")
+        return self.__base_url
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        """各接口收到的请求数（含注入的错误），只读"""
+        with self.__lock:
+            return dict(self.__hits)
+
+    @property
+    def reports(self) -> List[Tuple[int, str]]:
+        """收到的举报（树洞 ID 与理由），只读"""
+        return list(self.__reports)
+
+    @property
+    def latest_pid(self) -> int:
+        """最新的树洞 ID（含发布的树洞），只读"""
+        return self.__latest
+
+    def fail(
+        self, count: int, status: int = 503, retry_after: Optional[float] = None
+    ) -> None:
+        """
+        令接下来的若干个请求失败
+
+        Parameters
+        ----------
+        - count: 失败的请求数
+        - status: 状态码，默认为 503
+        - retry_after: 响应中 `Retry-After` 的秒数，默认为 `None`（不带该响应头）
+        """
+        with self.__lock:
+            self.__failures.extend([(status, retry_after)] * count)
+
+    def hole_data(self, pid: int) -> Optional[Dict[str, Any]]:
+        """
+        树洞的原始数据（与接口返回的 `data` 相同），已删除或不存在则返回 `None`
+        """
+        if pid in self.__posted:
+            data = dict(self.__posted[pid])
+        elif not 1 <= pid <= self.__holes or self.__is_deleted(pid):
+            return None
+        else:
+            rng = random.Random(self.__seed * 1_000_003 + pid)
+            image = _unit(self.__seed, pid, 2) < self.__image_ratio
+            data = {
+                "pid": pid,
+                "hidden": 0,
+                "text": " ".join(rng.choices(WORDS, k=rng.randint(3, 60))),
+                "type": "image" if image else "text",
+                "timestamp": self.__now - (self.__holes - pid) * self.__interval,
+                "reply": rng.randint(0, self.__comments),
+                "likenum": rng.randint(0, 50),
+                "extra": 0,
+                "url": f"{pid}.png" if image else "",
+                "tag": None,
+                "label": 0,
+                "label_info": None,
+                "anonymous": 1,
+                "is_top": 0,
+                "status": 0,
+                "is_comment": 1,
+                "is_follow": 0,
+                "is_protect": 0,
+                "image_size": [
+                    rng.randint(200, 2000) if image else 0,
+                    rng.randint(200, 2000) if image else 0,
+                ],
+            }
+        data["reply"] += len(self.__posted_comments.get(pid, ()))
+        data["is_follow"] = int(pid in self.__followed)
+        return data
+
+    def comments_data(self, pid: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        树洞全部评论的原始数据（按时间顺序），树洞已删除或不存在则返回 `None`
+        """
+        hole = self.hole_data(pid)
+        if hole is None:
+            return None
+        posted = self.__posted_comments.get(pid, [])
+        count = hole["reply"] - len(posted)
+        rng = random.Random(self.__seed * 1_000_003 + pid + (1 << 40))
+        comments = []
+        for index in range(count):
+            islz = int(rng.random() < 0.2)
+            name = "洞主" if islz else rng.choice(NAMES)
+            text = " ".join(rng.choices(WORDS, k=rng.randint(1, 20)))
+            if not islz and index and rng.random() < 0.3:
+                text = f"Re {rng.choice(NAMES)}: {text}"
+            comments.append(
+                {
+                    "cid": pid * 100_000 + index,
+                    "pid": pid,
+                    "text": f"[{name}] {text}",
+                    "timestamp": hole["timestamp"] + (index + 1) * 30,
+                    "anonymous": 1,
+                    "tag": None,
+                    "hidden": 0,
+                    "islz": islz,
+                    "name": name,
+                }
+            )
+        return comments + posted
+
+    def image_data(self, pid: int) -> Optional[bytes]:
+        """
+        树洞图片的内容（PNG 文件头加填充，各树洞不同），非图片树洞则返回 `None`
+        """
+        hole = self.hole_data(pid)
+        if hole is None or hole["type"] != "image":
+            return None
+        if pid in self.__posted_images:
+            return self.__posted_images[pid]
+        width, height = hole["image_size"]
+        header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        head = (
+            b"\x89PNG\r\n\x1a\n"
+            + struct.pack(">I", len(header))
+            + b"IHDR"
+            + header
+            + struct.pack(">I", zlib.crc32(b"IHDR" + header))
+        )
+        block = hashlib.sha256(f"{self.__seed}:{pid}".encode()).digest()
+        size = max(self.__image_bytes - len(head), 0)
+        return head + (block * (size // len(block) + 1))[:size]
+
+    def __is_deleted(self, pid: int) -> bool:
+        return _unit(self.__seed, pid, 1) < self.__deleted
+
+    def __alive_pids(self) -> List[int]:
+        """现存的全部树洞 ID，从新到旧"""
+        if self.__alive is None:
+            self.__alive = [
+                pid for pid in range(self.__holes, 0, -1) if not self.__is_deleted(pid)
+            ]
+        posted = sorted(self.__posted, reverse=True)
+        return posted + self.__alive if posted else self.__alive
+
+    def app(self) -> "web.Application":
+        """
+        创建服务器的 aiohttp 应用（可自行运行，或用于 aiohttp 的测试工具）
+        """
+
+        @web.middleware
+        async def middleware(request: "web.Request", handler) -> "web.Response":
+            return await self.__middleware(request, handler)
+
+        app = web.Application(
+            middlewares=[middleware], client_max_size=64 * 1024 * 1024
+        )
+        add_get, add_post = app.router.add_get, app.router.add_post
+        add_post("/api/login/", self.__login, name="login")
+        add_get("/api/pku/{pid}", self.__hole, name="hole")
+        add_get("/api/pku_hole/", self.__hole_list, name="holes")
+        add_get("/api/follow/", self.__followed_list, name="followed")
+        add_get("/api/pku_comment/{pid}", self.__comment_list, name="comment")
+        add_post("/api/pku_comment/", self.__post_comment, name="post_comment")
+        add_get("/api/pku_image/{pid}", self.__image, name="image")
+        add_post("/api/pku_attention/{pid}", self.__attention, name="attention")
+        add_post("/api/pku_report/{pid}", self.__report, name="report")
+        add_post("/api/pku_store", self.__store, name="store")
+        return app
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        在后台线程中启动服务器
+
+        Parameters
+        ----------
+        - host: 监听地址，默认为 `127.0.0.1`
+        - port: 监听端口，默认为 0（随机空闲端口）
+
+        Returns
+        -------
+        1. 服务器地址（`base_url`）
+        """
+
+        if self.__thread is not None:
+            return self.base_url
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            runner = web.AppRunner(self.app(), access_log=None)
+            try:
+                loop.run_until_complete(runner.setup())
+                site = web.TCPSite(runner, host, port)
+                loop.run_until_complete(site.start())
+                bound = runner.addresses[0][1]
+                self.__base_url = f"http://{host}:{bound}/api/"
+            except BaseException as e:
+                errors.append(e)
+                ready.set()
+                loop.close()
+                return
+            ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(runner.cleanup())
+                loop.close()
+
+        thread = threading.Thread(target=run, name="MockServer", daemon=True)
+        thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        self.__loop = loop
+        self.__thread = thread
+        return self.base_url
+
+    def stop(self) -> None:
+        """
+        停止后台线程中的服务器
+        """
+        if self.__thread is None:
+            return
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__thread = None
+        self.__loop = None
+        self.__base_url = None
+
+    async def __middleware(self, request: "web.Request", handler) -> "web.Response":
+        route = request.match_info.route.name or request.path
+        with self.__lock:
+            self.__hits[route] += 1
+            failure = self.__failures.pop(0) if self.__failures else None
+        delay = self.latency + (
+            self.__random.uniform(0, self.jitter) if self.jitter else 0
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if failure is None and self.error_rate > 0:
+            if self.__random.random() < self.error_rate:
+                failure = (self.error_status, None)
+        if failure is not None:
+            status, retry_after = failure
+            headers = {} if retry_after is None else {"Retry-After": f"{retry_after:g}"}
+            return web.Response(status=status, headers=headers, text="Injected error")
+        if route != "login":
+            authorization = request.headers.get("Authorization", "")
+            token = authorization[len("Bearer ") :]
+            if not authorization.startswith("Bearer ") or not token:
+                return _failure("Unauthorized", status=401)
+            if self.__token is not None and token != self.__token:
+                return _failure("Unauthorized", status=401)
+        return await handler(request)
+
+    async def __login(self, request: "web.Request") -> "web.Response":
+        form = await request.post()
+        if not form.get("uid") or not form.get("password"):
+            return _failure("学号或密码错误")
+        return _success({"jwt": self.__token or f"mock-token-{form['uid']}"})
+
+    async def __hole(self, request: "web.Request") -> "web.Response":
+        hole = self.hole_data(int(request.match_info["pid"]))
+        if hole is None:
+            return _failure("树洞不存在或已被删除")
+        return _success(hole)
+
+    def __hole_page(self, pids: Sequence[int], page: int, limit: int) -> Dict[str, Any]:
+        data = _paginate(pids, page, limit)
+        data["data"] = [self.hole_data(pid) for pid in data["data"]]
+        return data
+
+    async def __hole_list(self, request: "web.Request") -> "web.Response":
+        page, limit = _page(request, 25)
+        pids = self.__alive_pids()
+        keywords = request.query.get("keyword", "").split()
+        if keywords:
+            pids = [
+                pid
+                for pid in pids
+                if all(word in self.hole_data(pid)["text"] for word in keywords)
+            ]
+        return _success(self.__hole_page(pids, page, limit))
+
+    async def __followed_list(self, request: "web.Request") -> "web.Response":
+        page, limit = _page(request, 25)
+        pids = sorted(
+            (pid for pid in self.__followed if self.hole_data(pid) is not None),
+            reverse=True,
+        )
+        return _success(self.__hole_page(pids, page, limit))
+
+    async def __comment_list(self, request: "web.Request") -> "web.Response":
+        page, limit = _page(request, 500)
+        comments = self.comments_data(int(request.match_info["pid"]))
+        if comments is None:
+            return _failure("树洞不存在或已被删除")
+        return _success(_paginate(comments, page, limit))
+
+    async def __post_comment(self, request: "web.Request") -> "web.Response":
+        form = await request.post()
+        pid = int(form.get("pid", 0))
+        hole = self.hole_data(pid)
+        if hole is None:
+            return _failure("树洞不存在或已被删除")
+        if not form.get("text"):
+            return _failure("内容不能为空")
+        posted = self.__posted_comments.setdefault(pid, [])
+        posted.append(
+            {
+                "cid": pid * 100_000 + hole["reply"],
+                "pid": pid,
+                "text": f"[Alice] {form['text']}",
+                "timestamp": int(time.time()),
+                "anonymous": 1,
+                "tag": None,
+                "hidden": 0,
+                "islz": 0,
+                "name": "Alice",
+            }
+        )
+        return _success()
+
+    async def __image(self, request: "web.Request") -> "web.Response":
+        image = self.image_data(int(request.match_info["pid"]))
+        if image is None:
+            return _failure("图片不存在", status=404)
+        content_type = "image/png"
+        ranges = request.http_range
+        if ranges.start is None and ranges.stop is None:
+            return web.Response(body=image, content_type=content_type)
+        start = ranges.start or 0
+        stop = len(image) if ranges.stop is None else min(ranges.stop, len(image))
+        if start < 0:
+            start, stop = max(len(image) + start, 0), len(image)
+        if start >= len(image):
+            return web.Response(
+                status=416, headers={"Content-Range": f"bytes */{len(image)}"}
+            )
+        return web.Response(
+            status=206,
+            body=image[start:stop],
+            content_type=content_type,
+            headers={"Content-Range": f"bytes {start}-{stop - 1}/{len(image)}"},
+        )
+
+    async def __attention(self, request: "web.Request") -> "web.Response":
+        pid = int(request.match_info["pid"])
+        if self.hole_data(pid) is None:
+            return _failure("树洞不存在或已被删除")
+        self.__followed ^= {pid}
+        return _success()
+
+    async def __report(self, request: "web.Request") -> "web.Response":
+        pid = int(request.match_info["pid"])
+        if self.hole_data(pid) is None:
+            return _failure("树洞不存在或已被删除")
+        form = await request.post()
+        self.__reports.append((pid, str(form.get("reason", ""))))
+        return _success()
+
+    async def __store(self, request: "web.Request") -> "web.Response":
+        form = await request.post()
+        text = str(form.get("text", ""))
+        upload = form.get("data")
+        image = upload.file.read() if hasattr(upload, "file") else None
+        if not text and not image:
+            return _failure("内容不能为空")
+        size = image_dimensions(image[:IMAGE_HEAD_SIZE]) if image else None
+        self.__latest += 1
+        self.__posted[self.__latest] = {
+            "pid": self.__latest,
+            "hidden": 0,
+            "text": text,
+            "type": "image" if image else "text",
+            "timestamp": int(time.time()),
+            "reply": 0,
+            "likenum": 0,
+            "extra": 0,
+            "url": f"{self.__latest}.png" if image else "",
+            "tag": None,
+            "label": 0,
+            "label_info": None,
+            "anonymous": 1,
+            "is_top": 0,
+            "status": 0,
+            "is_comment": 1,
+            "is_follow": 0,
+            "is_protect": 0,
+            "image_size": list(size or (0, 0)),
+        }
+        if image:
+            self.__posted_images[self.__latest] = image
+        return _success()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    在前台运行模拟服务器（`python -m treehole.mock_server`），启动后在标准输出打印服务器地址
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m treehole.mock_server",
+        description="Serve synthetic PKU Hole data for offline tests and benchmarks",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--holes", type=int, default=1000)
+    parser.add_argument("--comments", type=int, default=20)
+    parser.add_argument("--image-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--token")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    server = MockServer(
+        holes=args.holes,
+        comments=args.comments,
+        image_bytes=args.image_bytes,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token=args.token,
+        seed=args.seed,
+    )
+    print(server.start(args.host, args.port), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
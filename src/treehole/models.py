@@ -2,10 +2,10 @@
 树洞相关数据模型
 """
 
-from dataclasses import dataclass
-from typing import Any, Dict, Tuple, Optional, Union
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Tuple, Optional, Union
 
-__all__ = ("Hole", "Comment", "UserName")
+__all__ = ("Hole", "Comment", "CompactHole", "CompactComment", "UserName")
 
 
 @dataclass(init=True, repr=True, order=False, unsafe_hash=True, frozen=False)
@@ -79,6 +79,8 @@ class Hole:
     is_protect: Optional[int] = None
     """树洞是否被保护（暂不确定）"""
 
+    _label_type = Label
+
     @classmethod
     def from_data(cls, data: Dict[str, Any]):
         """
@@ -93,7 +95,7 @@ class Hole:
             extra=data.get("extra"),
             tag=data.get("tag"),
             label=data.get("label"),
-            label_info=Label.from_data(data.get("label_info", {}))
+            label_info=cls._label_type.from_data(data.get("label_info", {}))
             if data.get("label_info")
             else None,
             reply=data.get("reply"),
@@ -106,6 +108,48 @@ class Hole:
             is_protect=data.get("is_protect"),
         )
 
+    @classmethod
+    def from_list(cls, data: Iterable[Dict[str, Any]]) -> List["Hole"]:
+        """
+        从字典数据列表批量创建树洞对象，结果与逐个调用 `from_data` 相同
+
+        同一批中重复的字符串与图片大小（如 `type`、`tag`）共享同一个对象
+        """
+        label_type = cls._label_type
+        memo: Dict[Any, Any] = {}
+        intern = memo.setdefault
+        holes = []
+        append = holes.append
+        for item in data:
+            get = item.get
+            image_size = tuple(get("image_size", (0, 0)))
+            label_info = get("label_info")
+            kind = get("type")
+            tag = get("tag")
+            # Positional arguments follow the field order of the dataclass
+            append(
+                cls(
+                    get("pid"),
+                    get("timestamp"),
+                    intern(kind, kind),
+                    get("text"),
+                    intern(image_size, image_size),
+                    get("extra"),
+                    intern(tag, tag),
+                    get("label"),
+                    label_type.from_data(label_info) if label_info else None,
+                    get("reply"),
+                    get("likenum"),
+                    get("anonymous"),
+                    get("status"),
+                    get("is_top"),
+                    get("is_comment"),
+                    get("is_follow"),
+                    get("is_protect"),
+                )
+            )
+        return holes
+
     def __repr__(self):
         return str(self.data)
 
@@ -161,6 +205,36 @@ class Comment:
             anonymous=data.get("anonymous"),
         )
 
+    @classmethod
+    def from_list(cls, data: Iterable[Dict[str, Any]]) -> List["Comment"]:
+        """
+        从字典数据列表批量创建回复对象，结果与逐个调用 `from_data` 相同
+
+        同一批中重复的字符串（如 `name`、`tag`）共享同一个对象
+        """
+        memo: Dict[Any, Any] = {}
+        intern = memo.setdefault
+        comments = []
+        append = comments.append
+        for item in data:
+            get = item.get
+            name = get("name")
+            tag = get("tag")
+            # Positional arguments follow the field order of the dataclass
+            append(
+                cls(
+                    get("cid"),
+                    get("pid"),
+                    get("timestamp"),
+                    intern(name, name),
+                    get("islz"),
+                    get("text"),
+                    intern(tag, tag),
+                    get("anonymous"),
+                )
+            )
+        return comments
+
     def __repr__(self):
         return str(self.data)
 
@@ -297,3 +371,55 @@ class UserName(metaclass=UserNameMeta):
     UserName["You Win 1234"]  # 1234
     ```
     """
+
+
+def _compact(cls: type, doc: str) -> type:
+    """
+    生成数据类的紧凑版本：字段存放于 `__slots__` 中，实例不再带有 `__dict__`
+
+    字段、默认值、`from_data` 与比较、哈希行为均与原类相同，`data` 返回新建的字典。
+    """
+    names = tuple(field.name for field in fields(cls))
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        # Defaults live in the generated __init__, class attributes would
+        # clash with the slot descriptors
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    namespace["__doc__"] = doc
+    namespace["__qualname__"] = "Compact" + cls.__qualname__
+    if "data" in namespace:
+        namespace["data"] = property(
+            lambda self: {name: getattr(self, name) for name in names},
+            doc=namespace["data"].__doc__,
+        )
+    return type("Compact" + cls.__name__, cls.__bases__, namespace)
+
+
+CompactLabel = _compact(
+    Label,
+    """
+    树洞标签数据模型（紧凑版本，使用 `__slots__`）
+    """,
+)
+
+CompactHole = _compact(
+    Hole,
+    """
+    树洞基本数据模型（紧凑版本，使用 `__slots__`）
+
+    字段与 `Hole` 相同，实例不带 `__dict__`，占用内存更少、构造更快，适合在内存中保存大量树洞进行分析
+    """,
+)
+CompactHole._label_type = CompactLabel
+
+CompactComment = _compact(
+    Comment,
+    """
+    树洞回复数据模型（紧凑版本，使用 `__slots__`）
+
+    字段与 `Comment` 相同，实例不带 `__dict__`，占用内存更少、构造更快，适合在内存中保存大量回复进行分析
+    """,
+)
@@ -0,0 +1,335 @@
+"""
+评论批量发布队列
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from itertools import count
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .client import TreeHoleClient, _comment_text
+from .models import Comment
+from .ratelimit import RateLimiter
+from .utils import EmptyError, lazy_import, logger
+
+aiohttp = lazy_import("aiohttp")
+
+__all__ = ("CommentJob", "CommentPoster")
+
+CLOCK_SKEW = 120
+"""核对评论是否已发布时允许的本地与服务器时间偏差（秒）"""
+
+
+def _posted_text(comment: Comment) -> Optional[str]:
+    """评论的发送内容（去掉服务器加上的 `[昵称] ` 前缀）"""
+    text = comment.text
+    if text is not None and comment.name:
+        prefix = f"[{comment.name}] "
+        if text.startswith(prefix):
+            return text[len(prefix) :]
+    return text
+
+
+@dataclass(init=True, repr=True, order=False, frozen=True)
+class CommentJob:
+    """
+    一条待发布的评论
+    """
+
+    pid: int
+    """树洞 ID"""
+    text: str
+    """实际发送的评论内容（已加上回复前缀）"""
+    key: str
+    """去重键，同一个键只会发布一次"""
+    account: Optional[int] = None
+    """指定发布所用账号的下标，`None` 为任意账号"""
+
+
+class CommentPoster:
+    """
+    评论批量发布队列
+
+    `submit` 将评论加入队列并立即返回 future，由若干协程以有限并发发布；每个账号（客户端）
+    各自按固定速率发布，被拒绝或出错时该账号自动退避。
+    每条评论带有去重键，发布状态记录在本地（可写入日志文件以跨进程保留）：
+    结果不确定的评论（网络错误、服务器报错）在重试前会先读取树洞评论核对是否已经发出，
+    确认未发出才会再次发布，因此不会重复发布；相同的键再次提交时直接返回已有的结果。
+    """
+
+    def __init__(
+        self,
+        clients: Union[TreeHoleClient, Sequence[TreeHoleClient]],
+        concurrency: int = 2,
+        rate: float = 0.2,
+        max_attempts: int = 3,
+        ledger: Optional[str] = None,
+    ) -> None:
+        """
+        - clients:
+            用于发布的客户端（一个或多个，每个对应一个账号）
+        - concurrency:
+            同时发布的评论数上限，默认为 2
+        - rate:
+            每个账号的最高发布速率（条/秒），默认为 0.2（每 5 秒一条）
+        - max_attempts:
+            每条评论最多发布次数（核对失败的次数另计，上限相同），默认为 3
+        - ledger:
+            去重日志文件路径（JSON Lines，只追加），默认为 `None`（仅在内存中记录）
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be a positive integer")
+        if not isinstance(clients, Sequence):
+            clients = [clients]
+        if not clients:
+            raise ValueError("At least one client is required")
+        self.__clients = list(clients)
+        self.__limiters = [
+            RateLimiter(rate=rate, min_rate=rate / 8, max_rate=rate, burst=1)
+            for _ in self.__clients
+        ]
+        self.__next_account = count()
+        self.__concurrency = concurrency
+        self.__max_attempts = max_attempts
+        self.__queue: "Optional[asyncio.Queue[CommentJob]]" = None
+        self.__workers: List["asyncio.Task[None]"] = []
+        self.__futures: Dict[str, "asyncio.Future[Optional[bool]]"] = {}
+        # key -> (state, time, result): "sent" once a request went out, then "done"
+        self.__ledger: Dict[str, Tuple[str, float, Optional[bool]]] = {}
+        self.__ledger_path = ledger
+        self.__posted = 0
+        self.__verified = 0
+        self.__deduplicated = 0
+        if ledger is not None and os.path.exists(ledger):
+            with open(ledger, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                        self.__ledger[record["key"]] = (
+                            record["state"],
+                            record["time"],
+                            record.get("result"),
+                        )
+                    except (KeyError, TypeError, ValueError):
+                        # Blank or truncated line left by an interrupted write
+                        continue
+
+    async def __aenter__(self) -> "CommentPoster":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def pending(self) -> int:
+        """尚未完成的评论数，只读"""
+        return sum(not future.done() for future in self.__futures.values())
+
+    @property
+    def posted(self) -> int:
+        """实际发出的发布请求数，只读"""
+        return self.__posted
+
+    @property
+    def verified(self) -> int:
+        """经核对确认已发布、因而未重复发布的评论数，只读"""
+        return self.__verified
+
+    @property
+    def deduplicated(self) -> int:
+        """因去重键相同而未重复发布的提交数，只读"""
+        return self.__deduplicated
+
+    def start(self) -> None:
+        """
+        启动发布协程（`submit` 时会自动启动），须在事件循环中调用
+        """
+        if self.__queue is not None:
+            return
+        self.__queue = asyncio.Queue()
+        self.__workers = [
+            asyncio.ensure_future(self.__worker()) for _ in range(self.__concurrency)
+        ]
+
+    async def join(self) -> None:
+        """
+        等待队列中的全部评论处理完毕
+        """
+        if self.__queue is not None:
+            await self.__queue.join()
+
+    async def close(self) -> None:
+        """
+        等待队列处理完毕并停止发布协程
+        """
+        await self.join()
+        for worker in self.__workers:
+            worker.cancel()
+        await asyncio.gather(*self.__workers, return_exceptions=True)
+        self.__workers = []
+        self.__queue = None
+
+    def submit(
+        self,
+        pid: Union[int, str],
+        text: str,
+        reply_to: Optional[Union[int, str]] = None,
+        key: Optional[str] = None,
+        account: Optional[int] = None,
+    ) -> "asyncio.Future[Optional[bool]]":
+        """
+        提交一条评论
+
+        Parameters
+        ----------
+        - pid: 树洞 ID
+        - text: 评论内容
+        - reply_to: 回复的用户昵称或标号（非层号），`None` 为回复洞主（默认）
+        - key: 去重键，默认随机生成；重试提交同一条评论时应传入相同的键
+        - account: 指定发布所用账号（`clients` 中的下标），默认为 `None`（轮流使用）
+
+        Returns
+        -------
+        1. future，结果为是否发布成功（服务器拒绝为 `False`），多次尝试后仍无法确定则为 `None`
+        """
+
+        if not text:
+            raise EmptyError("Empty post is not allowed")
+        if not str(pid).isdigit():
+            raise ValueError("pid must be an integer or string of interger")
+        if account is not None and not 0 <= account < len(self.__clients):
+            raise IndexError("account out of range")
+        key = key or uuid.uuid4().hex
+        existing = self.__futures.get(key)
+        # Jobs that gave up may be submitted again, they are checked before posting
+        if existing is not None and (
+            not existing.done() or self.__ledger.get(key, ("",))[0] == "done"
+        ):
+            self.__deduplicated += 1
+            return existing
+        future = asyncio.get_running_loop().create_future()
+        self.__futures[key] = future
+        state, _, result = self.__ledger.get(key, (None, 0.0, None))
+        if state == "done":
+            self.__deduplicated += 1
+            future.set_result(result)
+            return future
+        self.start()
+        job = CommentJob(int(pid), _comment_text(text, reply_to), key, account)
+        self.__queue.put_nowait(job)
+        return future
+
+    def __record(self, job: CommentJob, state: str, result: Optional[bool] = None):
+        """更新去重日志"""
+        now = time.time()
+        self.__ledger[job.key] = (state, now, result)
+        if self.__ledger_path is not None:
+            with open(self.__ledger_path, "a", encoding="utf-8") as file:
+                file.write(
+                    json.dumps(
+                        {
+                            "key": job.key,
+                            "pid": job.pid,
+                            "state": state,
+                            "time": now,
+                            "result": result,
+                        }
+                    )
+                    + "\n"
+                )
+
+    async def __worker(self) -> None:
+        while True:
+            job = await self.__queue.get()
+            future = self.__futures[job.key]
+            try:
+                result = await self.__post(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.__queue.task_done()
+
+    async def __is_posted(
+        self, client: TreeHoleClient, job: CommentJob, since: float
+    ) -> Optional[bool]:
+        """读取树洞的全部评论，核对该评论是否已发布，请求错误则返回 `None`"""
+        page = 1
+        page_size = 500
+        while True:
+            comments = await client.get_comment_async(job.pid, page, page_size)
+            if comments is None:
+                return None
+            for comment in comments:
+                if (
+                    _posted_text(comment) == job.text
+                    and (comment.timestamp or 0) >= since
+                ):
+                    return True
+            if len(comments) < page_size:
+                return False
+            page += 1
+
+    async def __post(self, job: CommentJob) -> Optional[bool]:
+        """发布一条评论，结果不确定时先核对再重试"""
+        if job.account is None:
+            account = next(self.__next_account) % len(self.__clients)
+        else:
+            account = job.account
+        client = self.__clients[account]
+        limiter = self.__limiters[account]
+        state, sent_at, _ = self.__ledger.get(job.key, (None, 0.0, None))
+        attempts = checks = 0
+        while True:
+            if state == "sent":
+                # The last request may have reached the server, check first
+                posted = await self.__is_posted(client, job, sent_at - CLOCK_SKEW)
+                if posted:
+                    self.__verified += 1
+                    self.__record(job, "done", True)
+                    return True
+                if posted is None:
+                    checks += 1
+                    if checks >= self.__max_attempts:
+                        break
+                    limiter.on_throttle()
+                    await limiter.acquire_async()
+                    continue
+            if attempts >= self.__max_attempts:
+                break
+            attempts += 1
+            await limiter.acquire_async()
+            self.__record(job, "sent")
+            state, sent_at, _ = self.__ledger[job.key]
+            self.__posted += 1
+            try:
+                result = await client.post_comment_async(job.pid, job.text)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("Posting comment %s failed: %s", job.key, e)
+                result = None
+            if result is not None:
+                limiter.on_success()
+                self.__record(job, "done", result)
+                return result
+            limiter.on_throttle()
+        logger.error("Gave up posting comment %s to hole %s", job.key, job.pid)
+        return None
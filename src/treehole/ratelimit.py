@@ -0,0 +1,199 @@
+"""
+自适应请求速率限制
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Union
+
+from .utils import logger
+
+__all__ = ("RateLimiter",)
+
+THROTTLE_STATUS = (429, 503)
+"""表示服务器过载、需要降速的状态码"""
+
+
+def parse_retry_after(value: Optional[Union[str, float]]) -> Optional[float]:
+    """
+    解析 `Retry-After` 响应头
+
+    Parameters
+    ----------
+    - value: 响应头的值，可以为秒数或 HTTP 日期
+
+    Returns
+    -------
+    1. 需要等待的秒数，无法解析则返回 `None`
+    """
+
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class RateLimiter:
+    """
+    自适应速率限制器（令牌桶 + AIMD）
+
+    每次请求前调用 `acquire` / `acquire_async` 取得令牌，请求后调用 `feedback`
+    上报状态码：成功的请求会使速率缓慢线性上升，遇到 429 / 503 则速率按比例下降，
+    并暂停发送一段指数增长的时间（若服务器给出 `Retry-After` 则以其为下限）。
+    同一个实例可同时被多个线程和协程共享。
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        burst: int = 1,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ) -> None:
+        """
+        - rate:
+            初始速率（次/秒），默认为 5
+        - min_rate:
+            最低速率（次/秒），默认为 0.5
+        - max_rate:
+            最高速率（次/秒），默认为 50
+        - burst:
+            令牌桶容量，即允许的突发请求数，默认为 1
+        - increase:
+            加性增长幅度，持续成功时每秒约提高的速率（次/秒），默认为 0.5
+        - decrease:
+            乘性下降系数，遇到限流时速率乘以该值，默认为 0.5
+        - backoff_base:
+            首次限流的暂停时间（秒），之后连续限流时翻倍，默认为 1
+        - backoff_max:
+            最长暂停时间（秒），默认为 60
+        """
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("rate must satisfy 0 < min_rate <= rate <= max_rate")
+        if burst < 1:
+            raise ValueError("burst must be a positive integer")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        self.__rate = float(rate)
+        self.__min_rate = float(min_rate)
+        self.__max_rate = float(max_rate)
+        self.__burst = burst
+        self.__increase = increase
+        self.__decrease = decrease
+        self.__backoff_base = backoff_base
+        self.__backoff_max = backoff_max
+        self.__lock = threading.Lock()
+        # Theoretical arrival time of the next request (GCRA)
+        self.__next_time = time.monotonic()
+        self.__paused_until = 0.0
+        self.__throttled = 0
+
+    @property
+    def rate(self) -> float:
+        """当前速率（次/秒），只读"""
+        return self.__rate
+
+    @property
+    def paused_for(self) -> float:
+        """距离暂停结束的剩余时间（秒），只读"""
+        return max(0.0, self.__paused_until - time.monotonic())
+
+    def __reserve(self) -> float:
+        """预约一个令牌，返回需要等待的时间"""
+        with self.__lock:
+            now = time.monotonic()
+            interval = 1.0 / self.__rate
+            next_time = max(self.__next_time, now)
+            start = max(now, next_time - (self.__burst - 1) * interval)
+            start = max(start, self.__paused_until)
+            self.__next_time = max(next_time, start) + interval
+            return start - now
+
+    def acquire(self) -> None:
+        """
+        阻塞直到可以发送下一个请求
+        """
+        delay = self.__reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """
+        异步等待直到可以发送下一个请求
+        """
+        delay = self.__reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def feedback(
+        self, status: int, retry_after: Optional[Union[str, float]] = None
+    ) -> None:
+        """
+        上报一次请求结果，调整速率
+
+        Parameters
+        ----------
+        - status: 响应状态码
+        - retry_after: 响应头中的 `Retry-After`，可选
+        """
+
+        if status in THROTTLE_STATUS:
+            self.on_throttle(parse_retry_after(retry_after))
+        elif status < 500:
+            self.on_success()
+
+    def on_success(self) -> None:
+        """
+        请求成功，线性提高速率
+        """
+        with self.__lock:
+            self.__throttled = 0
+            self.__rate = min(
+                self.__max_rate, self.__rate + self.__increase / self.__rate
+            )
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        请求被限流，按比例降低速率并暂停发送
+
+        Parameters
+        ----------
+        - retry_after: 服务器要求等待的秒数，可选
+        """
+        with self.__lock:
+            now = time.monotonic()
+            if now < self.__paused_until:
+                # Requests already in flight when the first throttle arrived
+                # report the same overload, so do not back off again
+                if retry_after is not None:
+                    self.__paused_until = max(self.__paused_until, now + retry_after)
+                return
+            self.__throttled += 1
+            self.__rate = max(self.__min_rate, self.__rate * self.__decrease)
+            pause = min(
+                self.__backoff_max,
+                self.__backoff_base * 2 ** (self.__throttled - 1),
+            )
+            if retry_after is not None:
+                pause = max(pause, retry_after)
+            self.__paused_until = now + pause
+        logger.debug(
+            "Throttled by server, rate reduced to %.2f/s, pausing %.2fs",
+            self.__rate,
+            pause,
+        )
@@ -0,0 +1,116 @@
+"""
+请求重试策略
+"""
+
+import random
+from typing import Collection, Optional
+
+__all__ = ("RetryPolicy",)
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+"""可安全重放的请求方法"""
+
+
+class RetryPolicy:
+    """
+    请求重试策略（带随机抖动的指数退避）
+
+    幂等请求（如 `GET`）在遇到可重试的状态码或网络错误时重试；
+    非幂等请求（如发帖、评论、关注）默认只在服务器明确拒绝处理时（`safe_status`，
+    默认为 429）重试，避免重复提交。可继承并重写 `next_delay` 自定义策略。
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        retry_status: Collection[int] = (429, 500, 502, 503, 504),
+        safe_status: Collection[int] = (429,),
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        jitter: bool = True,
+        deadline: Optional[float] = None,
+        retry_non_idempotent: bool = False,
+    ) -> None:
+        """
+        - max_attempts:
+            最多尝试次数（包含首次请求），默认为 3
+        - retry_status:
+            幂等请求可重试的状态码，默认为 429 及 5xx 网关错误
+        - safe_status:
+            非幂等请求可重试的状态码（服务器未处理请求），默认为 429
+        - backoff_base:
+            首次重试的退避时间（秒），之后每次翻倍，默认为 0.5
+        - backoff_max:
+            单次退避时间上限（秒），默认为 30
+        - jitter:
+            是否在 `[0, 退避时间]` 内随机取值（full jitter），默认为 `True`
+        - deadline:
+            从首次请求开始计算的总时限（秒），超出后不再重试，默认为 `None`（不限）
+        - retry_non_idempotent:
+            是否像幂等请求一样重试非幂等请求（可能导致重复提交），默认为 `False`
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be a positive integer")
+        self.max_attempts = max_attempts
+        self.retry_status = frozenset(retry_status)
+        self.safe_status = frozenset(safe_status)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def is_idempotent(self, method: str) -> bool:
+        """
+        请求是否可以安全重放
+        """
+        return self.retry_non_idempotent or method.upper() in IDEMPOTENT_METHODS
+
+    def backoff(self, attempt: int) -> float:
+        """
+        第 `attempt` 次请求失败后的退避时间（秒）
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        elapsed: float,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """
+        判断是否重试
+
+        Parameters
+        ----------
+        - method: 请求方法
+        - attempt: 已尝试次数
+        - elapsed: 自首次请求起经过的时间（秒）
+        - status: 响应状态码（发生网络错误时为 `None`）
+        - retry_after: 服务器要求的等待时间（秒），可选
+        - error: 网络错误，可选
+
+        Returns
+        -------
+        1. 重试前需要等待的时间（秒），不重试则返回 `None`
+        """
+
+        if attempt >= self.max_attempts:
+            return None
+        if error is not None:
+            if not self.is_idempotent(method):
+                return None
+        elif status in self.safe_status:
+            pass
+        elif status not in self.retry_status or not self.is_idempotent(method):
+            return None
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
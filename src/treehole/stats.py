@@ -0,0 +1,102 @@
+"""
+请求统计
+"""
+
+import threading
+import time
+from typing import Optional
+
+__all__ = ("RequestStats",)
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"  # pragma: no cover
+
+
+class RequestStats:
+    """
+    请求统计（请求数、错误数、响应字节数及其速率）
+
+    可作为 `TreeHoleClient` 的 `stats` 参数，统计经过客户端的全部请求（每次重试各计一次）。
+    响应字节数按 `Content-Length` 统计；状态码不低于 400 或网络错误计为错误。
+    同一个实例可被多个线程和协程共享。
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        清零并重新开始计时
+        """
+        with self.__lock:
+            self.__start = time.monotonic()
+            self.__requests = 0
+            self.__errors = 0
+            self.__bytes = 0
+
+    def record(self, status: Optional[int], size: Optional[int] = None) -> None:
+        """
+        记录一次请求
+
+        Parameters
+        ----------
+        - status: 响应状态码，网络错误为 `None`
+        - size: 响应体字节数，可选
+        """
+
+        with self.__lock:
+            self.__requests += 1
+            if status is None or status >= 400:
+                self.__errors += 1
+            if size:
+                self.__bytes += size
+
+    @property
+    def requests(self) -> int:
+        """请求数，只读"""
+        return self.__requests
+
+    @property
+    def errors(self) -> int:
+        """出错的请求数，只读"""
+        return self.__errors
+
+    @property
+    def bytes(self) -> int:
+        """响应字节数，只读"""
+        return self.__bytes
+
+    @property
+    def elapsed(self) -> float:
+        """开始统计以来的时间（秒），只读"""
+        return time.monotonic() - self.__start
+
+    @property
+    def requests_per_second(self) -> float:
+        """平均每秒请求数，只读"""
+        elapsed = self.elapsed
+        return self.__requests / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """平均每秒响应字节数，只读"""
+        elapsed = self.elapsed
+        return self.__bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """出错请求的比例，只读"""
+        return self.__errors / self.__requests if self.__requests else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.__requests} requests ({self.requests_per_second:.1f}/s), "
+            f"{_format_bytes(self.__bytes)} ({_format_bytes(self.bytes_per_second)}/s), "
+            f"{self.error_rate:.1%} errors"
+        )
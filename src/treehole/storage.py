@@ -0,0 +1,401 @@
+"""
+树洞本地存储（SQLite）
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .models import Comment, Hole, Label
+
+__all__ = ("HoleStore",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    tag_name TEXT,
+    created_at INTEGER,
+    updated_at INTEGER
+);
+CREATE TABLE IF NOT EXISTS holes (
+    pid INTEGER PRIMARY KEY,
+    timestamp INTEGER,
+    type TEXT,
+    text TEXT,
+    image_width INTEGER,
+    image_height INTEGER,
+    extra INTEGER,
+    tag TEXT,
+    label INTEGER,
+    label_id INTEGER,
+    reply INTEGER,
+    likenum INTEGER,
+    anonymous INTEGER,
+    status INTEGER,
+    is_top INTEGER,
+    is_comment INTEGER,
+    is_follow INTEGER,
+    is_protect INTEGER,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS holes_timestamp ON holes (timestamp);
+CREATE TABLE IF NOT EXISTS comments (
+    cid INTEGER PRIMARY KEY,
+    pid INTEGER,
+    timestamp INTEGER,
+    name TEXT,
+    islz INTEGER,
+    text TEXT,
+    tag TEXT,
+    anonymous INTEGER,
+    hidden INTEGER
+);
+CREATE INDEX IF NOT EXISTS comments_pid ON comments (pid, cid);
+CREATE INDEX IF NOT EXISTS comments_timestamp ON comments (timestamp);
+CREATE TABLE IF NOT EXISTS comment_sync (
+    pid INTEGER PRIMARY KEY,
+    count INTEGER,
+    fetched_at REAL
+);
+"""
+
+HOLE_COLUMNS = (
+    "pid",
+    "timestamp",
+    "type",
+    "text",
+    "image_width",
+    "image_height",
+    "extra",
+    "tag",
+    "label",
+    "label_id",
+    "reply",
+    "likenum",
+    "anonymous",
+    "status",
+    "is_top",
+    "is_comment",
+    "is_follow",
+    "is_protect",
+)
+COMMENT_COLUMNS = (
+    "cid",
+    "pid",
+    "timestamp",
+    "name",
+    "islz",
+    "text",
+    "tag",
+    "anonymous",
+    "hidden",
+)
+
+
+class HoleStore:
+    """
+    树洞、评论与标签的本地 SQLite 存储
+
+    使用 WAL 模式，写入先缓冲再批量 upsert（读取前自动落盘）。
+    可作为 `TreeHoleClient` 的 `store` 参数，在请求网络前先读取本地数据，并写回获取到的结果。
+    同一个实例可被多个线程共享；在异步代码中读写会短暂阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        path: str = "treehole.db",
+        max_age: Optional[float] = None,
+        batch_size: int = 500,
+    ) -> None:
+        """
+        - path:
+            数据库文件路径，默认为 `treehole.db`（`:memory:` 为内存数据库）
+        - max_age:
+            读取时数据的最长有效期（秒），过期的数据视为不存在，默认为 `None`（永久有效）
+        - batch_size:
+            缓冲多少条记录后批量写入，默认为 500
+        """
+        self.__max_age = max_age
+        self.__batch_size = batch_size
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.executescript(SCHEMA)
+        self.__holes: List[tuple] = []
+        self.__labels: List[tuple] = []
+        self.__comments: List[tuple] = []
+        self.__syncs: List[tuple] = []
+
+    def __enter__(self) -> "HoleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        写入缓冲区并关闭数据库
+        """
+        with self.__lock:
+            self.flush()
+            self.__connection.close()
+
+    def __pending(self) -> int:
+        return (
+            len(self.__holes)
+            + len(self.__labels)
+            + len(self.__comments)
+            + len(self.__syncs)
+        )
+
+    def flush(self) -> None:
+        """
+        将缓冲区中的记录批量写入数据库
+        """
+        with self.__lock:
+            if not self.__pending():
+                return
+            with self.__connection:
+                self.__connection.executemany(
+                    "INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)", self.__labels
+                )
+                self.__connection.executemany(
+                    f"INSERT OR REPLACE INTO holes ({', '.join(HOLE_COLUMNS)}, "
+                    f"fetched_at) VALUES ({', '.join('?' * 19)})",
+                    self.__holes,
+                )
+                self.__connection.executemany(
+                    f"INSERT OR REPLACE INTO comments ({', '.join(COMMENT_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * 9)})",
+                    self.__comments,
+                )
+                self.__connection.executemany(
+                    "INSERT OR REPLACE INTO comment_sync VALUES (?, ?, ?)",
+                    self.__syncs,
+                )
+            self.__holes.clear()
+            self.__labels.clear()
+            self.__comments.clear()
+            self.__syncs.clear()
+
+    def __maybe_flush(self) -> None:
+        if self.__pending() >= self.__batch_size:
+            self.flush()
+
+    def put_holes(self, holes: Iterable[Hole]) -> None:
+        """
+        写入（更新）树洞及其标签
+        """
+        now = time.time()
+        with self.__lock:
+            for hole in holes:
+                if hole.pid is None:
+                    continue
+                width, height = hole.image_size or (None, None)
+                label = hole.label_info
+                if label is not None and label.id is not None:
+                    self.__labels.append(
+                        (label.id, label.tag_name, label.created_at, label.updated_at)
+                    )
+                self.__holes.append(
+                    (
+                        hole.pid,
+                        hole.timestamp,
+                        hole.type,
+                        hole.text,
+                        width,
+                        height,
+                        hole.extra,
+                        hole.tag,
+                        hole.label,
+                        None if label is None else label.id,
+                        hole.reply,
+                        hole.likenum,
+                        hole.anonymous,
+                        hole.status,
+                        hole.is_top,
+                        hole.is_comment,
+                        hole.is_follow,
+                        hole.is_protect,
+                        now,
+                    )
+                )
+            self.__maybe_flush()
+
+    def put_comments(
+        self, comments: Iterable[Comment], complete_pid: Optional[int] = None
+    ) -> None:
+        """
+        写入（更新）评论
+
+        Parameters
+        ----------
+        - comments: 评论列表
+        - complete_pid: 若 `comments` 为该树洞的全部评论，传入其 pid 以便之后直接从本地读取
+        """
+        with self.__lock:
+            count = 0
+            for comment in comments:
+                count += 1
+                self.__comments.append(
+                    (
+                        comment.cid,
+                        comment.pid,
+                        comment.timestamp,
+                        comment.name,
+                        comment.islz,
+                        comment.text,
+                        comment.tag,
+                        comment.anonymous,
+                        comment.hidden,
+                    )
+                )
+            if complete_pid is not None:
+                self.__syncs.append((int(complete_pid), count, time.time()))
+            self.__maybe_flush()
+
+    def __fresh_since(self) -> float:
+        # Expired rows are marked with a negative fetch time
+        return 0.0 if self.__max_age is None else time.time() - self.__max_age
+
+    @staticmethod
+    def __to_hole(row: tuple) -> Hole:
+        label_info = None
+        if row[18] is not None:
+            label_info = Label(
+                id=row[18], tag_name=row[19], created_at=row[20], updated_at=row[21]
+            )
+        return Hole(
+            pid=row[0],
+            timestamp=row[1],
+            type=row[2],
+            text=row[3],
+            image_size=(row[4] or 0, row[5] or 0),
+            extra=row[6],
+            tag=row[7],
+            label=row[8],
+            label_info=label_info,
+            reply=row[10],
+            likenum=row[11],
+            anonymous=row[12],
+            status=row[13],
+            is_top=row[14],
+            is_comment=row[15],
+            is_follow=row[16],
+            is_protect=row[17],
+        )
+
+    def __select_holes(self, where: str, args: tuple) -> List[Hole]:
+        with self.__lock:
+            self.flush()
+            rows = self.__connection.execute(
+                f"SELECT {', '.join('holes.' + column for column in HOLE_COLUMNS)}, "
+                "labels.id, labels.tag_name, labels.created_at, labels.updated_at "
+                "FROM holes LEFT JOIN labels ON holes.label_id = labels.id "
+                f"WHERE holes.fetched_at >= ? AND {where}",
+                (self.__fresh_since(),) + args,
+            ).fetchall()
+        return [self.__to_hole(row) for row in rows]
+
+    def get_hole(self, pid: Union[int, str]) -> Optional[Hole]:
+        """
+        读取单个树洞，不存在或已过期则返回 `None`
+        """
+        holes = self.__select_holes("holes.pid = ?", (int(pid),))
+        return holes[0] if holes else None
+
+    def get_holes(
+        self, since: Optional[int] = None, until: Optional[int] = None
+    ) -> List[Hole]:
+        """
+        按时间范围读取树洞，按 pid 从新到旧排列
+
+        Parameters
+        ----------
+        - since: 起始时间戳（包含），可选
+        - until: 截止时间戳（包含），可选
+        """
+        return self.__select_holes(
+            "holes.timestamp BETWEEN ? AND ? ORDER BY holes.pid DESC",
+            (
+                -(2**63) if since is None else since,
+                2**63 - 1 if until is None else until,
+            ),
+        )
+
+    def get_comments(
+        self,
+        pid: Union[int, str],
+        page: Union[int, str] = 1,
+        page_size: Optional[Union[int, str]] = None,
+    ) -> Optional[List[Comment]]:
+        """
+        读取树洞的一页评论（按 cid 排列）
+
+        仅当该树洞的全部评论曾被完整写入且未过期时返回，否则返回 `None`
+        """
+        with self.__lock:
+            self.flush()
+            synced = self.__connection.execute(
+                "SELECT count FROM comment_sync WHERE pid = ? AND fetched_at >= ?",
+                (int(pid), self.__fresh_since()),
+            ).fetchone()
+            if synced is None:
+                return None
+            limit = -1 if page_size is None else int(page_size)
+            offset = 0 if page_size is None else (int(page) - 1) * int(page_size)
+            rows = self.__connection.execute(
+                f"SELECT {', '.join(COMMENT_COLUMNS)} FROM comments WHERE pid = ? "
+                "ORDER BY cid LIMIT ? OFFSET ?",
+                (int(pid), limit, offset),
+            ).fetchall()
+        return [
+            Comment(
+                cid=row[0],
+                pid=row[1],
+                timestamp=row[2],
+                name=row[3],
+                islz=row[4],
+                text=row[5],
+                tag=row[6],
+                anonymous=row[7],
+                hidden=row[8],
+            )
+            for row in rows
+        ]
+
+    def expire_hole(self, pid: Union[int, str]) -> None:
+        """
+        将树洞标记为过期（保留数据），下次读取时会重新请求网络
+        """
+        with self.__lock:
+            self.flush()
+            with self.__connection:
+                self.__connection.execute(
+                    "UPDATE holes SET fetched_at = -1 WHERE pid = ?", (int(pid),)
+                )
+
+    def expire_comments(self, pid: Union[int, str]) -> None:
+        """
+        将树洞的评论标记为不完整（保留数据），下次读取时会重新请求网络
+        """
+        with self.__lock:
+            self.flush()
+            with self.__connection:
+                self.__connection.execute(
+                    "DELETE FROM comment_sync WHERE pid = ?", (int(pid),)
+                )
+
+    def stats(self) -> Tuple[int, int]:
+        """
+        返回已存储的树洞数与评论数
+        """
+        with self.__lock:
+            self.flush()
+            holes = self.__connection.execute("SELECT COUNT(*) FROM holes").fetchone()
+            comments = self.__connection.execute(
+                "SELECT COUNT(*) FROM comments"
+            ).fetchone()
+        return holes[0], comments[0]
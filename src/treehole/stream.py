@@ -0,0 +1,160 @@
+"""
+JSON 响应的流式解析
+"""
+
+import re
+from typing import List, Optional, Sequence
+
+__all__ = ("ArrayStream",)
+
+_STRUCTURE = re.compile(rb'["{}\[\],]')
+_QUOTE = re.compile(rb'"')
+
+
+class ArrayStream:
+    """
+    增量解析 JSON 文档中某个数组的元素
+
+    逐块喂入响应体，每当目标数组中的一个元素（对象或数组）完整到达时即返回其原始字节，
+    已返回的数据随即丢弃，因此内存占用与单个元素大小相当，而非整个响应体。
+    只做结构扫描而不校验语法，元素本身交给 JSON 解码函数解析。
+    """
+
+    def __init__(self, path: Sequence[str] = ("data", "data")) -> None:
+        """
+        - path:
+            目标数组在文档中的键路径，默认为 `("data", "data")`（即 `response["data"]["data"]`）
+        """
+        self.__path = list(path)
+        self.__buffer = bytearray()
+        self.__pos = 0
+        self.__stack = bytearray()
+        # Current key of each enclosing object along the way to the array
+        self.__keys: List[Optional[str]] = []
+        self.__expect_key = False
+        self.__string_start: Optional[int] = None
+        self.__array_depth: Optional[int] = None
+        self.__element_start: Optional[int] = None
+        self.__done = False
+        self.__size = 0
+
+    @property
+    def found(self) -> bool:
+        """是否已遇到目标数组，只读"""
+        return self.__array_depth is not None or self.__done
+
+    @property
+    def done(self) -> bool:
+        """目标数组是否已完整解析，只读"""
+        return self.__done
+
+    @property
+    def size(self) -> int:
+        """已喂入的总字节数，只读"""
+        return self.__size
+
+    @property
+    def buffer(self) -> bytes:
+        """尚未丢弃的数据；未遇到目标数组时即为完整的已接收数据，只读"""
+        return bytes(self.__buffer)
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        喂入一块数据
+
+        Returns
+        -------
+        1. 本次新完整到达的数组元素（原始字节）列表
+        """
+
+        self.__size += len(chunk)
+        self.__buffer += chunk
+        elements = []
+        buffer = self.__buffer
+        pos = self.__pos
+        while not self.__done:
+            if self.__string_start is not None:
+                pos = self.__skip_string(pos)
+                if self.__string_start is not None:
+                    pos = len(buffer)
+                    break
+                continue
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = buffer[match.start()]
+            pos = match.end()
+            if char == 0x22:  # "
+                self.__string_start = match.start()
+            elif char in (0x7B, 0x5B):  # { [
+                if (
+                    self.__array_depth is not None
+                    and len(self.__stack) == self.__array_depth
+                ):
+                    self.__element_start = match.start()
+                self.__stack.append(char)
+                self.__keys.append(None)
+                self.__expect_key = char == 0x7B
+                if (
+                    char == 0x5B
+                    and self.__array_depth is None
+                    and self.__keys[:-1] == self.__path
+                    and all(c == 0x7B for c in self.__stack[:-1])
+                ):
+                    self.__array_depth = len(self.__stack)
+            elif char in (0x7D, 0x5D):  # } ]
+                if not self.__stack:
+                    raise ValueError("Unbalanced JSON document")
+                self.__stack.pop()
+                self.__keys.pop()
+                self.__expect_key = False
+                if self.__array_depth is not None:
+                    depth = len(self.__stack)
+                    if depth == self.__array_depth and self.__element_start is not None:
+                        elements.append(bytes(buffer[self.__element_start : pos]))
+                        self.__element_start = None
+                    elif depth < self.__array_depth:
+                        self.__done = True
+            else:  # ,
+                self.__expect_key = bool(self.__stack) and self.__stack[-1] == 0x7B
+        if self.__array_depth is not None:
+            # Drop what has been handed out to keep memory flat
+            cut = min(
+                mark
+                for mark in (pos, self.__element_start, self.__string_start)
+                if mark is not None
+            )
+            del buffer[:cut]
+            pos -= cut
+            if self.__element_start is not None:
+                self.__element_start -= cut
+            if self.__string_start is not None:
+                self.__string_start -= cut
+        self.__pos = pos
+        return elements
+
+    def __skip_string(self, pos: int) -> int:
+        """跳过字符串（可能跨越多块数据），必要时记录对象的键"""
+        buffer = self.__buffer
+        while True:
+            match = _QUOTE.search(buffer, pos)
+            if match is None:
+                return len(buffer)
+            end = match.start()
+            escapes = 0
+            while buffer[end - 1 - escapes] == 0x5C:  # \
+                escapes += 1
+            pos = match.end()
+            if escapes % 2 == 0:
+                break
+        start = self.__string_start
+        self.__string_start = None
+        if (
+            self.__expect_key
+            and self.__array_depth is None
+            and len(self.__stack) <= len(self.__path)
+        ):
+            self.__keys[-1] = bytes(buffer[start + 1 : end]).decode()
+            self.__expect_key = False
+        return pos
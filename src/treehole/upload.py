@@ -0,0 +1,308 @@
+"""
+流式上传（multipart/form-data）
+"""
+
+import io
+import os
+import uuid
+from functools import cache
+from types import ModuleType
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+
+from .utils import lazy_import
+
+aiofiles = lazy_import("aiofiles")
+
+__all__ = ("MultipartStream", "shrink_image")
+
+ImageSource = Union[bytes, str, "os.PathLike[str]", IO[bytes], AsyncIterable[bytes]]
+"""图片来源：二进制数据、文件路径、二进制文件对象或（仅异步）产生字节块的异步迭代器"""
+
+
+@cache
+def _pillow() -> Optional[ModuleType]:
+    """Pillow 的 `PIL.Image` 模块，未安装则返回 `None`"""
+    # Looking up a submodule imports its package, so wait until an image is shrunk
+    return lazy_import("PIL.Image", optional=True)
+
+
+def shrink_image(
+    image: Union[bytes, str, "os.PathLike[str]", IO[bytes]],
+    max_side: Optional[int] = None,
+    quality: int = 85,
+) -> Optional[bytes]:
+    """
+    缩小并重新压缩图片（需要安装 Pillow）
+
+    Parameters
+    ----------
+    - image: 二进制数据、文件路径或二进制文件对象
+    - max_side: 长边的最大像素数，超出则等比缩小，默认为 `None`（不缩放，仅重新压缩）
+    - quality: JPEG / WebP 压缩质量，默认为 85
+
+    Returns
+    -------
+    1. 压缩后的图片数据；动图或压缩后未能变小时返回 `None`（应使用原图）
+    """
+
+    if _pillow() is None:
+        raise ImportError("Pillow is required to shrink images")
+    if isinstance(image, (str, os.PathLike)):
+        original_size = os.path.getsize(image)
+    else:
+        if not isinstance(image, (bytes, bytearray)):
+            # Pillow seeks to the start of the file, so decode a copy taken from
+            # the current position and leave the file where it was
+            start = image.tell()
+            data = image.read()
+            image.seek(start)
+            image = data
+        original_size = len(image)
+        image = io.BytesIO(image)
+    result = _recompress(image, max_side, quality)
+    return result if result is not None and len(result) < original_size else None
+
+
+def _recompress(
+    image: Union[str, "os.PathLike[str]", IO[bytes]],
+    max_side: Optional[int],
+    quality: int,
+) -> Optional[bytes]:
+    """用 Pillow 缩放并重新编码图片，动图返回 `None`"""
+    with _pillow().open(image) as picture:
+        if getattr(picture, "is_animated", False):
+            return None
+        kind = picture.format
+        if max_side is not None and max(picture.size) > max_side:
+            picture.thumbnail((max_side, max_side))
+        if kind not in ("JPEG", "WEBP"):
+            if picture.mode in ("RGBA", "LA", "P") and kind == "PNG":
+                kind = "PNG"
+            else:
+                kind = "JPEG"
+        if kind == "JPEG" and picture.mode != "RGB":
+            picture = picture.convert("RGB")
+        output = io.BytesIO()
+        if kind == "PNG":
+            picture.save(output, kind, optimize=True)
+        else:
+            picture.save(output, kind, quality=quality, optimize=True)
+    return output.getvalue()
+
+
+class MultipartStream:
+    """
+    流式 multipart/form-data 请求体
+
+    文件部分按块从来源中读取，不会整体读入内存。同步请求时作为类文件对象交给 `requests`
+    （可计算长度时带 `Content-Length`），异步请求时由 `aiter()` 逐块产生。
+    来源为路径、二进制数据或可 `seek` 的文件对象时可重放（用于重试），由路径打开的文件在读完或
+    `close()` 时关闭。
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        name: str,
+        source: ImageSource,
+        filename: Optional[str] = None,
+        content_type: str = "application/octet-stream",
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """
+        - fields:
+            普通表单字段
+        - name:
+            文件字段名
+        - source:
+            文件来源：二进制数据、文件路径、二进制文件对象或（仅异步）产生字节块的异步迭代器
+        - filename:
+            文件名，默认与字段名相同
+        - content_type:
+            文件部分的 `Content-Type`，默认为 `application/octet-stream`
+        - chunk_size:
+            每次读取的字节数，默认为 64 KiB
+        """
+        self.__boundary = uuid.uuid4().hex
+        self.__chunk_size = chunk_size
+        head = b"".join(
+            self.__part_header(f'name="{key}"') + str(value).encode("utf-8") + b"\r\n"
+            for key, value in fields.items()
+        )
+        self.__head = head + self.__part_header(
+            f'name="{name}"; filename="{filename or name}"',
+            content_type,
+        )
+        self.__tail = f"\r\n--{self.__boundary}--\r\n".encode()
+        self.__path: Optional[str] = None
+        self.__file: Optional[IO[bytes]] = None
+        self.__iterable: Optional[AsyncIterable[bytes]] = None
+        self.__start = 0
+        self.__size: Optional[int] = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.__file = io.BytesIO(source)
+            self.__size = len(source)
+        elif isinstance(source, (str, os.PathLike)):
+            self.__path = os.fspath(source)
+            self.__size = os.path.getsize(self.__path)
+        elif hasattr(source, "read"):
+            self.__file = source
+            if source.seekable():
+                self.__start = source.tell()
+                self.__size = source.seek(0, io.SEEK_END) - self.__start
+                source.seek(self.__start)
+        elif hasattr(source, "__aiter__"):
+            self.__iterable = source
+        else:
+            raise TypeError(f"Unsupported upload source: {type(source).__name__}")
+        self.__replayable = self.__path is not None or (
+            self.__file is not None and self.__file.seekable()
+        )
+        self.__used = False
+        self.__pending = b""
+        self.__stage = 0
+
+    def __part_header(
+        self, disposition: str, content_type: Optional[str] = None
+    ) -> bytes:
+        header = f"--{self.__boundary}\r\nContent-Disposition: form-data; {disposition}"
+        if content_type is not None:
+            header += f"\r\nContent-Type: {content_type}"
+        return (header + "\r\n\r\n").encode("utf-8")
+
+    def __enter__(self) -> "MultipartStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def content_type(self) -> str:
+        """请求的 `Content-Type`（含分隔符），只读"""
+        return f"multipart/form-data; boundary={self.__boundary}"
+
+    @property
+    def len(self) -> Optional[int]:
+        """请求体的总字节数，来源长度未知时为 `None`（`requests` 据此设置 `Content-Length`），只读"""
+        if self.__size is None:
+            return None
+        return len(self.__head) + self.__size + len(self.__tail)
+
+    @property
+    def replayable(self) -> bool:
+        """请求体能否从头重新发送（用于重试），只读"""
+        return self.__replayable or not self.__used
+
+    def close(self) -> None:
+        """
+        关闭由路径打开的文件
+        """
+        if self.__path is not None and self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def rewind(self) -> None:
+        """
+        回到请求体开头，以便重新发送
+        """
+        if not self.replayable:
+            raise ValueError("Upload source cannot be replayed")
+        if self.__used:
+            self.close()
+            if self.__file is not None and self.__path is None:
+                self.__file.seek(self.__start)
+        self.__used = True
+        self.__pending = b""
+        self.__stage = 0
+
+    def __next_chunk(self) -> bytes:
+        """同步读取下一块数据，读完时返回空字节串"""
+        if not self.__used:
+            self.rewind()
+        if self.__stage == 0:
+            self.__stage = 1
+            return self.__head
+        if self.__stage == 1:
+            if self.__iterable is not None:
+                raise TypeError("Async iterable sources can only be sent with aiter")
+            if self.__file is None:
+                self.__file = open(self.__path, "rb")
+            chunk = self.__file.read(self.__chunk_size)
+            if chunk:
+                return chunk
+            self.close()
+            self.__stage = 2
+            return self.__tail
+        return b""
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        读取请求体（供 `requests` 按块发送）
+        """
+        chunks: List[bytes] = [self.__pending]
+        length = len(self.__pending)
+        while size < 0 or length < size:
+            chunk = self.__next_chunk()
+            if not chunk:
+                break
+            chunks.append(chunk)
+            length += len(chunk)
+        data = b"".join(chunks)
+        if size < 0:
+            self.__pending = b""
+            return data
+        self.__pending = data[size:]
+        return data[:size]
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.rewind()
+        while True:
+            chunk = self.__next_chunk()
+            if not chunk:
+                return
+            yield chunk
+
+    async def aiter(self) -> AsyncIterator[bytes]:
+        """
+        从头逐块异步产生请求体（每次调用都会重新开始）
+        """
+        self.rewind()
+        yield self.__head
+        if self.__iterable is not None:
+            async for chunk in self.__iterable:
+                yield chunk
+        elif self.__path is not None:
+            async with aiofiles.open(self.__path, "rb") as file:
+                while True:
+                    chunk = await file.read(self.__chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        else:
+            while True:
+                chunk = self.__file.read(self.__chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        self.__stage = 2
+        yield self.__tail
+
+    def headers(self) -> Dict[str, Any]:
+        """
+        发送该请求体所需的请求头
+        """
+        headers = {"Content-Type": self.content_type}
+        if self.len is not None:
+            headers["Content-Length"] = str(self.len)
+        return headers
@@ -2,7 +2,13 @@
 辅助功能
 """
 
+import importlib.util
+import json
 import logging
+import struct
+import sys
+from types import ModuleType
+from typing import Any, Callable, Optional, Tuple
 
 
 class EmptyError(Exception):
@@ -13,5 +19,121 @@ class AuthError(Exception):
     """认证错误"""
 
 
+class RequestError(Exception):
+    """请求错误"""
+
+
 logger = logging.getLogger("TreeHole")
 """日志记录器"""
+
+
+def lazy_import(name: str, optional: bool = False) -> Optional[ModuleType]:
+    """
+    延迟导入模块：立即返回模块对象，首次访问其属性时才真正执行导入
+
+    Parameters
+    ----------
+    - name: 模块名，如 `aiohttp`、`PIL.Image`
+    - optional: 是否为可选依赖，为 `True` 时未安装返回 `None`，否则抛出 `ModuleNotFoundError`
+
+    Returns
+    -------
+    1. 模块对象（已导入的模块直接返回）
+    """
+
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        # The parent package of a submodule is missing
+        spec = None
+    if spec is None:
+        if optional:
+            return None
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def json_decoder() -> Callable[[bytes], Any]:
+    """
+    选择可用的最快 JSON 解码函数
+
+    依次尝试 `orjson`、`msgspec`，均未安装时使用标准库 `json`
+    """
+    try:
+        import orjson
+
+        return orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return msgspec.json.decode
+    except ImportError:
+        pass
+    return json.loads
+
+
+IMAGE_HEAD_SIZE = 256 * 1024
+"""读取图片宽高时最多检查的文件开头字节数"""
+
+
+def image_dimensions(head: bytes) -> Optional[Tuple[int, int]]:
+    """
+    从图片文件开头的数据中读取宽高，支持 PNG、JPEG、GIF、WebP 与 BMP
+
+    Parameters
+    ----------
+    - head: 图片文件开头的数据（JPEG 的宽高可能位于较大的 EXIF 信息之后）
+
+    Returns
+    -------
+    1. `(宽, 高)`，无法识别则返回 `None`
+    """
+
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        return struct.unpack("<HH", head[6:10])
+    if head.startswith(b"BM") and len(head) >= 26:
+        width, height = struct.unpack("<ii", head[18:26])
+        return width, abs(height)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+        if head[12:16] == b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if head[12:16] == b"VP8L":
+            bits = int.from_bytes(head[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if head[12:16] == b"VP8X":
+            return (
+                int.from_bytes(head[24:27], "little") + 1,
+                int.from_bytes(head[27:30], "little") + 1,
+            )
+        return None
+    if head.startswith(b"\xff\xd8"):
+        pos = 2
+        while pos + 9 <= len(head):
+            if head[pos] != 0xFF:
+                return None
+            marker = head[pos + 1]
+            if marker == 0xFF:
+                # Fill byte before a marker
+                pos += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                pos += 2
+                continue
+            # Start-of-frame markers carry the dimensions (DHT / JPG / DAC excluded)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", head[pos + 5 : pos + 9])
+                return width, height
+            pos += 2 + struct.unpack(">H", head[pos + 2 : pos + 4])[0]
+    return None
@@ -0,0 +1,168 @@
+"""
+首页树洞增量监听
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple
+
+from .models import Hole
+from .utils import logger
+
+if TYPE_CHECKING:
+    from .client import TreeHoleClient
+
+__all__ = ("FeedEvent", "FeedWatcher")
+
+
+@dataclass(init=True, repr=True, order=False, frozen=True)
+class FeedEvent:
+    """
+    首页变化事件
+    """
+
+    kind: str
+    """事件类型：`new` 为新树洞，`changed` 为回复数或关注数变化"""
+    hole: Hole
+    """最新的树洞数据"""
+    old_reply: Optional[int] = None
+    """变化前的回复数（仅 `changed` 事件）"""
+    old_likenum: Optional[int] = None
+    """变化前的关注数（仅 `changed` 事件）"""
+
+
+class FeedWatcher:
+    """
+    首页树洞增量监听器
+
+    记录已见过的最大 pid（高水位），每次轮询只向后翻页直到回到已知范围，
+    仅产出新树洞以及回复数、关注数发生变化的树洞。落后较多时自动增大每页数量。
+    """
+
+    def __init__(
+        self,
+        client: "TreeHoleClient",
+        page_size: int = 25,
+        max_page_size: int = 500,
+        interval: float = 5.0,
+        track: int = 1000,
+        emit_initial: bool = False,
+    ) -> None:
+        """
+        - client:
+            树洞客户端
+        - page_size:
+            每页数量的初始值（也是下限），默认为 25
+        - max_page_size:
+            每页数量的上限，默认为 500
+        - interval:
+            `watch` 的轮询间隔（秒），默认为 5
+        - track:
+            最多记录多少个树洞的回复数与关注数用于比较，默认为 1000
+        - emit_initial:
+            首次轮询时是否将首页全部树洞作为新树洞产出，默认为 `False`
+        """
+        if not 0 < page_size <= max_page_size:
+            raise ValueError("page_size must satisfy 0 < page_size <= max_page_size")
+        self.__client = client
+        self.__min_page_size = page_size
+        self.__max_page_size = max_page_size
+        self.__page_size = page_size
+        self.__interval = interval
+        self.__track = track
+        self.__emit_initial = emit_initial
+        self.__high_water: Optional[int] = None
+        self.__counters: "OrderedDict[int, Tuple[Optional[int], Optional[int]]]" = (
+            OrderedDict()
+        )
+
+    @property
+    def high_water(self) -> Optional[int]:
+        """已见过的最大 pid，只读"""
+        return self.__high_water
+
+    @property
+    def page_size(self) -> int:
+        """当前每页数量，只读"""
+        return self.__page_size
+
+    async def __fetch_new(self) -> Optional[List[Hole]]:
+        """向后翻页直到回到已知范围，返回获取到的全部树洞"""
+        holes: List[Hole] = []
+        page = 1
+        while True:
+            batch = await self.__client.get_holes_async(page, self.__page_size)
+            if batch is None:
+                return None if page == 1 else holes
+            holes.extend(batch)
+            if self.__high_water is None or not batch:
+                break
+            # Pinned holes stay on top regardless of age, ignore them here
+            if any(
+                hole.pid is not None and hole.pid <= self.__high_water
+                for hole in batch
+                if not hole.is_top
+            ):
+                break
+            page += 1
+        if page > 1:
+            self.__page_size = min(self.__max_page_size, self.__page_size * 2)
+            logger.debug("Feed watcher fell behind, page size -> %s", self.__page_size)
+        elif self.__high_water is not None:
+            # A full first page is mostly known holes once the feed is quiet
+            fresh = sum(
+                1
+                for hole in holes
+                if not hole.is_top
+                and hole.pid is not None
+                and hole.pid > self.__high_water
+            )
+            if fresh < self.__page_size // 4:
+                self.__page_size = max(self.__min_page_size, self.__page_size // 2)
+        return holes
+
+    async def poll(self) -> List[FeedEvent]:
+        """
+        轮询一次首页
+
+        Returns
+        -------
+        1. 自上次轮询以来的事件列表，新树洞按 pid 从旧到新排列，请求错误则返回空列表
+        """
+
+        high_water = self.__high_water
+        holes = await self.__fetch_new()
+        if not holes:
+            return []
+        events: List[FeedEvent] = []
+        seen = set()
+        for hole in sorted(holes, key=lambda hole: hole.pid or 0):
+            if hole.pid is None or hole.pid in seen:
+                continue
+            seen.add(hole.pid)
+            previous = self.__counters.get(hole.pid)
+            if high_water is None:
+                if self.__emit_initial:
+                    events.append(FeedEvent("new", hole))
+            elif previous is None:
+                if hole.pid > high_water:
+                    events.append(FeedEvent("new", hole))
+            elif previous != (hole.reply, hole.likenum):
+                events.append(FeedEvent("changed", hole, *previous))
+            self.__counters[hole.pid] = (hole.reply, hole.likenum)
+            self.__counters.move_to_end(hole.pid)
+            if self.__high_water is None or hole.pid > self.__high_water:
+                self.__high_water = hole.pid
+        while len(self.__counters) > self.__track:
+            self.__counters.popitem(last=False)
+        return events
+
+    async def watch(self) -> AsyncIterator[FeedEvent]:
+        """
+        持续轮询首页，逐个产出事件
+        """
+        while True:
+            for event in await self.poll():
+                yield event
+            await asyncio.sleep(self.__interval)
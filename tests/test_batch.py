@@ -0,0 +1,61 @@
+import pytest
+import treehole.batch
+from treehole import Comment, CommentBatch, Hole, HoleBatch
+
+
+def make_hole(pid: int) -> dict:
+    return {
+        "pid": pid,
+        "text": None if pid == 3 else f"树洞 {pid}",
+        "type": "image" if pid % 2 else "text",
+        "timestamp": 1_600_000_000 + pid,
+        "reply": pid % 4,
+        "likenum": None,
+        "tag": None,
+        "label_info": {"id": 1, "tag_name": "tag"} if pid == 2 else None,
+        "image_size": [pid, pid + 1],
+    }
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure"])
+def use_numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(treehole.batch, "numpy", None)
+
+
+def test_hole_batch(use_numpy):
+    data = [make_hole(pid) for pid in range(10, 0, -1)]
+    batch = HoleBatch.from_data(data)
+    assert len(batch) == 10
+    assert list(batch) == [Hole.from_data(item) for item in data]
+    assert batch[-1] == Hole.from_data(data[-1])
+    assert batch.column("pid").tolist() == list(range(10, 0, -1))
+    assert batch.column("type")[:2] == ["text", "image"]
+
+    selected = batch.where("timestamp", 1_600_000_003, 1_600_000_006)
+    assert [hole.pid for hole in selected] == [6, 5, 4, 3]
+    assert selected[-1].text is None
+    odd = batch.filter([pid % 2 == 1 for pid in batch.column("pid")])
+    assert [hole.pid for hole in odd] == [9, 7, 5, 3, 1]
+    assert batch.where("likenum", 0).column("pid").tolist() == []
+
+
+def test_batch_concat(use_numpy):
+    first = HoleBatch.from_data([make_hole(pid) for pid in (6, 5, 4)])
+    second = HoleBatch.from_data([make_hole(pid) for pid in (3, 2, 1)])
+    batch = HoleBatch.concat([first, second.take([0, 1]), second.take([2])])
+    assert list(batch) == [Hole.from_data(make_hole(pid)) for pid in range(6, 0, -1)]
+    assert len(HoleBatch.concat([])) == 0
+
+
+def test_comment_batch():
+    data = [
+        {"cid": cid, "pid": 1, "text": f"回复 {cid}", "name": name, "islz": 0}
+        for cid, name in enumerate(["Alice", "Bob", "Alice"])
+    ]
+    batch = CommentBatch.from_data(data)
+    assert batch[1] == Comment.from_data(data[1])
+    assert batch.column("name") == ["Alice", "Bob", "Alice"]
+    assert batch.where("cid", 1)[0].text == "回复 1"
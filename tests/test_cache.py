@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from treehole import MockServer, ResponseCache, SingleFlight, TreeHoleClient
+
+
+def test_cache_ttl_and_counters():
+    cache = ResponseCache(ttl=0.05, ttls={"holes": 0})
+    key = cache.key("hole", "pku/1", {"a": "1"})
+    cache.set(key, "hole 1", 10)
+    cache.set(cache.key("holes", "pku_hole/"), "holes", 10)
+    assert cache.get(key) == "hole 1"
+    assert cache.get(cache.key("holes", "pku_hole/")) is None
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_lru_bounds():
+    cache = ResponseCache(max_entries=2)
+    for pid in range(3):
+        cache.set(cache.key("hole", f"pku/{pid}"), pid, 10)
+    assert len(cache) == 2
+    assert cache.get(cache.key("hole", "pku/0")) is None
+    cache.get(cache.key("hole", "pku/1"))
+    cache.set(cache.key("hole", "pku/3"), 3, 10)
+    assert cache.get(cache.key("hole", "pku/1")) == 1
+    assert cache.get(cache.key("hole", "pku/2")) is None
+
+    cache = ResponseCache(max_bytes=100)
+    for pid in range(3):
+        cache.set(cache.key("image", f"pku_image/{pid}"), b"", 40)
+    assert len(cache) == 2
+    assert cache.nbytes == 80
+
+
+def test_cache_invalidate():
+    cache = ResponseCache()
+    cache.set(cache.key("comment", "pku_comment/1", {"page": "1"}), [], 1)
+    cache.set(cache.key("comment", "pku_comment/1", {"page": "2"}), [], 1)
+    cache.set(cache.key("comment", "pku_comment/2", {"page": "1"}), [], 1)
+    assert cache.invalidate("comment", "pku_comment/1") == 2
+    assert len(cache) == 1
+
+
+def test_cache_single_flight():
+    cache = ResponseCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value", 5
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.load(("hole",), loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_single_flight_async():
+    cache = ResponseCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value", None
+
+    results = await asyncio.gather(
+        *(cache.load_async(("hole",), loader) for _ in range(8))
+    )
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_collapses_and_shares_errors():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return object()
+
+    results = await asyncio.gather(*(flight.run("hole", fetch) for _ in range(5)))
+    assert all(result is results[0] for result in results)
+    assert (flight.calls, flight.collapsed) == (1, 4)
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flight.run("hole", fail) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_concurrent_reads():
+    with MockServer(holes=20, latency=0.05) as server:
+        pid = next(pid for pid in range(20, 0, -1) if server.hole_data(pid))
+        async with TreeHoleClient(
+            token="token", base_url=server.base_url, coalesce=True
+        ) as client:
+            holes = await asyncio.gather(
+                *(client.get_hole_async(pid) for _ in range(4)),
+                *(client.get_hole_async(str(pid)) for _ in range(4)),
+            )
+            assert holes[0].pid == pid
+            assert all(hole is holes[0] for hole in holes)
+            assert server.requests["hole"] == 1
+            assert client.single_flight.collapsed == 7
+            # Only concurrent calls are shared
+            await client.get_hole_async(pid)
+            assert server.requests["hole"] == 2
+
+        async with TreeHoleClient(token="token", base_url=server.base_url) as client:
+            await asyncio.gather(*(client.get_hole_async(pid) for _ in range(4)))
+            assert server.requests["hole"] == 6
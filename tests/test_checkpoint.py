@@ -0,0 +1,104 @@
+import pytest
+from treehole import Checkpoint, Hole, TreeHoleClient
+
+
+class FakeClient(TreeHoleClient):
+    """Serves holes 1..100 with timestamps equal to their pids, every 7th is deleted"""
+
+    def __init__(self):
+        super().__init__(token="token")
+        self.requested = []
+
+    async def get_hole_async(self, pid):
+        self.requested.append(pid)
+        return None if pid % 7 == 0 else Hole(pid=pid, timestamp=pid)
+
+
+def test_checkpoint_journal(tmp_path):
+    path = tmp_path / "crawl.checkpoint"
+    checkpoint = Checkpoint(path)
+    checkpoint.done(1)
+    checkpoint.fail(2, "timeout")
+    checkpoint.fail(3)
+    checkpoint.done(3, {"comments": 4})
+    checkpoint.done(1, scope="comments")
+    checkpoint.set_cursor("page", 5, scope="comments")
+    with open(path, "a") as file:
+        file.write('{"scope": "holes", "pid": 4, "sta')
+
+    for reloaded in (Checkpoint(path), checkpoint):
+        assert reloaded.completed() == {1: None, 3: {"comments": 4}}
+        assert reloaded.failed() == {2: "timeout"}
+        assert reloaded.is_done("1", "comments") and not reloaded.is_done(4)
+        assert reloaded.cursor("page", scope="comments") == 5
+        assert len(reloaded) == 3
+    checkpoint.set_cursor("page", None, scope="comments")
+    checkpoint.compact()
+    with open(path) as file:
+        assert len(file.readlines()) == 4
+    assert Checkpoint(path).cursor("page", 1, scope="comments") == 1
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / "backfill.checkpoint"
+    delivered = []
+
+    def crash_at_60(hole):
+        if hole.pid == 60:
+            raise RuntimeError("interrupted")
+        delivered.append(hole)
+
+    client = FakeClient()
+    with pytest.raises(RuntimeError):
+        await client.backfill_async(
+            50,
+            concurrency=1,
+            start_pid=100,
+            on_hole=crash_at_60,
+            checkpoint=Checkpoint(path),
+        )
+    assert client.requested == list(range(100, 59, -1))
+
+    client = FakeClient()
+    holes, errors = await client.backfill_async(
+        50, concurrency=1, on_hole=delivered.append, checkpoint=Checkpoint(path)
+    )
+    # Deleted pids are tried again, finished ones are not
+    assert client.requested[:6] == [98, 91, 84, 77, 70, 63]
+    assert client.requested[6:] == list(range(60, 47, -1))
+    assert [hole.pid for hole in holes] == [60, 59, 58, 57, 55, 54, 53, 52, 51, 50]
+    assert sorted(errors) == [49, 56, 63, 70, 77, 84, 91, 98]
+    assert sorted(hole.pid for hole in delivered) == sorted(
+        pid for pid in range(50, 101) if pid % 7
+    )
+
+    client = FakeClient()
+    holes, _ = await client.backfill_async(50, checkpoint=Checkpoint(path))
+    assert holes == [] and all(pid % 7 == 0 for pid in client.requested)
+
+
+@pytest.mark.asyncio
+async def test_backfill_rerun_with_wider_window(tmp_path):
+    path = tmp_path / "backfill.checkpoint"
+    client = FakeClient()
+    holes, _ = await client.backfill_async(
+        80, concurrency=1, start_pid=100, checkpoint=Checkpoint(path)
+    )
+    assert [hole.pid for hole in holes][-1] == 80
+
+    # Holes older than the first window were fetched but never delivered
+    client = FakeClient()
+    holes, errors = await client.backfill_async(
+        70, concurrency=1, checkpoint=Checkpoint(path)
+    )
+    assert client.requested == [98, 91, 84] + list(range(79, 68, -1))
+    assert [hole.pid for hole in holes] == [79, 78, 76, 75, 74, 73, 72, 71]
+    assert sorted(errors) == [70, 77, 84, 91, 98]
+
+    # The same window again stops at the recorded boundary
+    client = FakeClient()
+    holes, _ = await client.backfill_async(
+        70, concurrency=1, checkpoint=Checkpoint(path)
+    )
+    assert holes == [] and client.requested == [98, 91, 84, 77, 70]
@@ -0,0 +1,49 @@
+import json
+import logging
+
+import pytest
+from treehole import MockServer, RequestStats
+from treehole.cli import _done_pids, _parse_pids, _parse_time, main
+from treehole.utils import logger
+
+
+def test_request_stats():
+    stats = RequestStats()
+    stats.record(200, 1024)
+    stats.record(429)
+    stats.record(None)
+    assert (stats.requests, stats.errors, stats.bytes) == (3, 2, 1024)
+    assert stats.error_rate == pytest.approx(2 / 3)
+    assert stats.requests_per_second > 0
+    assert "3 requests" in str(stats) and "1.0 KiB" in str(stats)
+    stats.reset()
+    assert stats.requests == 0 and stats.error_rate == 0.0
+
+
+def test_cli_arguments(tmp_path):
+    assert _parse_pids(["5", "1-3", '{"pid": 9}', ""]) == [5, 3, 2, 1, 9]
+    assert _parse_time("1600000000") == 1600000000
+    assert isinstance(_parse_time("2022-09-01T08:00"), int)
+    output = tmp_path / "holes.jsonl"
+    output.write_text(json.dumps({"pid": 1}) + "\n" + '{"pid": 2')
+    assert _done_pids(str(output)) == {1}
+    assert _done_pids(str(tmp_path / "missing.jsonl")) == set()
+    with pytest.raises(SystemExit):
+        main(["--token", "", "holes", "1", "2"])
+
+
+def test_cli_logs_failures(tmp_path, caplog):
+    level = logger.level
+    output = str(tmp_path / "holes.jsonl")
+    try:
+        with MockServer(holes=30) as server:
+            deleted = [pid for pid in range(1, 31) if server.hole_data(pid) is None]
+            args = ["--token", "token", "--base-url", server.base_url, "--progress=0"]
+            assert main(args + ["holes", "1", "30", "-o", output]) == 0
+            assert logger.getEffectiveLevel() == logging.WARNING
+            failures = [r for r in caplog.records if r.levelno >= logging.WARNING]
+            assert len(failures) >= len(deleted) > 0
+            main(["-vv"] + args + ["holes", "1", "30", "-o", output])
+            assert logger.getEffectiveLevel() == logging.DEBUG
+    finally:
+        logger.setLevel(level)
@@ -0,0 +1,268 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from treehole import Comment, Hole, MockServer, TreeHoleClient
+from treehole.utils import RequestError
+
+
+class FakeClient(TreeHoleClient):
+    """
+    Serves hole pid after a delay of `pid % 4` ticks, holes with pid divisible by 7
+    are deleted and hole 13 raises, while tracking the number of requests in flight
+    """
+
+    TICK = 0.01
+
+    def __init__(self):
+        super().__init__(token="token")
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.completed = []
+
+    def result(self, pid):
+        pid = int(pid)
+        with self.lock:
+            self.active -= 1
+            self.completed.append(pid)
+        if pid == 13:
+            raise RuntimeError("boom")
+        return None if pid % 7 == 0 else Hole(pid=pid, timestamp=pid)
+
+    def start(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def get_hole(self, pid):
+        self.start()
+        time.sleep(int(pid) % 4 * self.TICK)
+        return self.result(pid)
+
+    async def get_hole_async(self, pid):
+        self.start()
+        await asyncio.sleep(int(pid) % 4 * self.TICK)
+        return self.result(pid)
+
+
+def check_holes_by_ids(client, holes, errors, ordered):
+    alive = [pid for pid in range(1, 41) if pid % 7 and pid != 13]
+    assert 1 < client.peak <= 4
+    assert len(client.completed) == 40 and client.completed != sorted(client.completed)
+    pids = [hole.pid for hole in holes]
+    if ordered:
+        assert pids == alive
+    else:
+        # Completion order, where faster pids overtake slower ones
+        assert sorted(pids) == alive and pids != alive
+    assert sorted(errors) == [7, 13, 14, 21, 28, 35]
+    assert isinstance(errors[13], RuntimeError)
+    assert all(isinstance(errors[pid], RequestError) for pid in (7, 14, 21, 28, 35))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_get_holes_by_ids(ordered):
+    client = FakeClient()
+    holes, errors = client.get_holes_by_ids(
+        iter(range(1, 41)), concurrency=4, ordered=ordered
+    )
+    check_holes_by_ids(client, holes, errors, ordered)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_get_holes_by_ids_async(ordered):
+    client = FakeClient()
+    holes, errors = await client.get_holes_by_ids_async(
+        iter(range(1, 41)), concurrency=4, ordered=ordered
+    )
+    check_holes_by_ids(client, holes, errors, ordered)
+
+
+class PagedClient(TreeHoleClient):
+    """Serves 20 comments of hole 1 page by page, recording the requested pages"""
+
+    def __init__(self, delay=0.0):
+        super().__init__(token="token")
+        self.delay = delay
+        self.pages = []
+        self.cancelled = []
+
+    def page(self, page, page_size):
+        page, page_size = int(page), int(page_size)
+        self.pages.append(page)
+        return [
+            Comment(cid=cid, pid=1)
+            for cid in range((page - 1) * page_size + 1, min(page * page_size, 20) + 1)
+        ]
+
+    def get_comment(self, pid, page=1, page_size=500):
+        time.sleep(self.delay)
+        return self.page(page, page_size)
+
+    async def get_comment_async(self, pid, page=1, page_size=500):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(int(page))
+            raise
+        return self.page(page, page_size)
+
+
+def test_iter_pages():
+    client = PagedClient()
+    comments = list(client.iter_comments(1, page_size=7))
+    # The short third page is followed by an empty one
+    assert [comment.cid for comment in comments] == list(range(1, 21))
+    assert client.pages == [1, 2, 3, 4]
+
+    client = PagedClient()
+    comments = list(client.iter_comments(1, page_size=7, until=lambda c: c.cid > 9))
+    assert [comment.cid for comment in comments] == list(range(1, 10))
+    # The prefetch of page 3 is cancelled unless it already started
+    assert client.pages[:2] == [1, 2] and 4 not in client.pages
+
+    client = PagedClient(delay=0.05)
+    iterator = client.iter_comments(1, page_size=7)
+    for comment in iterator:
+        break
+    iterator.close()
+    time.sleep(0.1)
+    # Only the prefetched page was requested after the consumer left
+    assert client.pages == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_async():
+    client = PagedClient()
+    comments = [comment async for comment in client.iter_comments_async(1, 2, 7)]
+    assert [comment.cid for comment in comments] == list(range(8, 21))
+    assert client.pages == [2, 3, 4]
+
+    client = PagedClient()
+    iterator = client.iter_comments_async(1, page_size=7, until=lambda c: c.cid > 9)
+    assert [comment.cid async for comment in iterator] == list(range(1, 10))
+    assert client.pages == [1, 2]
+
+    client = PagedClient(delay=0.05)
+    iterator = client.iter_comments_async(1, page_size=7)
+    async for comment in iterator:
+        # Let the prefetch of page 2 start before leaving
+        await asyncio.sleep(0.01)
+        break
+    await iterator.aclose()
+    await asyncio.sleep(0.1)
+    assert client.pages == [1] and client.cancelled == [2]
+
+
+class TimelineClient(TreeHoleClient):
+    """
+    Serves holes 1..100 posted at `pid * 10`, every 7th is deleted and
+    pids 31..60 do not exist
+    """
+
+    def __init__(self):
+        super().__init__(token="token")
+        self.requested = []
+
+    def hole(self, pid):
+        self.requested.append(pid)
+        if pid % 7 == 0 or 30 < pid <= 60 or pid > 100:
+            return None
+        return Hole(pid=pid, timestamp=pid * 10)
+
+    def get_hole(self, pid):
+        return self.hole(pid)
+
+    async def get_hole_async(self, pid):
+        await asyncio.sleep(0)
+        return self.hole(pid)
+
+    def get_holes(self, page=1, page_size=25):
+        return [Hole(pid=pid) for pid in range(100, 75, -1)]
+
+    async def get_holes_async(self, page=1, page_size=25):
+        return self.get_holes(page, page_size)
+
+
+async def run_backfill(client, mode, *args, **kwargs):
+    if mode == "sync":
+        return client.backfill(*args, **kwargs)
+    return await client.backfill_async(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["sync", "async"])
+async def test_backfill_window(mode):
+    client = TimelineClient()
+    holes, errors = await run_backfill(client, mode, 705, 905, concurrency=4)
+    assert [hole.pid for hole in holes] == [pid for pid in range(90, 70, -1) if pid % 7]
+    # Deleted holes above the boundary (hole 69) are reported, even after `until`
+    assert sorted(errors) == [70, 77, 84, 91, 98]
+    # Starts from the latest hole and stops soon after crossing `since`
+    assert max(client.requested) == 100
+    assert 69 - 4 <= min(client.requested) <= 69
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["sync", "async"])
+async def test_backfill_max_gap(mode):
+    client = TimelineClient()
+    holes, errors = await run_backfill(
+        client, mode, 0, concurrency=1, start_pid=105, max_gap=10
+    )
+    assert [hole.pid for hole in holes] == [
+        pid for pid in range(100, 60, -1) if pid % 7
+    ]
+    # Pids 60..51 after the lowest hole 61 make up the gap
+    assert client.requested == list(range(105, 50, -1))
+    assert sorted(errors) == sorted(
+        [*range(51, 61), *range(101, 106), 63, 70, 77, 84, 91, 98]
+    )
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Records every `requests.Session` the client creates and whether it was closed"""
+    import requests
+
+    created = []
+
+    class Session(requests.Session):
+        def __init__(self):
+            super().__init__()
+            self.closed = False
+            created.append(self)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    monkeypatch.setattr(requests, "Session", Session)
+    return created
+
+
+def test_session_pool(sessions):
+    with MockServer(holes=20) as server:
+        pids = range(20, 10, -1)
+        client = TreeHoleClient(token="token", base_url=server.base_url)
+        for pid in pids:
+            client.get_hole(pid)
+        assert len(sessions) == 1 and client.session is sessions[0]
+        client.close()
+        assert sessions[0].closed
+        client.get_hole(20)
+        assert len(sessions) == 2
+
+        with TreeHoleClient(
+            token="token", base_url=server.base_url, idle_timeout=0.05
+        ) as client:
+            client.get_hole(20)
+            client.get_hole(19)
+            assert len(sessions) == 3
+            time.sleep(0.1)
+            client.get_hole(18)
+            assert len(sessions) == 4 and sessions[2].closed
+        assert sessions[3].closed
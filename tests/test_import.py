@@ -1,3 +1,8 @@
+import importlib
+import subprocess
+import sys
+
+
 def test_import():
     import treehole
 
@@ -7,3 +12,47 @@ def test_import():
     assert treehole.TreeHoleClient is not None
     assert treehole.Hole is not None
     assert treehole.Comment is not None
+
+
+def import_time(code, nested=False):
+    """
+    Import time (µs) of every module imported by `code`, as reported by
+    `python -X importtime`; top level imports only unless `nested`
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Top level imports do not overlap, nested ones are indented
+        if nested or not name[1:].startswith(" "):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_import_time():
+    code = "import treehole; treehole.Hole; treehole.TreeHoleClient"
+    startup = sum(import_time("pass").values())
+    modules = import_time(code)
+    imported = {name.split(".")[0] for name in import_time(code, nested=True)}
+    assert not {"aiohttp", "aiofiles", "requests", "numpy", "PIL"} & imported
+    http = sum(import_time("import aiohttp, requests").values())
+    assert sum(modules.values()) - startup < (http - startup) / 2
+
+
+def test_lazy_exports():
+    import treehole
+
+    for name in treehole.__all__:
+        module = importlib.import_module(getattr(treehole, name).__module__)
+        assert name in module.__all__
+    modules = {treehole._EXPORTS[name] for name in treehole.__all__}
+    for module in modules:
+        exported = importlib.import_module(f"treehole.{module}").__all__
+        assert set(exported) <= set(treehole.__all__)
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+from treehole import ImageMirror, MirrorReport
+
+
+def test_mirror_dedup_and_manifest(tmp_path):
+    mirror = ImageMirror(tmp_path)
+    assert mirror.add(1, b"image", "image/png")
+    assert not mirror.add(2, b"image", "image/png")
+    assert mirror.add(3, b"other", "image/jpeg")
+    assert mirror.get(1).sha256 == mirror.get(2).sha256
+    assert mirror.path(mirror.get(1)).endswith(".png")
+    with open(mirror.path(mirror.get(3)), "rb") as file:
+        assert file.read() == b"other"
+    with open(tmp_path / ImageMirror.MANIFEST, "a") as file:
+        file.write('{"pid": 4, "sha')
+
+    reloaded = ImageMirror(tmp_path)
+    assert len(reloaded) == 3 and "2" in reloaded and 4 not in reloaded
+    assert reloaded.get(3) == mirror.get(3)
+
+
+@pytest.mark.asyncio
+async def test_mirror_async(tmp_path):
+    mirror = ImageMirror(tmp_path)
+    assert await mirror.add_async(1, b"image", "image/gif")
+    assert not await mirror.add_async(2, b"image", "image/gif")
+    objects = [files for _, _, files in os.walk(tmp_path / "objects") if files]
+    assert objects == [[os.path.basename(mirror.path(mirror.get(1)))]]
+
+
+def test_mirror_report():
+    report = MirrorReport(downloaded=10, bytes=2048, elapsed=2.0)
+    assert report.images_per_second == 5.0
+    assert report.bytes_per_second == 1024.0
+    assert MirrorReport().images_per_second == 0.0
@@ -0,0 +1,110 @@
+import asyncio
+import gc
+import json
+import warnings
+
+import pytest
+from treehole import Hole, MockServer, RetryPolicy, TreeHoleClient
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockServer(holes=300, comments=60, image_bytes=10_000) as server:
+        yield server
+
+
+def test_mock_reads(server):
+    client = TreeHoleClient(token="token", base_url=server.base_url)
+    holes = client.get_holes(page_size=50)
+    alive = [pid for pid in range(server.latest_pid, 0, -1) if server.hole_data(pid)]
+    assert [hole.pid for hole in holes] == alive[:50]
+    assert client.get_hole(holes[0].pid) == holes[0]
+    deleted = next(pid for pid in range(1, 301) if server.hole_data(pid) is None)
+    assert client.get_hole(deleted) is None
+    hole = max(holes, key=lambda hole: hole.reply)
+    comments = list(client.iter_comments(hole.pid, page_size=7))
+    assert len(comments) == hole.reply
+    assert len({comment.cid for comment in comments}) == hole.reply
+    image = next(hole for hole in holes if hole.type == "image")
+    content, content_type = client.get_hole_image(image)
+    assert content == server.image_data(image.pid) and content_type == "image/png"
+
+
+def test_mock_image_resume(server, tmp_path):
+    client = TreeHoleClient(token="token", base_url=server.base_url)
+    pid = next(pid for pid in range(300, 0, -1) if server.image_data(pid))
+    hole = client.get_hole(pid)
+    content = server.image_data(pid)
+    dest = tmp_path / "image.png"
+    (tmp_path / "image.png.part").write_bytes(content[:4000])
+    assert client.download_hole_image(hole, dest) == len(content)
+    assert dest.read_bytes() == content
+
+
+def test_mock_writes(server):
+    client = TreeHoleClient(uid=1, password="password", base_url=server.base_url)
+    pid = next(pid for pid in range(300, 0, -1) if server.hole_data(pid))
+    replies = client.get_hole(pid).reply
+    assert client.post_comment(pid, "hello")
+    assert client.get_comment(pid, page_size=500)[-1].text == "[Alice] hello"
+    assert client.get_hole(pid).reply == replies + 1
+    assert client.post_toggle_followed(pid) == (True, 1)
+    assert [hole.pid for hole in client.get_followed()] == [pid]
+    assert client.post_report(pid, "test")
+    assert server.reports[-1] == (pid, "test")
+    assert client.post_hole("new hole")
+    assert client.get_hole(server.latest_pid).text == "new hole"
+
+
+def test_async_session_across_loops(server):
+    client = TreeHoleClient(token="token", base_url=server.base_url)
+
+    async def fetch():
+        pids = range(server.latest_pid, server.latest_pid - 10, -1)
+        return await asyncio.gather(*map(client.get_hole_async, pids))
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for _ in range(2):
+            assert any(asyncio.run(fetch()))
+        asyncio.run(client.aclose())
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+
+@pytest.mark.asyncio
+async def test_mock_faults(server):
+    retry = RetryPolicy(max_attempts=3, backoff_base=0.01)
+    async with TreeHoleClient(
+        token="token", base_url=server.base_url, retry=retry
+    ) as client:
+        before = server.requests.get("hole", 0)
+        server.fail(2, 503, retry_after=0)
+        assert isinstance(await client.get_hole_async(server.latest_pid), Hole)
+        assert server.requests["hole"] - before == 3
+        server.fail(3)
+        assert await client.get_hole_async(server.latest_pid) is None
+        server.error_rate = 0.3
+        try:
+            holes, errors = await client.get_holes_by_ids_async(range(1, 101))
+        finally:
+            server.error_rate = 0.0
+        missing = [pid for pid in range(1, 101) if server.hole_data(pid) is None]
+        assert len(holes) + len(errors) == 100 and len(errors) >= len(missing)
+
+
+@pytest.mark.asyncio
+async def test_mock_write_failure_without_message(server):
+    def decoder(body):
+        # Some failures come without a message
+        response = json.loads(body)
+        response.pop("message", None)
+        return response
+
+    client = TreeHoleClient(token="token", base_url=server.base_url, decoder=decoder)
+    deleted = next(pid for pid in range(1, 301) if server.hole_data(pid) is None)
+    assert client.post_comment(deleted, "hello") is False
+    assert client.post_report(deleted, "test") is False
+    async with client:
+        assert await client.post_comment_async(deleted, "hello") is False
+        assert await client.post_report_async(deleted, "test") is False
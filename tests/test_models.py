@@ -1,4 +1,6 @@
-from treehole import Hole, Comment, UserName
+import pickle
+
+from treehole import Hole, Comment, CompactHole, CompactComment, UserName
 
 
 fake_hole = {
@@ -58,6 +60,35 @@ def test_comment_from_data():
     assert isinstance(comment.islz, int)
 
 
+def test_from_list():
+    data = [
+        {**fake_hole, "pid": pid, "type": "".join(["te", "xt"])} for pid in range(3)
+    ]
+    data.append({"pid": 3, "label_info": {"id": 1}})
+    holes = Hole.from_list(data)
+    assert holes == [Hole.from_data(item) for item in data]
+    assert holes[0].type is holes[1].type
+    assert holes[0].image_size is holes[2].image_size
+    comments = CompactComment.from_list([fake_comment, {}])
+    assert comments == [CompactComment.from_data(fake_comment), CompactComment()]
+
+
+def test_compact_models():
+    hole = CompactHole.from_data(fake_hole)
+    assert not hasattr(hole, "__dict__")
+    assert hole.data == Hole.from_data(fake_hole).data
+    data = {**fake_hole, "label_info": {"id": 1, "tag_name": "fake"}}
+    hole = CompactHole.from_data(data)
+    assert not hasattr(hole.label_info, "__dict__")
+    assert hole.label_info.tag_name == "fake"
+    assert hole == pickle.loads(pickle.dumps(hole))
+    assert hash(hole) == hash(CompactHole.from_data(data))
+    comment = CompactComment.from_data(fake_comment)
+    assert not hasattr(comment, "__dict__")
+    assert comment.data == Comment.from_data(fake_comment).data
+    assert repr(comment) == repr(Comment.from_data(fake_comment))
+
+
 def test_user_name():
     assert "Angry Alice" in UserName
     assert "alice" in UserName
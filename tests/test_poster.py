@@ -0,0 +1,115 @@
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+import pytest
+from treehole import (
+    Comment,
+    CommentPoster,
+    HoleStore,
+    MockServer,
+    ResponseCache,
+    TreeHoleClient,
+)
+
+
+class FakeBoard:
+    """
+    Stores posted comments under the name Alice, with the name prefix the server
+    adds; `lost` posts are stored but answered with an error
+    """
+
+    def __init__(self, lost=0, rejected=0):
+        self.comments = []
+        self.lost = lost
+        self.rejected = rejected
+        self.requests = 0
+
+    async def post_comment_async(self, pid, text, reply_to=None):
+        self.requests += 1
+        if self.rejected:
+            self.rejected -= 1
+            return None
+        self.comments.append(
+            Comment(
+                cid=len(self.comments),
+                pid=pid,
+                name="Alice",
+                text=f"[Alice] {text}",
+                timestamp=time.time(),
+            )
+        )
+        if self.lost:
+            self.lost -= 1
+            return None
+        return True
+
+    async def get_comment_async(self, pid, page=1, page_size=500):
+        comments = [comment for comment in self.comments if comment.pid == pid]
+        return comments[(page - 1) * page_size : page * page_size]
+
+
+@pytest.mark.asyncio
+async def test_poster_checks_before_retrying():
+    board = FakeBoard(lost=2, rejected=1)
+    async with CommentPoster(board, concurrency=3, rate=1000) as poster:
+        futures = [poster.submit(1, f"comment {i}") for i in range(5)]
+        assert [await future for future in futures] == [True] * 5
+    texts = [comment.text for comment in board.comments]
+    assert sorted(texts) == [f"[Alice] comment {i}" for i in range(5)]
+    assert poster.verified == 2
+    assert board.requests == 6
+
+
+@pytest.mark.asyncio
+async def test_poster_dedupe_key(tmp_path):
+    ledger = str(tmp_path / "ledger.jsonl")
+    board = FakeBoard()
+    async with CommentPoster(board, rate=1000, ledger=ledger) as poster:
+        first = poster.submit(1, "hello", reply_to=1, key="greeting")
+        assert poster.submit(1, "hello", reply_to=1, key="greeting") is first
+        assert await first
+    assert [comment.text for comment in board.comments] == ["[Alice] Re Bob: hello"]
+
+    async with CommentPoster(board, rate=1000, ledger=ledger) as poster:
+        again = poster.submit(1, "hello", reply_to=1, key="greeting")
+        assert again.done() and again.result() is True
+        assert poster.deduplicated == 1
+    assert board.requests == 1
+
+
+class DroppingClient(TreeHoleClient):
+    """Loses the connection after the server has accepted the first comment"""
+
+    drops = 1
+
+    @asynccontextmanager
+    async def _TreeHoleClient__request_async(self, method, url, **kwargs):
+        async with super()._TreeHoleClient__request_async(
+            method, url, **kwargs
+        ) as response:
+            if method == "POST" and self.drops:
+                self.drops -= 1
+                await response.read()
+                raise aiohttp.ServerDisconnectedError()
+            yield response
+
+
+@pytest.mark.asyncio
+async def test_poster_sees_comment_lost_in_transit():
+    with MockServer(holes=20, comments=5) as server, HoleStore(":memory:") as store:
+        pid = next(pid for pid in range(20, 0, -1) if server.hole_data(pid))
+        async with DroppingClient(
+            token="token",
+            base_url=server.base_url,
+            response_cache=ResponseCache(ttl=60),
+            store=store,
+        ) as client:
+            before = await client.get_comment_async(pid)
+            async with CommentPoster(client, rate=1000) as poster:
+                assert await poster.submit(pid, "hello")
+            assert poster.verified == 1 and poster.posted == 1
+            comments = await client.get_comment_async(pid)
+        assert [comment.text for comment in comments[len(before) :]] == [
+            "[Alice] hello"
+        ]
@@ -0,0 +1,40 @@
+import time
+
+from treehole import RateLimiter
+from treehole.ratelimit import parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_rate_increases_on_success():
+    limiter = RateLimiter(rate=2.0, max_rate=3.0, increase=1.0)
+    for _ in range(100):
+        limiter.feedback(200)
+    assert limiter.rate == 3.0
+
+
+def test_rate_decreases_on_throttle():
+    limiter = RateLimiter(rate=8.0, min_rate=1.0, backoff_base=0.0)
+    limiter.feedback(503)
+    assert limiter.rate == 4.0
+    limiter.feedback(429)
+    assert limiter.rate == 2.0
+    limiter.feedback(500)
+    assert limiter.rate == 2.0
+
+
+def test_retry_after_pauses():
+    limiter = RateLimiter(rate=50.0, backoff_base=0.0)
+    limiter.feedback(503, "0.2")
+    assert limiter.paused_for > 0.1
+    # Concurrent throttles during the pause do not compound the backoff
+    limiter.feedback(503)
+    assert limiter.rate == 25.0
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start > 0.1
@@ -0,0 +1,33 @@
+from treehole import RetryPolicy
+
+
+def test_retry_idempotent():
+    policy = RetryPolicy(max_attempts=3, jitter=False, backoff_base=1.0)
+    assert policy.next_delay("GET", 1, 0.0, status=503) == 1.0
+    assert policy.next_delay("GET", 2, 0.0, status=502) == 2.0
+    assert policy.next_delay("GET", 3, 0.0, status=503) is None
+    assert policy.next_delay("GET", 1, 0.0, status=200) is None
+    assert policy.next_delay("GET", 1, 0.0, status=404) is None
+    assert policy.next_delay("GET", 1, 0.0, error=ConnectionError()) == 1.0
+
+
+def test_retry_non_idempotent():
+    policy = RetryPolicy(max_attempts=3, jitter=False)
+    assert policy.next_delay("POST", 1, 0.0, status=503) is None
+    assert policy.next_delay("POST", 1, 0.0, error=ConnectionError()) is None
+    assert policy.next_delay("POST", 1, 0.0, status=429) is not None
+    assert RetryPolicy(retry_non_idempotent=True).next_delay(
+        "POST", 1, 0.0, status=503
+    )
+
+
+def test_retry_after_and_deadline():
+    policy = RetryPolicy(jitter=False, backoff_base=0.1, deadline=5.0)
+    assert policy.next_delay("GET", 1, 0.0, status=429, retry_after=3.0) == 3.0
+    assert policy.next_delay("GET", 1, 3.0, status=429, retry_after=3.0) is None
+
+
+def test_retry_jitter():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+    for attempt in range(1, 10):
+        assert 0 <= policy.backoff(attempt) <= 4.0
@@ -0,0 +1,80 @@
+from treehole import Comment, Hole, HoleStore, MockServer, TreeHoleClient
+
+
+def make_hole(pid: int) -> Hole:
+    return Hole.from_data(
+        {
+            "pid": pid,
+            "timestamp": 1_600_000_000 + pid,
+            "type": "text",
+            "text": f"hole {pid}",
+            "reply": 1,
+            "likenum": 2,
+            "label_info": {
+                "id": 3,
+                "tag_name": "tag",
+                "created_at": 0,
+                "updated_at": 0,
+            },
+        }
+    )
+
+
+def make_comment(pid: int, cid: int) -> Comment:
+    return Comment.from_data(
+        {"cid": cid, "pid": pid, "text": f"comment {cid}", "name": "Alice"}
+    )
+
+
+def test_store_holes(tmp_path):
+    path = str(tmp_path / "treehole.db")
+    with HoleStore(path, batch_size=2) as store:
+        store.put_holes(make_hole(pid) for pid in range(1, 6))
+        assert store.get_hole(3) == make_hole(3)
+        assert store.get_hole(6) is None
+        assert [hole.pid for hole in store.get_holes(1_600_000_002)] == [5, 4, 3, 2]
+        store.expire_hole(3)
+        assert store.get_hole(3) is None
+    with HoleStore(path) as store:
+        assert store.stats() == (5, 0)
+        assert store.get_hole(5) == make_hole(5)
+
+
+def test_store_comments():
+    with HoleStore(":memory:") as store:
+        comments = [make_comment(1, cid) for cid in range(5)]
+        store.put_comments(comments[:2])
+        assert store.get_comments(1) is None
+        store.put_comments(comments, complete_pid=1)
+        assert store.get_comments(1) == comments
+        assert store.get_comments(1, page=2, page_size=2) == comments[2:4]
+        store.expire_comments(1)
+        assert store.get_comments(1) is None
+        assert store.stats() == (0, 5)
+
+
+def test_store_max_age():
+    with HoleStore(":memory:", max_age=-1) as store:
+        store.put_holes([make_hole(1)])
+        assert store.get_hole(1) is None
+
+
+def test_client_reads_through_store(tmp_path):
+    with MockServer(holes=50, comments=20) as server, HoleStore(
+        str(tmp_path / "treehole.db")
+    ) as store:
+        client = TreeHoleClient(token="token", base_url=server.base_url, store=store)
+        pid = next(pid for pid in range(50, 0, -1) if server.comments_data(pid))
+        comments = client.get_comment(pid)
+        assert client.get_comment(pid) == comments
+        hole = client.get_hole(pid)
+        assert client.get_hole(pid) == hole
+        assert (server.requests["comment"], server.requests["hole"]) == (1, 1)
+
+        # Writes send the next read back to the server
+        assert client.post_comment(pid, "hello")
+        assert client.get_comment(pid)[-1].text.endswith("hello")
+        assert server.requests["comment"] == 2
+        assert client.post_toggle_followed(pid) == (True, 1)
+        assert client.get_hole(pid).is_follow
+        assert server.requests["hole"] == 3
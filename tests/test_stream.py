@@ -0,0 +1,46 @@
+import json
+import random
+
+from treehole import ArrayStream
+
+document = {
+    "code": 20000,
+    "data": {
+        "current_page": 1,
+        "data": [
+            {"cid": cid, "text": '引号 " 反斜杠 \\ 括号 }]{[,' * (cid % 3), "tag": None}
+            for cid in range(100)
+        ],
+        "total": 100,
+    },
+    "success": True,
+}
+
+
+def feed_all(stream: ArrayStream, body: bytes, max_chunk: int) -> list:
+    elements = []
+    pos = 0
+    while pos < len(body):
+        size = random.randint(1, max_chunk)
+        elements += stream.feed(body[pos : pos + size])
+        pos += size
+    return elements
+
+
+def test_array_stream_chunks():
+    body = json.dumps(document, ensure_ascii=False).encode()
+    for max_chunk in (1, 7, 64, len(body)):
+        stream = ArrayStream()
+        elements = feed_all(stream, body, max_chunk)
+        assert [json.loads(element) for element in elements] == document["data"]["data"]
+        assert stream.done and stream.size == len(body)
+        assert len(stream.buffer) < len(body) // 10
+
+
+def test_array_stream_path():
+    body = b'{"x": {"data": {"data": [1]}}, "data": {"data": [[1, 2], {"a": "]"}]}}'
+    assert ArrayStream().feed(body) == [b"[1, 2]", b'{"a": "]"}']
+    stream = ArrayStream()
+    assert stream.feed(b'{"success": false, "message": "not found"}') == []
+    assert not stream.found
+    assert json.loads(stream.buffer)["success"] is False
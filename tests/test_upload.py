@@ -0,0 +1,81 @@
+import io
+
+import pytest
+from treehole import MultipartStream, shrink_image
+
+
+def body(stream: MultipartStream) -> bytes:
+    return b"".join(iter(lambda: stream.read(7), b""))
+
+
+def test_multipart_stream(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"0123456789" * 1000)
+    with MultipartStream(
+        {"text": "树洞", "type": "image"}, "data", path, chunk_size=64
+    ) as stream:
+        data = body(stream)
+        assert len(data) == stream.len
+        boundary = stream.content_type.split("boundary=")[1].encode()
+        assert data.startswith(b"--" + boundary)
+        assert data.endswith(b"--" + boundary + b"--\r\n")
+        assert "树洞".encode() in data and b"0123456789" * 1000 in data
+        stream.rewind()
+        assert stream.read() == data
+        assert b"".join(stream) == data
+
+
+def test_multipart_stream_replay():
+    source = io.BytesIO(b"skipimage")
+    source.read(4)
+    stream = MultipartStream({}, "data", source)
+    assert stream.len is not None and body(stream).count(b"image") == 1
+    stream.rewind()
+    assert body(stream).count(b"image") == 1
+
+    class Pipe(io.RawIOBase):
+        def __init__(self):
+            self.data = io.BytesIO(b"image")
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            return self.data.readinto(buffer)
+
+    stream = MultipartStream({}, "data", Pipe())
+    assert stream.len is None and stream.replayable
+    assert b"image" in body(stream)
+    assert not stream.replayable
+    with pytest.raises(ValueError):
+        stream.rewind()
+
+
+@pytest.mark.asyncio
+async def test_multipart_stream_async(tmp_path):
+    async def chunks():
+        yield b"ima"
+        yield b"ge"
+
+    stream = MultipartStream({"type": "image"}, "data", chunks())
+    assert stream.len is None and "Content-Length" not in stream.headers()
+    data = b"".join([chunk async for chunk in stream.aiter()])
+    assert b"\r\n\r\nimage\r\n" in data
+    assert not stream.replayable
+
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"image")
+    stream = MultipartStream({"type": "image"}, "data", path)
+    first = b"".join([chunk async for chunk in stream.aiter()])
+    assert first == b"".join([chunk async for chunk in stream.aiter()])
+    assert stream.headers()["Content-Length"] == str(len(first))
+
+
+def test_shrink_image():
+    Image = pytest.importorskip("PIL.Image")
+    picture = Image.linear_gradient("L").resize((1024, 768)).convert("RGB")
+    buffer = io.BytesIO()
+    picture.save(buffer, "BMP")
+    shrunk = shrink_image(buffer.getvalue(), max_side=256)
+    assert shrunk is not None and len(shrunk) < len(buffer.getvalue())
+    assert Image.open(io.BytesIO(shrunk)).size == (256, 192)
@@ -0,0 +1,31 @@
+import json
+import struct
+
+from treehole import TreeHoleClient
+from treehole.utils import image_dimensions, json_decoder
+
+
+def test_json_decoder():
+    body = json.dumps({"success": True, "data": {"text": "树洞", "pid": 1}}).encode()
+    assert json_decoder()(body) == json.loads(body)
+
+
+def test_client_decoder():
+    assert TreeHoleClient(token="token", decoder=json.loads).decoder is json.loads
+
+
+def test_image_dimensions():
+    png = b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 640, 480)
+    assert image_dimensions(png) == (640, 480)
+    assert image_dimensions(b"GIF89a" + struct.pack("<HH", 3, 4)) == (3, 4)
+    jpeg = (
+        b"\xff\xd8"
+        + b"\xff\xe1"
+        + struct.pack(">H", 100)
+        + bytes(98)
+        + b"\xff\xc0"
+        + struct.pack(">HBHH", 17, 8, 200, 300)
+    )
+    assert image_dimensions(jpeg) == (300, 200)
+    assert image_dimensions(jpeg[:50]) is None
+    assert image_dimensions(b"not an image") is None
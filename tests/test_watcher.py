@@ -0,0 +1,69 @@
+import pytest
+from treehole import FeedWatcher, Hole
+
+
+class FakeFeed:
+    """Serves a newest-first feed from an in-memory list of holes"""
+
+    def __init__(self, holes):
+        self.holes = holes
+        self.requests = 0
+
+    async def get_holes_async(self, page=1, page_size=25):
+        self.requests += 1
+        feed = sorted(self.holes.values(), key=lambda hole: -hole.pid)
+        return feed[(page - 1) * page_size : page * page_size]
+
+
+def make_holes(pids):
+    return {pid: Hole(pid=pid, reply=0, likenum=0, is_top=0) for pid in pids}
+
+
+@pytest.mark.asyncio
+async def test_watcher_emits_new_and_changed():
+    feed = FakeFeed(make_holes(range(1, 11)))
+    watcher = FeedWatcher(feed, page_size=5)
+    assert await watcher.poll() == []
+    assert watcher.high_water == 10
+
+    feed.holes.update(make_holes([11, 12]))
+    feed.holes[9] = Hole(pid=9, reply=3, likenum=0, is_top=0)
+    events = await watcher.poll()
+    assert [(e.kind, e.hole.pid) for e in events] == [
+        ("changed", 9),
+        ("new", 11),
+        ("new", 12),
+    ]
+    assert events[0].old_reply == 0
+    assert await watcher.poll() == []
+
+
+@pytest.mark.asyncio
+async def test_watcher_catches_up_and_widens():
+    feed = FakeFeed(make_holes(range(1, 6)))
+    watcher = FeedWatcher(feed, page_size=5, max_page_size=20)
+    await watcher.poll()
+    feed.holes.update(make_holes(range(6, 30)))
+    events = await watcher.poll()
+    assert [e.hole.pid for e in events] == list(range(6, 30))
+    assert watcher.page_size == 10
+
+
+@pytest.mark.asyncio
+async def test_watcher_shrinks_when_quiet():
+    feed = FakeFeed(make_holes(range(1, 6)))
+    watcher = FeedWatcher(feed, page_size=5, max_page_size=20)
+    await watcher.poll()
+    for start in (6, 36):
+        feed.holes.update(make_holes(range(start, start + 30)))
+        await watcher.poll()
+    assert watcher.page_size == 20
+    # A busy first page keeps the size
+    feed.holes.update(make_holes(range(66, 76)))
+    assert len(await watcher.poll()) == 10
+    assert watcher.page_size == 20
+    sizes = []
+    for _ in range(3):
+        assert await watcher.poll() == []
+        sizes.append(watcher.page_size)
+    assert sizes == [10, 5, 5]